@@ -47,6 +47,7 @@ class Settings(BaseSettings):
     LLM_MAX_NEW_TOKENS: int = Field(default=32)
     LLM_TIMEOUT_SECONDS: int = Field(default=100)
     LLM_FALLBACK_ENABLED: bool = Field(default=True)
+    LLM_MAX_CONCURRENCY: int = Field(default=10)  # generate_text_batch calls in flight
     LLM_FALLBACK_TEXT: str = Field(
         default="I'm sorry, I couldn't process that request in time. Please try again with a simpler query."
     )
@@ -83,12 +84,20 @@ class Settings(BaseSettings):
     RAG_CHUNK_OVERLAP: int = Field(default=50)
     RAG_TOP_K: int = Field(default=5)
 
+    # Response cache settings (RAG context / LLM output)
+    RESPONSE_CACHE_MAXSIZE: int = Field(default=512)
+    RESPONSE_CACHE_TTL_SECONDS: int = Field(default=3600)
+
     # Banking API settings
     BANKING_API_ENABLED: bool = Field(default=False)
     BANKING_API_URL: Optional[str] = Field(default=None)
     BANKING_API_KEY: Optional[str] = Field(default=None)
     BANKING_API_SECRET: Optional[str] = Field(default=None)
     USE_DUMMY_BANKING_API: bool = Field(default=True)
+    FX_RATE_CACHE_TTL_SECONDS: int = Field(default=3600)
+    BANKING_API_MAX_CONCURRENCY: int = Field(default=10)
+    # Accounts included in cash position and cash pooling reports
+    CASH_ACCOUNT_IDS: List[str] = Field(default=["1001", "1002", "1003", "1004"])
 
     # File management
     MAX_UPLOAD_SIZE_MB: int = Field(default=10)
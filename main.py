@@ -20,12 +20,13 @@ Dependencies:
 import asyncio
 import logging
 import os
-from typing import Dict, List, Optional, Union
-import json
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+import orjson
 from fastapi import Depends, FastAPI, File, UploadFile, HTTPException
 from fastapi import Depends, FastAPI, File, Form, HTTPException, Request, UploadFile, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 
 from config.settings import settings
@@ -33,7 +34,14 @@ from modules.voice_input import process_voice_input, process_live_voice_initiali
 from modules.intent_recognition import recognize_intent
 from modules.operation_manager import OperationManager
 from modules.file_manager import ingest_file
-from modules.response_generation import generate_text_response, text_to_speech
+from modules.operations.accounting import stream_financial_statement
+from modules.operations.external_financing import (
+    stream_debt_issuance,
+    stream_debt_maturity,
+    stream_portfolio_refinancing,
+)
+from modules.llm_module import aclose_session
+from modules.response_generation import generate_text_response, text_to_speech, to_json
 from modules.security import authenticate_user, get_current_user
 from fastapi import WebSocket, WebSocketDisconnect
 
@@ -45,6 +53,8 @@ app = FastAPI(
     title="Finance Accountant Agent API",
     description="Voice-activated AI assistant for financial operations",
     version="1.0.0",
+    # Serialize JSON responses with orjson (C implementation, fast float encoding)
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -60,6 +70,12 @@ app.add_middleware(
 operation_manager = OperationManager()
 
 
+@app.on_event("shutdown")
+async def close_llm_session():
+    """Close the shared LLM HTTP client on shutdown."""
+    await aclose_session()
+
+
 # Request models
 class TextQueryRequest(BaseModel):
     query: str
@@ -76,6 +92,18 @@ class AuthPayload(BaseModel):
     username: str
     password: str
 
+class StreamRequest(BaseModel):
+    entities: Dict = {}
+
+def _ndjson_response(events: AsyncIterator[Dict]) -> StreamingResponse:
+    """Stream events as newline-delimited JSON, one object per line."""
+    async def lines():
+        async for event in events:
+            yield orjson.dumps(event, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 # Routes
 @app.get("/")
 async def root():
@@ -112,7 +140,7 @@ async def voice_query(
 
         # Ensure it's a string
         if not isinstance(response_text, str):
-            response_text = json.dumps(response_text, indent=2)
+            response_text = to_json(response_text)
 
         # Optional TTS
         audio_url = None
@@ -154,6 +182,36 @@ async def text_query(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/financial-statement/stream")
+async def financial_statement_stream(
+    request: StreamRequest, current_user=Depends(get_current_user)
+):
+    """Stream statement data, then the analysis text as it is generated (NDJSON)."""
+    return _ndjson_response(stream_financial_statement(request.entities))
+
+
+@app.post("/debt-issuance/stream")
+async def debt_issuance_stream(
+    request: StreamRequest, current_user=Depends(get_current_user)
+):
+    """Stream the issuance pricing, then the strategy text as it is generated (NDJSON)."""
+    return _ndjson_response(stream_debt_issuance(request.entities))
+
+
+@app.post("/debt-maturity/stream")
+async def debt_maturity_stream(
+    request: StreamRequest, current_user=Depends(get_current_user)
+):
+    """Stream the maturity profile, then the analysis text as it is generated (NDJSON)."""
+    return _ndjson_response(stream_debt_maturity(request.entities))
+
+
+@app.post("/refinancing/stream")
+async def refinancing_stream(current_user=Depends(get_current_user)):
+    """Stream the portfolio refinancing opportunities, then the strategy text as it is generated (NDJSON)."""
+    return _ndjson_response(stream_portfolio_refinancing())
+
+
 @app.post("/files/upload")
 async def upload_file(
     file: UploadFile = File(...),
@@ -15,6 +15,7 @@ Features:
 
 Dependencies:
 - rag_module: For adding processed documents to vector store
+- rag_cache: For invalidating cached RAG context after ingestion
 - PyPDF2/pdfplumber: For PDF processing
 - openpyxl: For Excel processing
 - python-docx: For Word document processing
@@ -35,6 +36,7 @@ import pandas as pd
 from fastapi import UploadFile
 
 from config.settings import settings
+from modules.rag_cache import clear_context_cache
 from modules.rag_module import Document, rag_module
 
 logger = logging.getLogger(__name__)
@@ -212,6 +214,10 @@ async def ingest_file(file: UploadFile, category: str) -> Dict:
 
         num_added = await rag_module.add_documents(documents)
 
+        # Cached RAG context predates these documents
+        if num_added:
+            clear_context_cache()
+
         return {
             "filename": filename,
             "file_type": file_extension,
@@ -0,0 +1,25 @@
+"""
+JIT Compilation Helpers for Finance Accountant Agent
+
+This module exposes the `njit` decorator used for small numeric kernels.
+When Numba is installed the kernels are compiled to native code (and cached
+on disk with cache=True); otherwise they run unchanged as plain Python.
+
+Dependencies:
+- numba (optional): For nopython-mode compilation
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+except ImportError:
+    logger.info("numba not installed; numeric kernels will run as plain Python")
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit, usable with or without arguments."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -10,12 +10,16 @@ Features:
 - Attention mask & pad token handling
 - Async inference with timeout and fallback
 - Custom stopping criteria support
+- Token streaming for the hosted DeepInfra API
+- Batched generation with bounded concurrency
 """
 
 import httpx
 import asyncio
 import logging
-from typing import List, Optional, Union
+from typing import AsyncIterator, List, Optional, Union
+
+import orjson
 
 import torch
 from transformers import (
@@ -35,6 +39,9 @@ logger = logging.getLogger(__name__)
 _model = None
 _tokenizer = None
 _inference_client: Optional[InferenceClient] = None
+_http_client: Optional[httpx.AsyncClient] = None
+
+DEEPINFRA_CHAT_URL = "https://api.deepinfra.com/v1/openai/chat/completions"
 
 class LLMTimeoutError(Exception):
     """Raised when inference times out."""
@@ -51,6 +58,26 @@ class FinanceStoppingCriteria(StoppingCriteria):
         return any(s in text for s in self.stop_strings)
 
 
+async def ensure_session() -> httpx.AsyncClient:
+    """Return the shared HTTP client for hosted LLM calls, creating it if needed.
+
+    Reusing one client keeps connections to the API alive between requests,
+    so only the first call pays for the TCP/TLS handshake.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=settings.LLM_TIMEOUT_SECONDS)
+    return _http_client
+
+
+async def aclose_session() -> None:
+    """Close the shared HTTP client, if one was created."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 async def _call_deepinfra_api(prompt: str, max_tokens: int, temperature: float, top_p: float, stop: Optional[List[str]] = None) -> str:
     headers = {
         "Authorization": f"Bearer {settings.DEEPINFRA_API_KEY}",
@@ -67,11 +94,11 @@ async def _call_deepinfra_api(prompt: str, max_tokens: int, temperature: float,
         body["stop"] = stop
 
     try:
-        async with httpx.AsyncClient(timeout=settings.LLM_TIMEOUT_SECONDS) as client:
-            response = await client.post("https://api.deepinfra.com/v1/openai/chat/completions", headers=headers, json=body)
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
+        client = await ensure_session()
+        response = await client.post(DEEPINFRA_CHAT_URL, headers=headers, json=body)
+        response.raise_for_status()
+        result = response.json()
+        return result["choices"][0]["message"]["content"]
     except Exception as e:
         logger.error(f"DeepInfra API error: {e}")
         if settings.LLM_FALLBACK_ENABLED:
@@ -79,6 +106,46 @@ async def _call_deepinfra_api(prompt: str, max_tokens: int, temperature: float,
         raise LLMTimeoutError(str(e))
 
 
+async def _stream_deepinfra_api(prompt: str, max_tokens: int, temperature: float, top_p: float, stop: Optional[List[str]] = None) -> AsyncIterator[str]:
+    headers = {
+        "Authorization": f"Bearer {settings.DEEPINFRA_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    body = {
+        "model": settings.LLM_MODEL_NAME,
+        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "top_p": top_p,
+        "stream": True,
+    }
+    if stop:
+        body["stop"] = stop
+
+    yielded = False
+    try:
+        client = await ensure_session()
+        async with client.stream("POST", DEEPINFRA_CHAT_URL, headers=headers, json=body) as response:
+            response.raise_for_status()
+            # Server-sent events: one "data: {json}" line per chunk, then "data: [DONE]"
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                delta = orjson.loads(data)["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    yielded = True
+                    yield delta
+    except Exception as e:
+        logger.error(f"DeepInfra streaming error: {e}")
+        if settings.LLM_FALLBACK_ENABLED and not yielded:
+            yield settings.LLM_FALLBACK_TEXT
+            return
+        raise LLMTimeoutError(str(e))
+
+
 async def _get_inference_client() -> InferenceClient:
     global _inference_client
     if _inference_client is None:
@@ -225,4 +292,65 @@ async def generate_text(
         logger.warning('Local LLM inference timed out.')
         if settings.LLM_FALLBACK_ENABLED:
             return settings.LLM_FALLBACK_TEXT
-        raise LLMTimeoutError('Local inference timed out')
\ No newline at end of file
+        raise LLMTimeoutError('Local inference timed out')
+
+
+async def stream_text(
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    max_new_tokens: Optional[int] = None,
+    temperature: float = 0.7,
+    top_p: float = 0.9,
+    stop_strings: Optional[List[str]] = None,
+) -> AsyncIterator[str]:
+    """Yield generated text incrementally as it arrives.
+
+    Tokens are streamed from the DeepInfra API when it is enabled; other
+    backends yield the complete generate_text() output as a single chunk.
+    """
+    if settings.USE_DEEPINFRA_API:
+        full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+        async for chunk in _stream_deepinfra_api(
+            prompt=full_prompt,
+            max_tokens=max_new_tokens or settings.LLM_MAX_NEW_TOKENS,
+            temperature=temperature,
+            top_p=top_p,
+            stop=stop_strings,
+        ):
+            yield chunk
+        return
+
+    yield await generate_text(
+        prompt=prompt,
+        system_prompt=system_prompt,
+        max_new_tokens=max_new_tokens,
+        temperature=temperature,
+        top_p=top_p,
+        stop_strings=stop_strings,
+    )
+
+
+async def generate_text_batch(
+    prompts: List[str],
+    system_prompts: Optional[List[Optional[str]]] = None,
+    max_new_tokens: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+) -> List[str]:
+    """Run generate_text() for several prompts concurrently, returning outputs in order.
+
+    At most max_concurrency (default LLM_MAX_CONCURRENCY) generations are in
+    flight at once, so a large batch does not exceed the provider's rate limits.
+    """
+    if system_prompts is None:
+        system_prompts = [None] * len(prompts)
+    semaphore = asyncio.Semaphore(max_concurrency or settings.LLM_MAX_CONCURRENCY)
+
+    async def generate(prompt: str, system_prompt: Optional[str]) -> str:
+        async with semaphore:
+            return await generate_text(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                max_new_tokens=max_new_tokens,
+            )
+
+    return list(await asyncio.gather(*map(generate, prompts, system_prompts)))
@@ -18,18 +18,1210 @@ Dependencies:
 """
 
 import asyncio
+import copy
 import datetime
+import hashlib
 import logging
 import random
-from typing import Dict, List, Optional
-
-from modules.llm_module import generate_text
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from types import MappingProxyType
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.jit import njit
+from modules.llm_module import ensure_session, generate_text, stream_text
+from modules.rag_cache import cached_generate_context
 from modules.rag_module import rag_module
 
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Message templates (format specs are parsed once, at import time)
+GL_SUMMARY_TEMPLATE = (
+    "General Ledger Summary as of {end_date}:\n\n"
+    "Assets: {assets}\n"
+    "Liabilities: {liabilities}\n"
+    "Equity: {equity}\n"
+    "Revenue: {revenue}\n"
+    "Expenses: {expenses}\n"
+    "Net Income: {net_income}\n\n"
+    "Top Accounts by Type:\n"
+    "{by_type}"
+)
+
+BALANCE_SHEET_MESSAGE_TEMPLATE = (
+    "Balance Sheet as of {s.date}\n\n"
+    "ASSETS\n"
+    "Current Assets: ${s.current_assets:,.0f}\n"
+    "Non-Current Assets: ${s.non_current_assets:,.0f}\n"
+    "Total Assets: ${s.total_assets:,.0f}\n\n"
+    "LIABILITIES & EQUITY\n"
+    "Current Liabilities: ${s.current_liabilities:,.0f}\n"
+    "Non-Current Liabilities: ${s.non_current_liabilities:,.0f}\n"
+    "Total Equity: ${s.total_equity:,.0f}\n"
+    "Total Liabilities & Equity: ${s.total_liabilities_equity:,.0f}"
+)
+
+INCOME_STATEMENT_MESSAGE_TEMPLATE = (
+    "Income Statement for {s.period}\n\n"
+    "Revenue: ${s.revenue:,.0f}\n"
+    "Cost of Sales: ${s.cost_of_sales:,.0f}\n"
+    "Gross Profit: ${s.gross_profit:,.0f}\n"
+    "Operating Expenses: ${s.operating_expenses:,.0f}\n"
+    "Operating Income: ${s.operating_income:,.0f}\n"
+    "Income Before Tax: ${s.income_before_tax:,.0f}\n"
+    "Net Income: ${s.net_income:,.0f}\n"
+    "Gross Margin: {gross_margin:.1%}\n"
+    "Net Margin: {net_margin:.1%}"
+)
+
+CASH_FLOW_MESSAGE_TEMPLATE = (
+    "Cash Flow Statement for {s.period}\n\n"
+    "Net Income: ${s.net_income:,.0f}\n"
+    "Net Cash from Operating: ${s.operating:,.0f}\n"
+    "Net Cash from Investing: ${s.investing:,.0f}\n"
+    "Net Cash from Financing: ${s.financing:,.0f}\n"
+    "Net Change in Cash: ${s.net_change_in_cash:,.0f}\n"
+    "Beginning Cash: ${s.beginning_cash:,.0f}\n"
+    "Ending Cash: ${s.ending_cash:,.0f}"
+)
+
+# Bound formatters for the overview messages; each renders in a single call
+_format_balance_sheet_message = BALANCE_SHEET_MESSAGE_TEMPLATE.format
+_format_income_statement_message = INCOME_STATEMENT_MESSAGE_TEMPLATE.format
+_format_cash_flow_message = CASH_FLOW_MESSAGE_TEMPLATE.format
+
+# System prompt for reconciliation guidance
+RECONCILIATION_GUIDANCE_PROMPT = """
+You are an accounting reconciliation specialist. Provide guidance for reconciling this account:
+
+Account: {account_number} - {account_name}
+Reconciliation Type: {reconciliation_type}
+As of Date: {as_of_date}
+
+GL Balance: {gl_balance}
+{balance_label} Balance: {comparison_balance}
+Difference: {difference}
+
+Unreconciled Items:
+{unreconciled_items}
+Current Status: {status}
+Last Reconciled: {last_reconciled}
+
+Provide detailed guidance for completing this reconciliation, including:
+1. Assessment of current reconciliation status
+2. Recommendations for addressing unreconciled items
+3. Step-by-step process to complete the reconciliation
+4. Best practices for this type of reconciliation
+5. Any potential red flags or issues to investigate
+
+Focus on practical, actionable advice that would help an accountant complete this reconciliation accurately and efficiently.
+"""
+
+# System prompt preface and closing instructions for financial statement analysis
+STATEMENT_ANALYSIS_PROMPT = """
+You are a financial analyst reviewing financial statements. Provide a {analysis_type} analysis of this {statement_name}:
+"""
+
+STATEMENT_ANALYSIS_INSTRUCTIONS = """
+
+Based on the {statement_name} and the information provided, perform a detailed {analysis_type} analysis, including:
+
+1. Key insights and trends
+2. Strengths and areas of concern
+3. Notable changes and their implications
+4. Recommendations for management
+
+Focus on the most important aspects that would be relevant to financial decision-makers.
+"""
+
+# System prompt for accounting policy questions, followed by the user's focus
+# and either the retrieved context or the general guidance below
+ACCOUNTING_POLICY_PROMPT = """
+You are an accounting policy specialist. Provide information about accounting policies and procedures.
+"""
+
+POLICY_NO_CONTEXT_GUIDE = """
+
+Without specific context about the company's policies, provide general information about standard accounting policies and procedures following GAAP or IFRS as appropriate. Include:
+
+1. Definition and purpose of the policy or policy area
+2. Key principles and requirements
+3. Implementation considerations
+4. Common practices and industry standards
+5. Relevant accounting standards (GAAP/IFRS references)
+
+Tailor the response to be informative and educational while noting that specific company policies may vary.
+"""
+
+# Ratio sections of the financial statement analysis prompt, filled from _compute_ratios
+RATIO_SECTION_HEADER = "\nKey Financial Ratios:\n"
+
+BALANCE_SHEET_RATIOS_TEMPLATE = """
+Liquidity Ratios:
+- Current Ratio: {current_ratio:.2f}
+- Quick Ratio: {quick_ratio:.2f}
+
+Leverage Ratios:
+- Debt to Assets: {debt_to_assets:.2f}
+- Debt to Equity: {debt_to_equity:.2f}
+"""
+
+PROFITABILITY_RATIOS_TEMPLATE = """
+Profitability Ratios:
+- Gross Margin: {gross_margin:.2f} ({gross_margin:.1%})
+- Operating Margin: {operating_margin:.2f} ({operating_margin:.1%})
+- Net Profit Margin: {net_margin:.2f} ({net_margin:.1%})
+"""
+
+RETURN_RATIOS_TEMPLATE = """
+Return Ratios:
+- Return on Assets (ROA): {return_on_assets:.2f} ({return_on_assets:.1%})
+- Return on Equity (ROE): {return_on_equity:.2f} ({return_on_equity:.1%})
+"""
+
+CASH_FLOW_RATIOS_TEMPLATE = """
+Cash Flow Ratios:
+- Operating Cash Flow to Net Income: {operating_cash_flow_ratio:.2f}
+"""
+
+CASH_FLOW_TO_DEBT_TEMPLATE = "- Cash Flow to Debt: {cash_flow_to_debt:.2f}\n"
+
+FREE_CASH_FLOW_TEMPLATE = "- Free Cash Flow: ${free_cash_flow:,.0f}\n"
+
+CASH_FLOW_METRICS_TEMPLATE = """
+Cash Flow Metrics:
+- Operating Cash Flow: ${operating_cash_flow:,.0f}
+- Free Cash Flow: ${free_cash_flow:,.0f}
+- Cash Flow from Operations to Capital Expenditures: {operating_cash_flow_to_capex:,.2f}
+"""
+
+# Bound formatter for currency amounts, e.g. 1234.5 -> "$1,234.50"
+_fmt_amount = "${:,.2f}".format
+
+@lru_cache(maxsize=512)
+def _pretty(key: str) -> str:
+    """Return the display label for a snake_case key, e.g. "net_income" -> "Net Income"."""
+    return key.replace('_', ' ').title()
+
+
+# Balance sheet accessors; the nested statement layout is spelled out only here
+def _total_current_assets(balance_sheet: Dict) -> float:
+    """Total current assets of a balance sheet."""
+    return balance_sheet['assets']['current_assets']['total_current_assets']
+
+
+def _total_assets(balance_sheet: Dict) -> float:
+    """Total assets of a balance sheet."""
+    return balance_sheet['assets']['total_assets']
+
+
+def _total_current_liabilities(balance_sheet: Dict) -> float:
+    """Total current liabilities of a balance sheet."""
+    return balance_sheet['liabilities_equity']['current_liabilities']['total_current_liabilities']
+
+
+def _total_non_current_liabilities(balance_sheet: Dict) -> float:
+    """Total non-current liabilities of a balance sheet."""
+    return balance_sheet['liabilities_equity']['non_current_liabilities']['total_non_current_liabilities']
+
+
+def _total_liabilities(balance_sheet: Dict) -> float:
+    """Total (current plus non-current) liabilities of a balance sheet."""
+    return _total_current_liabilities(balance_sheet) + _total_non_current_liabilities(balance_sheet)
+
+
+def _total_equity(balance_sheet: Dict) -> float:
+    """Total equity of a balance sheet."""
+    return balance_sheet['liabilities_equity']['equity']['total_equity']
+
+
+def _period_changes(current: List[float], previous: List[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute period-over-period changes for aligned lists of line items.
+
+    Args:
+        current: Current period values
+        previous: Previous period values, in the same order
+
+    Returns:
+        Tuple of (absolute changes, percentage changes); the percentage change
+        is inf where the previous value is zero
+    """
+    curr = np.asarray(current, dtype=np.float64)
+    prev = np.asarray(previous, dtype=np.float64)
+    change = curr - prev
+    pct_change = np.divide(change, prev, out=np.full_like(change, np.inf), where=prev != 0) * 100.0
+    return change, pct_change
+
+
+def _flatten_numeric(d: Dict, prefix: Tuple = ()) -> Tuple[List[Tuple], np.ndarray]:
+    """
+    Flatten the numeric leaves of a nested statement dict.
+
+    Args:
+        d: Nested dictionary of line items
+        prefix: Key path of ``d`` within the enclosing dict
+
+    Returns:
+        Tuple of (key paths, float64 array of values in the same order)
+    """
+    keys = []
+    values = []
+    for key, value in d.items():
+        path = prefix + (key,)
+        if isinstance(value, dict):
+            sub_keys, sub_values = _flatten_numeric(value, path)
+            keys.extend(sub_keys)
+            values.extend(sub_values.tolist())
+        elif isinstance(value, (int, float)):
+            keys.append(path)
+            values.append(value)
+    return keys, np.asarray(values, dtype=np.float64)
+
+
+def _change_entries(current: List[float], previous: List[float]) -> List[Dict]:
+    """
+    Compute overview change entries for aligned lists of line items.
+
+    Args:
+        current: Current period values
+        previous: Previous period values, in the same order
+
+    Returns:
+        List of {"change", "pct_change"} dicts; the percentage change is 0
+        where the previous value is zero
+    """
+    cur = np.asarray(current, dtype=np.float64)
+    prev = np.asarray(previous, dtype=np.float64)
+    change = cur - prev
+    pct = np.zeros_like(change)
+    np.divide(change, prev, out=pct, where=prev != 0)
+    pct *= 100.0
+    return [
+        {"change": c, "pct_change": p}
+        for c, p in zip(change.tolist(), pct.tolist())
+    ]
+
+
+def _balance_sheet_changes(current_data: Dict, comparison_data: Dict) -> Dict:
+    """
+    Compute line-item changes between two balance sheets in one vectorized pass.
+
+    Args:
+        current_data: Current balance sheet
+        comparison_data: Balance sheet to compare against
+
+    Returns:
+        Dictionary of changes keyed like the "assets" and "liabilities_equity"
+        sections of the statement
+    """
+    sections = ("assets", "liabilities_equity")
+    cur_keys, cur_values = _flatten_numeric({s: current_data[s] for s in sections})
+    prev_keys, prev_values = _flatten_numeric({s: comparison_data[s] for s in sections})
+
+    # Align on the line items present in both periods
+    prev_index = {key: i for i, key in enumerate(prev_keys)}
+    common = [i for i, key in enumerate(cur_keys) if key in prev_index]
+    entries = _change_entries(
+        cur_values[common],
+        prev_values[[prev_index[cur_keys[i]] for i in common]],
+    )
+
+    comparison_changes = {section: {} for section in sections}
+    for i, entry in zip(common, entries):
+        section, *path, leaf = cur_keys[i]
+        target = comparison_changes[section]
+        for key in path:
+            target = target.setdefault(key, {})
+        target[leaf] = entry
+    return comparison_changes
+
+
+def _comparison_heading(comparison_data: Dict) -> str:
+    """Heading for the period comparison section of the analysis prompt."""
+    return f"""
+
+    Comparison to {comparison_data.get('period', comparison_data.get('date', 'previous period'))}:
+    """
+
+
+def _build_balance_sheet_prompt(current_data: Dict, comparison_data: Optional[Dict] = None) -> str:
+    """
+    Render the balance sheet section of the analysis prompt.
+
+    Args:
+        current_data: Statement data for the analyzed period
+        comparison_data: Optional statement data for the comparison period
+
+    Returns:
+        Prompt text for the statement and, if given, the period comparison
+    """
+    parts = []
+    period_text = f"As of {current_data['date']}"
+
+    parts.append(f"""
+
+    Balance Sheet {period_text}
+
+    Assets:
+    """)
+
+    for category, accounts in current_data['assets'].items():
+        if category == "total_assets":
+            parts.append(f"Total Assets: ${accounts:,.0f}\n")
+            continue
+
+        parts.append(f"\n{_pretty(category)}:\n")
+        for account, amount in accounts.items():
+            parts.append(f"- {_pretty(account)}: ${amount:,.0f}\n")
+
+    parts.append("\nLiabilities & Equity:\n")
+
+    for category, accounts in current_data['liabilities_equity'].items():
+        if category == "total_liabilities_equity":
+            parts.append(f"Total Liabilities & Equity: ${accounts:,.0f}\n")
+            continue
+
+        parts.append(f"\n{_pretty(category)}:\n")
+        for account, amount in accounts.items():
+            parts.append(f"- {_pretty(account)}: ${amount:,.0f}\n")
+
+    # Add comparison data if available
+    if comparison_data:
+        parts.append(_comparison_heading(comparison_data))
+
+        # Calculate key changes: current assets, total assets, total liabilities, total equity
+        changes, pct_changes = _period_changes(
+            [
+                _total_current_assets(current_data),
+                _total_assets(current_data),
+                _total_liabilities(current_data),
+                _total_equity(current_data),
+            ],
+            [
+                _total_current_assets(comparison_data),
+                _total_assets(comparison_data),
+                _total_liabilities(comparison_data),
+                _total_equity(comparison_data),
+            ],
+        )
+        current_assets_change, total_assets_change, total_liabilities_change, equity_change = changes
+        current_assets_pct_change, total_assets_pct_change, total_liabilities_pct_change, equity_pct_change = pct_changes
+
+        parts.append(f"""
+        - Current Assets: ${current_assets_change:,.0f} ({current_assets_pct_change:.1f}%)
+        - Total Assets: ${total_assets_change:,.0f} ({total_assets_pct_change:.1f}%)
+        - Total Liabilities: ${total_liabilities_change:,.0f} ({total_liabilities_pct_change:.1f}%)
+        - Total Equity: ${equity_change:,.0f} ({equity_pct_change:.1f}%)
+        """)
+
+    return "".join(parts)
+
+
+def _build_income_statement_prompt(current_data: Dict, comparison_data: Optional[Dict] = None) -> str:
+    """
+    Render the income statement section of the analysis prompt.
+
+    Args:
+        current_data: Statement data for the analyzed period
+        comparison_data: Optional statement data for the comparison period
+
+    Returns:
+        Prompt text for the statement and, if given, the period comparison
+    """
+    parts = []
+    period_text = f"For {current_data['period']}"
+
+    parts.append(f"""
+
+    Income Statement {period_text}
+
+    Revenue:
+    """)
+
+    for account, amount in current_data['revenue'].items():
+        parts.append(f"- {_pretty(account)}: ${amount:,.0f}\n")
+
+    parts.append("\nCost of Sales:\n")
+    for account, amount in current_data['cost_of_sales'].items():
+        parts.append(f"- {_pretty(account)}: ${amount:,.0f}\n")
+
+    parts.append(f"\nGross Profit: ${current_data['gross_profit']:,.0f}\n")
+
+    parts.append("\nOperating Expenses:\n")
+    for account, amount in current_data['operating_expenses'].items():
+        parts.append(f"- {_pretty(account)}: ${amount:,.0f}\n")
+
+    parts.append(f"\nOperating Income: ${current_data['operating_income']:,.0f}\n")
+
+    parts.append("\nOther Income/Expense:\n")
+    for account, amount in current_data['other_income_expense'].items():
+        parts.append(f"- {_pretty(account)}: ${amount:,.0f}\n")
+
+    parts.append(f"""
+    Income Before Tax: ${current_data['income_before_tax']:,.0f}
+    Tax Expense: ${current_data['tax_expense']:,.0f}
+    Net Income: ${current_data['net_income']:,.0f}
+    """)
+
+    # Add comparison data if available
+    if comparison_data:
+        parts.append(_comparison_heading(comparison_data))
+
+        # Calculate key changes: revenue, gross profit, operating income, net income
+        changes, pct_changes = _period_changes(
+            [
+                current_data['revenue']['total_revenue'],
+                current_data['gross_profit'],
+                current_data['operating_income'],
+                current_data['net_income'],
+            ],
+            [
+                comparison_data['revenue']['total_revenue'],
+                comparison_data['gross_profit'],
+                comparison_data['operating_income'],
+                comparison_data['net_income'],
+            ],
+        )
+        revenue_change, gross_profit_change, operating_income_change, net_income_change = changes
+        revenue_pct_change, gross_profit_pct_change, operating_income_pct_change, net_income_pct_change = pct_changes
+
+        parts.append(f"""
+        - Revenue: ${revenue_change:,.0f} ({revenue_pct_change:.1f}%)
+        - Gross Profit: ${gross_profit_change:,.0f} ({gross_profit_pct_change:.1f}%)
+        - Operating Income: ${operating_income_change:,.0f} ({operating_income_pct_change:.1f}%)
+        - Net Income: ${net_income_change:,.0f} ({net_income_pct_change:.1f}%)
+        """)
+
+    return "".join(parts)
+
+
+def _build_cash_flow_statement_prompt(current_data: Dict, comparison_data: Optional[Dict] = None) -> str:
+    """
+    Render the cash flow statement section of the analysis prompt.
+
+    Args:
+        current_data: Statement data for the analyzed period
+        comparison_data: Optional statement data for the comparison period
+
+    Returns:
+        Prompt text for the statement and, if given, the period comparison
+    """
+    parts = []
+    period_text = f"For {current_data['period']}"
+
+    parts.append(f"""
+
+    Cash Flow Statement {period_text}
+
+    Operating Activities:
+    - Net Income: ${current_data['operating_activities']['net_income']:,.0f}
+
+    Adjustments:
+    - Depreciation: ${current_data['operating_activities']['adjustments']['depreciation']:,.0f}
+
+    Changes in Working Capital:
+    """)
+
+    for account, amount in current_data['operating_activities']['adjustments']['changes_in_working_capital'].items():
+        parts.append(f"- {_pretty(account)}: ${amount:,.0f}\n")
+
+    parts.append(f"""
+    Net Cash from Operating Activities: ${current_data['operating_activities']['net_cash_from_operating']:,.0f}
+
+    Investing Activities:
+    """)
+
+    for account, amount in current_data['investing_activities'].items():
+        if account != "net_cash_from_investing":
+            parts.append(f"- {_pretty(account)}: ${amount:,.0f}\n")
+
+    parts.append(f"""
+    Net Cash from Investing Activities: ${current_data['investing_activities']['net_cash_from_investing']:,.0f}
+
+    Financing Activities:
+    """)
+
+    for account, amount in current_data['financing_activities'].items():
+        if account != "net_cash_from_financing":
+            parts.append(f"- {_pretty(account)}: ${amount:,.0f}\n")
+
+    parts.append(f"""
+    Net Cash from Financing Activities: ${current_data['financing_activities']['net_cash_from_financing']:,.0f}
+
+    Net Change in Cash: ${current_data['net_change_in_cash']:,.0f}
+    Beginning Cash: ${current_data['beginning_cash']:,.0f}
+    Ending Cash: ${current_data['ending_cash']:,.0f}
+    """)
+
+    # Add comparison data if available
+    if comparison_data:
+        parts.append(_comparison_heading(comparison_data))
+
+        # Calculate key changes: operating, investing, financing, net change in cash
+        changes, pct_changes = _period_changes(
+            [
+                current_data['operating_activities']['net_cash_from_operating'],
+                current_data['investing_activities']['net_cash_from_investing'],
+                current_data['financing_activities']['net_cash_from_financing'],
+                current_data['net_change_in_cash'],
+            ],
+            [
+                comparison_data['operating_activities']['net_cash_from_operating'],
+                comparison_data['investing_activities']['net_cash_from_investing'],
+                comparison_data['financing_activities']['net_cash_from_financing'],
+                comparison_data['net_change_in_cash'],
+            ],
+        )
+        operating_change, investing_change, financing_change, net_change_change = changes
+        operating_pct_change, _, _, net_change_pct_change = pct_changes
+
+        parts.append(f"""
+        - Operating Cash Flow: ${operating_change:,.0f} ({operating_pct_change:.1f}%)
+        - Investing Cash Flow: ${investing_change:,.0f}
+        - Financing Cash Flow: ${financing_change:,.0f}
+        - Net Change in Cash: ${net_change_change:,.0f} ({net_change_pct_change:.1f}%)
+        """)
+
+    return "".join(parts)
+
+
+# Statement section builders for the analysis prompt, by statement type
+STATEMENT_PROMPT_BUILDERS = {
+    "balance_sheet": _build_balance_sheet_prompt,
+    "income_statement": _build_income_statement_prompt,
+    "cash_flow_statement": _build_cash_flow_statement_prompt,
+}
+
+
+# In-process TTL cache for LLM output: key -> (stored_at, text)
+_GUIDANCE_CACHE: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+
+async def _cached_generate(key_parts: Tuple, coro_factory: Callable[[], Awaitable[str]]) -> str:
+    """
+    Return a cached LLM result, or await the factory and cache its result.
+
+    Args:
+        key_parts: Inputs that fully determine the result (prompt, system prompt, ...)
+        coro_factory: Zero-argument callable returning the coroutine to run on a miss
+
+    Returns:
+        The cached or freshly generated text
+    """
+    key = hashlib.blake2b(repr(key_parts).encode(), digest_size=16).hexdigest()
+    now = time.monotonic()
+
+    cached = _GUIDANCE_CACHE.get(key)
+    if cached is not None and now - cached[0] < settings.RESPONSE_CACHE_TTL_SECONDS:
+        _GUIDANCE_CACHE.move_to_end(key)
+        return cached[1]
+
+    value = await coro_factory()
+
+    # Never pin the LLM fallback text; the next request should retry
+    if value != settings.LLM_FALLBACK_TEXT:
+        _GUIDANCE_CACHE[key] = (now, value)
+        _GUIDANCE_CACHE.move_to_end(key)
+        while len(_GUIDANCE_CACHE) > settings.RESPONSE_CACHE_MAXSIZE:
+            _GUIDANCE_CACHE.popitem(last=False)
+
+    return value
+
+
+# Sample reconciliation data (would come from accounting system in real implementation).
+# Built once at import time; only the top level is read-only, so responses
+# copy the nested items rather than returning them by reference.
+RECONCILIATIONS = MappingProxyType({
+    "1000": {  # Cash
+        "account_name": "Cash",
+        "type": "bank",
+        "as_of_date": "2025-03-31",
+        "gl_balance": 1250000,
+        "bank_balance": 1275000,
+        "reconciled_balance": 1250000,
+        "unreconciled_items": [
+            {"date": "2025-03-30", "description": "Check #12345", "amount": -15000, "status": "outstanding"},
+            {"date": "2025-03-31", "description": "Deposit in transit", "amount": 40000, "status": "in_transit"},
+            {"date": "2025-03-29", "description": "Bank fee", "amount": -50, "status": "unrecorded"},
+        ],
+        "status": "in_progress",
+        "last_reconciled": "2025-02-28",
+    },
+    "1010": {  # Accounts Receivable
+        "account_name": "Accounts Receivable",
+        "type": "subledger",
+        "as_of_date": "2025-03-31",
+        "gl_balance": 850000,
+        "subledger_balance": 852500,
+        "reconciled_balance": 850000,
+        "unreconciled_items": [
+            {"date": "2025-03-31", "description": "Customer payment not posted", "amount": -2500, "status": "timing"},
+        ],
+        "status": "complete",
+        "last_reconciled": "2025-02-28",
+    },
+    "1020": {  # Inventory
+        "account_name": "Inventory",
+        "type": "physical",
+        "as_of_date": "2025-03-31",
+        "gl_balance": 750000,
+        "physical_balance": 758000,
+        "reconciled_balance": 750000,
+        "unreconciled_items": [
+            {"date": "2025-03-31", "description": "Goods in transit", "amount": -5000, "status": "timing"},
+            {"date": "2025-03-30", "description": "Count discrepancy", "amount": 3000, "status": "unexplained"},
+        ],
+        "status": "in_progress",
+        "last_reconciled": "2025-02-28",
+    },
+    "2000": {  # Accounts Payable
+        "account_name": "Accounts Payable",
+        "type": "subledger",
+        "as_of_date": "2025-03-31",
+        "gl_balance": 650000,
+        "subledger_balance": 647500,
+        "reconciled_balance": 650000,
+        "unreconciled_items": [
+            {"date": "2025-03-31", "description": "Vendor invoice not entered", "amount": 2500, "status": "timing"},
+        ],
+        "status": "complete",
+        "last_reconciled": "2025-02-28",
+    },
+})
+
+# Column-oriented view of the reconciliations for summary and lookup queries
+RECONCILIATION_FRAME = pd.DataFrame(
+    {
+        "account_number": list(RECONCILIATIONS.keys()),
+        "account_name": [recon["account_name"] for recon in RECONCILIATIONS.values()],
+        "type": [recon["type"] for recon in RECONCILIATIONS.values()],
+        "status": [recon["status"] for recon in RECONCILIATIONS.values()],
+        "gl_balance": [recon["gl_balance"] for recon in RECONCILIATIONS.values()],
+        "comparison_balance": [recon[f"{recon['type']}_balance"] for recon in RECONCILIATIONS.values()],
+        "unreconciled_count": [len(recon["unreconciled_items"]) for recon in RECONCILIATIONS.values()],
+    }
+)
+RECONCILIATION_FRAME["difference"] = RECONCILIATION_FRAME["gl_balance"] - RECONCILIATION_FRAME["comparison_balance"]
+RECONCILIATION_FRAME["name_lc"] = RECONCILIATION_FRAME["account_name"].str.lower()
+
+
+@dataclass(slots=True)
+class ReconciliationSummary:
+    """Per-account row of the reconciliation summary."""
+    account_number: str
+    account_name: str
+    type: str
+    status: str
+    gl_balance: int
+    comparison_balance: int
+    difference: int
+    unreconciled_count: int
+
+
+# Columns returned for each account in the reconciliation summary
+RECONCILIATION_SUMMARY_COLUMNS = [field.name for field in fields(ReconciliationSummary)]
+
+
+@dataclass(slots=True, frozen=True)
+class BalanceSheetTotals:
+    """Headline totals of a balance sheet."""
+    date: str
+    current_assets: float
+    inventory: float
+    non_current_assets: float
+    total_assets: float
+    current_liabilities: float
+    non_current_liabilities: float
+    total_liabilities: float
+    total_equity: float
+    total_liabilities_equity: float
+
+    @classmethod
+    def from_statement(cls, statement: Dict) -> "BalanceSheetTotals":
+        """Extract the totals from a nested balance sheet dict."""
+        return cls(
+            date=statement['date'],
+            current_assets=_total_current_assets(statement),
+            inventory=statement['assets']['current_assets']['inventory'],
+            non_current_assets=statement['assets']['non_current_assets']['total_non_current_assets'],
+            total_assets=_total_assets(statement),
+            current_liabilities=_total_current_liabilities(statement),
+            non_current_liabilities=_total_non_current_liabilities(statement),
+            total_liabilities=_total_liabilities(statement),
+            total_equity=_total_equity(statement),
+            total_liabilities_equity=statement['liabilities_equity']['total_liabilities_equity'],
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class IncomeStatementTotals:
+    """Headline totals of an income statement."""
+    period: str
+    revenue: float
+    cost_of_sales: float
+    gross_profit: float
+    operating_expenses: float
+    operating_income: float
+    income_before_tax: float
+    net_income: float
+
+    @classmethod
+    def from_statement(cls, statement: Dict) -> "IncomeStatementTotals":
+        """Extract the totals from a nested income statement dict."""
+        return cls(
+            period=statement['period'],
+            revenue=statement['revenue']['total_revenue'],
+            cost_of_sales=statement['cost_of_sales']['total_cost_of_sales'],
+            gross_profit=statement['gross_profit'],
+            operating_expenses=statement['operating_expenses']['total_operating_expenses'],
+            operating_income=statement['operating_income'],
+            income_before_tax=statement['income_before_tax'],
+            net_income=statement['net_income'],
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class CashFlowTotals:
+    """Headline totals of a cash flow statement."""
+    period: str
+    net_income: float
+    operating: float
+    capital_expenditures: float
+    investing: float
+    financing: float
+    net_change_in_cash: float
+    beginning_cash: float
+    ending_cash: float
+
+    @classmethod
+    def from_statement(cls, statement: Dict) -> "CashFlowTotals":
+        """Extract the totals from a nested cash flow statement dict."""
+        return cls(
+            period=statement['period'],
+            net_income=statement['operating_activities']['net_income'],
+            operating=statement['operating_activities']['net_cash_from_operating'],
+            capital_expenditures=statement['investing_activities']['capital_expenditures'],
+            investing=statement['investing_activities']['net_cash_from_investing'],
+            financing=statement['financing_activities']['net_cash_from_financing'],
+            net_change_in_cash=statement['net_change_in_cash'],
+            beginning_cash=statement['beginning_cash'],
+            ending_cash=statement['ending_cash'],
+        )
+
+
+# Sample financial statement data (would come from accounting system in real implementation).
+# Only the top level is read-only, so responses return deep copies of the statements.
+FINANCIAL_DATA = MappingProxyType({
+    "balance_sheet": {
+        "current": {
+            "date": "2025-03-31",
+            "assets": {
+                "current_assets": {
+                    "cash": 1250000,
+                    "accounts_receivable": 850000,
+                    "inventory": 750000,
+                    "prepaid_expenses": 125000,
+                    "total_current_assets": 2975000,
+                },
+                "non_current_assets": {
+                    "property_plant_equipment": 3500000,
+                    "accumulated_depreciation": -850000,
+                    "intangible_assets": 750000,
+                    "investments": 1200000,
+                    "total_non_current_assets": 4600000,
+                },
+                "total_assets": 7575000,
+            },
+            "liabilities_equity": {
+                "current_liabilities": {
+                    "accounts_payable": 650000,
+                    "accrued_expenses": 225000,
+                    "short_term_debt": 300000,
+                    "current_portion_long_term_debt": 250000,
+                    "total_current_liabilities": 1425000,
+                },
+                "non_current_liabilities": {
+                    "long_term_debt": 2250000,
+                    "deferred_tax_liabilities": 150000,
+                    "total_non_current_liabilities": 2400000,
+                },
+                "equity": {
+                    "common_stock": 1000000,
+                    "retained_earnings": 2750000,
+                    "total_equity": 3750000,
+                },
+                "total_liabilities_equity": 7575000,
+            },
+        },
+        "previous": {
+            "date": "2024-12-31",
+            "assets": {
+                "current_assets": {
+                    "cash": 1175000,
+                    "accounts_receivable": 825000,
+                    "inventory": 725000,
+                    "prepaid_expenses": 110000,
+                    "total_current_assets": 2835000,
+                },
+                "non_current_assets": {
+                    "property_plant_equipment": 3450000,
+                    "accumulated_depreciation": -800000,
+                    "intangible_assets": 775000,
+                    "investments": 1150000,
+                    "total_non_current_assets": 4575000,
+                },
+                "total_assets": 7410000,
+            },
+            "liabilities_equity": {
+                "current_liabilities": {
+                    "accounts_payable": 675000,
+                    "accrued_expenses": 200000,
+                    "short_term_debt": 350000,
+                    "current_portion_long_term_debt": 250000,
+                    "total_current_liabilities": 1475000,
+                },
+                "non_current_liabilities": {
+                    "long_term_debt": 2350000,
+                    "deferred_tax_liabilities": 135000,
+                    "total_non_current_liabilities": 2485000,
+                },
+                "equity": {
+                    "common_stock": 1000000,
+                    "retained_earnings": 2450000,
+                    "total_equity": 3450000,
+                },
+                "total_liabilities_equity": 7410000,
+            },
+        },
+    },
+    "income_statement": {
+        "current": {
+            "period": "Q1 2025",
+            "revenue": {
+                "product_revenue": 2200000,
+                "service_revenue": 1300000,
+                "total_revenue": 3500000,
+            },
+            "cost_of_sales": {
+                "product_costs": 1350000,
+                "service_costs": 750000,
+                "total_cost_of_sales": 2100000,
+            },
+            "gross_profit": 1400000,
+            "operating_expenses": {
+                "salaries_wages": 750000,
+                "rent": 95000,
+                "utilities": 45000,
+                "depreciation": 50000,
+                "other_expenses": 60000,
+                "total_operating_expenses": 950000,
+            },
+            "operating_income": 450000,
+            "other_income_expense": {
+                "interest_expense": 125000,
+                "interest_income": 35000,
+                "total_other_income_expense": -90000,
+            },
+            "income_before_tax": 360000,
+            "tax_expense": 90000,
+            "net_income": 270000,
+        },
+        "previous": {
+            "period": "Q1 2024",
+            "revenue": {
+                "product_revenue": 2050000,
+                "service_revenue": 1150000,
+                "total_revenue": 3200000,
+            },
+            "cost_of_sales": {
+                "product_costs": 1280000,
+                "service_costs": 670000,
+                "total_cost_of_sales": 1950000,
+            },
+            "gross_profit": 1250000,
+            "operating_expenses": {
+                "salaries_wages": 690000,
+                "rent": 90000,
+                "utilities": 40000,
+                "depreciation": 45000,
+                "other_expenses": 55000,
+                "total_operating_expenses": 880000,
+            },
+            "operating_income": 370000,
+            "other_income_expense": {
+                "interest_expense": 130000,
+                "interest_income": 25000,
+                "total_other_income_expense": -105000,
+            },
+            "income_before_tax": 265000,
+            "tax_expense": 66250,
+            "net_income": 198750,
+        },
+    },
+    "cash_flow_statement": {
+        "current": {
+            "period": "Q1 2025",
+            "operating_activities": {
+                "net_income": 270000,
+                "adjustments": {
+                    "depreciation": 50000,
+                    "changes_in_working_capital": {
+                        "accounts_receivable": -25000,
+                        "inventory": -25000,
+                        "prepaid_expenses": -15000,
+                        "accounts_payable": -25000,
+                        "accrued_expenses": 25000,
+                    },
+                    "total_adjustments": 10000,
+                },
+                "net_cash_from_operating": 280000,
+            },
+            "investing_activities": {
+                "capital_expenditures": -100000,
+                "investments": -50000,
+                "net_cash_from_investing": -150000,
+            },
+            "financing_activities": {
+                "debt_repayments": -100000,
+                "dividends_paid": 0,
+                "net_cash_from_financing": -100000,
+            },
+            "net_change_in_cash": 30000,
+            "beginning_cash": 1220000,
+            "ending_cash": 1250000,
+        },
+        "previous": {
+            "period": "Q1 2024",
+            "operating_activities": {
+                "net_income": 198750,
+                "adjustments": {
+                    "depreciation": 45000,
+                    "changes_in_working_capital": {
+                        "accounts_receivable": -30000,
+                        "inventory": -20000,
+                        "prepaid_expenses": -5000,
+                        "accounts_payable": 15000,
+                        "accrued_expenses": 10000,
+                    },
+                    "total_adjustments": 15000,
+                },
+                "net_cash_from_operating": 213750,
+            },
+            "investing_activities": {
+                "capital_expenditures": -85000,
+                "investments": -25000,
+                "net_cash_from_investing": -110000,
+            },
+            "financing_activities": {
+                "debt_repayments": -75000,
+                "dividends_paid": 0,
+                "net_cash_from_financing": -75000,
+            },
+            "net_change_in_cash": 28750,
+            "beginning_cash": 1110000,
+            "ending_cash": 1138750,
+        },
+    },
+})
+
+
+@njit(cache=True)
+def _bs_ratios(
+    current_assets: float,
+    current_liabilities: float,
+    inventory: float,
+    total_assets: float,
+    total_liabilities: float,
+    total_equity: float,
+) -> Tuple[float, float, float, float]:
+    """Liquidity and leverage ratios: (current, quick, debt to assets, debt to equity)."""
+    current_ratio = current_assets / current_liabilities if current_liabilities != 0.0 else np.inf
+    quick_ratio = (current_assets - inventory) / current_liabilities if current_liabilities != 0.0 else np.inf
+    debt_to_assets = total_liabilities / total_assets if total_assets != 0.0 else np.inf
+    debt_to_equity = total_liabilities / total_equity if total_equity != 0.0 else np.inf
+    return current_ratio, quick_ratio, debt_to_assets, debt_to_equity
+
+
+@njit(cache=True)
+def _is_ratios(
+    revenue: float,
+    gross_profit: float,
+    operating_income: float,
+    net_income: float,
+    total_assets: float,
+    total_equity: float,
+) -> Tuple[float, float, float, float, float]:
+    """Profitability and return ratios: (gross, operating, net margin, ROA, ROE)."""
+    gross_margin = gross_profit / revenue if revenue != 0.0 else 0.0
+    operating_margin = operating_income / revenue if revenue != 0.0 else 0.0
+    net_margin = net_income / revenue if revenue != 0.0 else 0.0
+    return_on_assets = net_income / total_assets if total_assets != 0.0 else 0.0
+    return_on_equity = net_income / total_equity if total_equity != 0.0 else 0.0
+    return gross_margin, operating_margin, net_margin, return_on_assets, return_on_equity
+
+
+@lru_cache(maxsize=512)
+def _compute_ratios(statement_type: str, time_period: str) -> MappingProxyType:
+    """
+    Compute the key financial ratios for a statement, memoized per period.
+
+    Args:
+        statement_type: Key into FINANCIAL_DATA
+        time_period: Period of the statement to analyze
+
+    Returns:
+        Read-only mapping of ratio name to value
+    """
+    current_data = FINANCIAL_DATA[statement_type][time_period]
+    balance_sheet = FINANCIAL_DATA.get("balance_sheet", {}).get(time_period)
+    if balance_sheet is not None:
+        balance_sheet = BalanceSheetTotals.from_statement(balance_sheet)
+    ratios = {}
+
+    if statement_type == "balance_sheet":
+        (
+            ratios["current_ratio"],
+            ratios["quick_ratio"],
+            ratios["debt_to_assets"],
+            ratios["debt_to_equity"],
+        ) = _bs_ratios(
+            float(balance_sheet.current_assets),
+            float(balance_sheet.current_liabilities),
+            float(balance_sheet.inventory),
+            float(balance_sheet.total_assets),
+            float(balance_sheet.total_liabilities),
+            float(balance_sheet.total_equity),
+        )
+
+    elif statement_type == "income_statement":
+        income_statement = IncomeStatementTotals.from_statement(current_data)
+
+        # Return ratios need the balance sheet for the same period
+        total_assets = total_equity = 0.0
+        if balance_sheet is not None:
+            total_assets = float(balance_sheet.total_assets)
+            total_equity = float(balance_sheet.total_equity)
+
+        gross_margin, operating_margin, net_margin, return_on_assets, return_on_equity = _is_ratios(
+            float(income_statement.revenue),
+            float(income_statement.gross_profit),
+            float(income_statement.operating_income),
+            float(income_statement.net_income),
+            total_assets,
+            total_equity,
+        )
+        ratios["gross_margin"] = gross_margin
+        ratios["operating_margin"] = operating_margin
+        ratios["net_margin"] = net_margin
+        if balance_sheet is not None:
+            ratios["return_on_assets"] = return_on_assets
+            ratios["return_on_equity"] = return_on_equity
+
+    elif statement_type == "cash_flow_statement":
+        cash_flow = CashFlowTotals.from_statement(current_data)
+        operating_cash_flow = cash_flow.operating
+        ratios["free_cash_flow"] = operating_cash_flow + cash_flow.capital_expenditures
+
+        income_statement = FINANCIAL_DATA.get("income_statement", {}).get(time_period)
+        if income_statement is not None:
+            # Cash flow ratios
+            net_income = income_statement['net_income']
+            ratios["operating_cash_flow_ratio"] = operating_cash_flow / net_income if net_income != 0 else float('inf')
+
+            if balance_sheet is not None:
+                total_liabilities = balance_sheet.total_liabilities
+                ratios["cash_flow_to_debt"] = operating_cash_flow / total_liabilities if total_liabilities != 0 else float('inf')
+        else:
+            ratios["operating_cash_flow"] = operating_cash_flow
+            ratios["operating_cash_flow_to_capex"] = operating_cash_flow / abs(cash_flow.capital_expenditures)
+
+    return MappingProxyType(ratios)
+
+
+def _build_ratio_section(statement_type: str, time_period: str) -> str:
+    """
+    Render the key financial ratios section of the analysis prompt.
+
+    Args:
+        statement_type: Key into FINANCIAL_DATA
+        time_period: Period of the statement being analyzed
+
+    Returns:
+        Ratio section text
+    """
+    ratios = _compute_ratios(statement_type, time_period)
+    parts = [RATIO_SECTION_HEADER]
+
+    if statement_type == "balance_sheet":
+        parts.append(BALANCE_SHEET_RATIOS_TEMPLATE.format_map(ratios))
+
+    elif statement_type == "income_statement":
+        parts.append(PROFITABILITY_RATIOS_TEMPLATE.format_map(ratios))
+        if "return_on_assets" in ratios:
+            parts.append(RETURN_RATIOS_TEMPLATE.format_map(ratios))
+
+    elif statement_type == "cash_flow_statement":
+        if "operating_cash_flow_ratio" in ratios:
+            parts.append(CASH_FLOW_RATIOS_TEMPLATE.format_map(ratios))
+            if "cash_flow_to_debt" in ratios:
+                parts.append(CASH_FLOW_TO_DEBT_TEMPLATE.format_map(ratios))
+            parts.append(FREE_CASH_FLOW_TEMPLATE.format_map(ratios))
+        else:
+            parts.append(CASH_FLOW_METRICS_TEMPLATE.format_map(ratios))
+
+    return "".join(parts)
+
+
+# Extra prompt sections by analysis type; other analysis types rely on the
+# statement (and comparison) text alone
+ANALYSIS_SECTION_BUILDERS = MappingProxyType({
+    "ratio": _build_ratio_section,
+})
+
+
+def _build_system_prompt(
+    statement_type: str,
+    analysis_type: str,
+    time_period: str,
+    current_data: Dict,
+    comparison_data: Optional[Dict] = None,
+) -> str:
+    """
+    Build the system prompt for a financial statement analysis.
+
+    Args:
+        statement_type: Key into FINANCIAL_DATA
+        analysis_type: Requested analysis, e.g. "ratio" or "trend"
+        time_period: Period of the statement being analyzed
+        current_data: Statement data for the analyzed period
+        comparison_data: Statement data for the comparison period, if any
+
+    Returns:
+        System prompt without the retrieved context
+    """
+    # Prompt pieces are collected in a list and joined once
+    statement_name = statement_type.replace('_', ' ')
+    parts = [
+        STATEMENT_ANALYSIS_PROMPT.format(analysis_type=analysis_type, statement_name=statement_name),
+        STATEMENT_PROMPT_BUILDERS[statement_type](current_data, comparison_data),
+    ]
+
+    # Add the section specific to the analysis type, if it has one
+    section_builder = ANALYSIS_SECTION_BUILDERS.get(analysis_type)
+    if section_builder is not None:
+        parts.append(section_builder(statement_type, time_period))
+
+    parts.append(STATEMENT_ANALYSIS_INSTRUCTIONS.format(analysis_type=analysis_type, statement_name=statement_name))
+    return "".join(parts)
+
 
 async def handle_general_ledger(entities: Dict) -> Dict:
     """
@@ -210,7 +1402,7 @@ async def handle_general_ledger(entities: Dict) -> Dict:
 
             Account: {account_number} - {account['name']}
             Type: {account['type'].title()}
-            Category: {account['category'].replace('_', ' ').title()}
+            Category: {_pretty(account['category'])}
             Normal Balance: {account['normal_balance'].title()}
 
             Period: {start_date} to {end_date}
@@ -287,7 +1479,7 @@ async def handle_general_ledger(entities: Dict) -> Dict:
             "transactions": transactions,
             "message": (
                 f"General Ledger Account: {account_number} - {account['name']}\n"
-                f"Type: {account['type'].title()}, Category: {account['category'].replace('_', ' ').title()}\n"
+                f"Type: {account['type'].title()}, Category: {_pretty(account['category'])}\n"
                 f"Normal Balance: {account['normal_balance'].title()}\n\n"
                 f"Date Range: {start_date} to {end_date}\n"
                 f"Beginning Balance: ${account['balance'] - period_net:,.2f}\n"
@@ -386,19 +1578,18 @@ async def handle_general_ledger(entities: Dict) -> Dict:
                 "total_expenses": total_expenses,
                 "net_income": net_income,
             },
-            "message": (
-                f"General Ledger Summary as of {end_date}:\n\n"
-                f"Assets: ${total_assets:,.2f}\n"
-                f"Liabilities: ${total_liabilities:,.2f}\n"
-                f"Equity: ${total_equity:,.2f}\n"
-                f"Revenue: ${total_revenue:,.2f}\n"
-                f"Expenses: ${total_expenses:,.2f}\n"
-                f"Net Income: ${net_income:,.2f}\n\n"
-                "Top Accounts by Type:\n" +
-                "\n".join([
-                    f"{acct_type.title()}: ${totals_by_type[acct_type]:,.2f}"
+            "message": GL_SUMMARY_TEMPLATE.format(
+                end_date=end_date,
+                assets=_fmt_amount(total_assets),
+                liabilities=_fmt_amount(total_liabilities),
+                equity=_fmt_amount(total_equity),
+                revenue=_fmt_amount(total_revenue),
+                expenses=_fmt_amount(total_expenses),
+                net_income=_fmt_amount(net_income),
+                by_type="\n".join([
+                    f"{acct_type.title()}: {_fmt_amount(totals_by_type[acct_type])}"
                     for acct_type in sorted(totals_by_type.keys())
-                ])
+                ]),
             ),
         }
 
@@ -544,7 +1735,7 @@ async def handle_journal_entry(entities: Dict) -> Dict:
         system_prompt = f"""
         You are an accounting expert creating a journal entry. Provide a properly formatted journal entry for a {entry_type} transaction.
 
-        Current date: {datetime.datetime.now().strftime("%Y-%m-%d")}
+        Current date: {datetime.date.today().isoformat()}
 
         Available accounts:
         """
@@ -645,165 +1836,93 @@ async def handle_account_reconciliation(entities: Dict) -> Dict:
     # Extract relevant entities
     account_number = entities.get("account_number")
     account_name = entities.get("account_name")
-    reconciliation_date = entities.get("date", datetime.datetime.now().strftime("%Y-%m-%d"))
+    reconciliation_date = entities.get("date", datetime.date.today().isoformat())
     reconciliation_type = entities.get("reconciliation_type", "bank")
 
-    # Sample reconciliation data (would come from accounting system in real implementation)
-    reconciliations = {
-        "1000": {  # Cash
-            "account_name": "Cash",
-            "type": "bank",
-            "as_of_date": "2025-03-31",
-            "gl_balance": 1250000,
-            "bank_balance": 1275000,
-            "reconciled_balance": 1250000,
-            "unreconciled_items": [
-                {"date": "2025-03-30", "description": "Check #12345", "amount": -15000, "status": "outstanding"},
-                {"date": "2025-03-31", "description": "Deposit in transit", "amount": 40000, "status": "in_transit"},
-                {"date": "2025-03-29", "description": "Bank fee", "amount": -50, "status": "unrecorded"},
-            ],
-            "status": "in_progress",
-            "last_reconciled": "2025-02-28",
-        },
-        "1010": {  # Accounts Receivable
-            "account_name": "Accounts Receivable",
-            "type": "subledger",
-            "as_of_date": "2025-03-31",
-            "gl_balance": 850000,
-            "subledger_balance": 852500,
-            "reconciled_balance": 850000,
-            "unreconciled_items": [
-                {"date": "2025-03-31", "description": "Customer payment not posted", "amount": -2500, "status": "timing"},
-            ],
-            "status": "complete",
-            "last_reconciled": "2025-02-28",
-        },
-        "1020": {  # Inventory
-            "account_name": "Inventory",
-            "type": "physical",
-            "as_of_date": "2025-03-31",
-            "gl_balance": 750000,
-            "physical_count": 758000,
-            "reconciled_balance": 750000,
-            "unreconciled_items": [
-                {"date": "2025-03-31", "description": "Goods in transit", "amount": -5000, "status": "timing"},
-                {"date": "2025-03-30", "description": "Count discrepancy", "amount": 3000, "status": "unexplained"},
-            ],
-            "status": "in_progress",
-            "last_reconciled": "2025-02-28",
-        },
-        "2000": {  # Accounts Payable
-            "account_name": "Accounts Payable",
-            "type": "subledger",
-            "as_of_date": "2025-03-31",
-            "gl_balance": 650000,
-            "subledger_balance": 647500,
-            "reconciled_balance": 650000,
-            "unreconciled_items": [
-                {"date": "2025-03-31", "description": "Vendor invoice not entered", "amount": 2500, "status": "timing"},
-            ],
-            "status": "complete",
-            "last_reconciled": "2025-02-28",
-        },
-    }
+    # Resolve an account name; a unique match is handled as an account number request
+    matching_accounts = None
+    if not account_number and account_name:
+        name_matches = RECONCILIATION_FRAME["name_lc"].str.contains(account_name.lower(), regex=False)
+        matching_accounts = {
+            num: RECONCILIATIONS[num] for num in RECONCILIATION_FRAME.loc[name_matches, "account_number"]
+        }
+
+        if not matching_accounts:
+            return {
+                "error": f"No reconciliations found matching '{account_name}'",
+                "available_accounts": [f"{num}: {recon['account_name']}" for num, recon in RECONCILIATIONS.items()]
+            }
+
+        if len(matching_accounts) == 1:
+            # Exactly one match, get the account number
+            account_number = next(iter(matching_accounts.keys()))
 
     # If specific account requested by number
     if account_number:
-        if account_number not in reconciliations:
+        if account_number not in RECONCILIATIONS:
             return {
                 "error": f"Reconciliation for account {account_number} not found",
-                "available_accounts": list(reconciliations.keys())
+                "available_accounts": list(RECONCILIATIONS.keys())
             }
 
-        reconciliation = reconciliations[account_number]
+        reconciliation = RECONCILIATIONS[account_number]
 
-        # Calculate statistics
-        total_unreconciled = sum(item["amount"] for item in reconciliation["unreconciled_items"])
-        abs_diff = abs(reconciliation["gl_balance"] - reconciliation[f"{reconciliation['type']}_balance"])
-
-        # Get context from RAG for reconciliation guidance
+        # Get context from RAG for reconciliation guidance (runs while the prompt is built)
         query = f"{reconciliation['type']} reconciliation {reconciliation['account_name']}"
-        context = await rag_module.generate_context(
-            query, filter_criteria={"category": "accounting"}
-        )
+        filter_criteria = {"category": "accounting"}
+        rag_task = asyncio.create_task(cached_generate_context(query, filter_criteria=filter_criteria))
 
         # Generate reconciliation guidance using LLM
-        system_prompt = f"""
-        You are an accounting reconciliation specialist. Provide guidance for reconciling this account:
-
-        Account: {account_number} - {reconciliation['account_name']}
-        Reconciliation Type: {reconciliation['type'].replace('_', ' ').title()}
-        As of Date: {reconciliation['as_of_date']}
-
-        GL Balance: ${reconciliation['gl_balance']:,.2f}
-        {reconciliation['type'].title()} Balance: ${reconciliation[f"{reconciliation['type']}_balance"]:,.2f}
-        Difference: ${reconciliation['gl_balance'] - reconciliation[f"{reconciliation['type']}_balance"]:,.2f}
-
-        Unreconciled Items:
-        """
-
-        for item in reconciliation["unreconciled_items"]:
-            system_prompt += f"- {item['date']}: {item['description']}, ${item['amount']:,.2f} ({item['status']})\n"
-
-        system_prompt += f"""
-
-        Current Status: {reconciliation['status'].replace('_', ' ').title()}
-        Last Reconciled: {reconciliation['last_reconciled']}
-
-        Provide detailed guidance for completing this reconciliation, including:
-        1. Assessment of current reconciliation status
-        2. Recommendations for addressing unreconciled items
-        3. Step-by-step process to complete the reconciliation
-        4. Best practices for this type of reconciliation
-        5. Any potential red flags or issues to investigate
-
-        Focus on practical, actionable advice that would help an accountant complete this reconciliation accurately and efficiently.
-        """
+        unreconciled_lines = "".join(
+            f"- {item['date']}: {item['description']}, {_fmt_amount(item['amount'])} ({item['status']})\n"
+            for item in reconciliation["unreconciled_items"]
+        )
+        comparison_balance = reconciliation[f"{reconciliation['type']}_balance"]
+        difference = reconciliation["gl_balance"] - comparison_balance
+        system_prompt = RECONCILIATION_GUIDANCE_PROMPT.format(
+            account_number=account_number,
+            account_name=reconciliation["account_name"],
+            reconciliation_type=_pretty(reconciliation["type"]),
+            as_of_date=reconciliation["as_of_date"],
+            gl_balance=_fmt_amount(reconciliation["gl_balance"]),
+            balance_label=reconciliation["type"].title(),
+            comparison_balance=_fmt_amount(comparison_balance),
+            difference=_fmt_amount(difference),
+            unreconciled_items=unreconciled_lines,
+            status=_pretty(reconciliation["status"]),
+            last_reconciled=reconciliation["last_reconciled"],
+        )
 
+        context = await rag_task
         if context:
             system_prompt += f"\n\nAdditional relevant context:\n{context}"
 
-        guidance = await generate_text(
-            prompt=f"Provide guidance for reconciling {reconciliation['account_name']} account",
-            system_prompt=system_prompt,
+        prompt = f"Provide guidance for reconciling {reconciliation['account_name']} account"
+        guidance = await _cached_generate(
+            ("llm", prompt, system_prompt),
+            lambda: generate_text(prompt=prompt, system_prompt=system_prompt),
         )
 
+        total_unreconciled = sum(item["amount"] for item in reconciliation["unreconciled_items"])
+
         return {
             "account_number": account_number,
             "account_name": reconciliation["account_name"],
             "reconciliation_type": reconciliation["type"],
             "as_of_date": reconciliation["as_of_date"],
             "gl_balance": reconciliation["gl_balance"],
-            "comparison_balance": reconciliation[f"{reconciliation['type']}_balance"],
-            "difference": reconciliation["gl_balance"] - reconciliation[f"{reconciliation['type']}_balance"],
+            "comparison_balance": comparison_balance,
+            "difference": difference,
             "reconciled_balance": reconciliation["reconciled_balance"],
-            "unreconciled_items": reconciliation["unreconciled_items"],
+            "unreconciled_items": [dict(item) for item in reconciliation["unreconciled_items"]],
             "total_unreconciled": total_unreconciled,
             "status": reconciliation["status"],
             "last_reconciled": reconciliation["last_reconciled"],
             "guidance": guidance,
         }
 
-    # If specific account requested by name
-    elif account_name:
-        matching_accounts = {num: recon for num, recon in reconciliations.items() if account_name.lower() in recon["account_name"].lower()}
-
-        if not matching_accounts:
-            return {
-                "error": f"No reconciliations found matching '{account_name}'",
-                "available_accounts": [f"{num}: {recon['account_name']}" for num, recon in reconciliations.items()]
-            }
-
-        if len(matching_accounts) == 1:
-            # Exactly one match, get the account number
-            account_number = next(iter(matching_accounts.keys()))
-            # Recursively call with the account number
-            return await handle_account_reconciliation({
-                "account_number": account_number,
-                "date": reconciliation_date,
-                "reconciliation_type": reconciliation_type,
-            })
-
+    # If specific account requested by name, with several matching accounts
+    elif matching_accounts:
         # Multiple matches, return list of matching accounts
         return {
             "matching_accounts": [
@@ -826,57 +1945,94 @@ async def handle_account_reconciliation(entities: Dict) -> Dict:
     # Return summary of all reconciliations
     else:
         # Filter by reconciliation type if specified
-        filtered_reconciliations = reconciliations
+        frame = RECONCILIATION_FRAME
         if reconciliation_type != "all":
-            filtered_reconciliations = {
-                num: recon for num, recon in reconciliations.items()
-                if recon["type"] == reconciliation_type
-            }
+            frame = frame[frame["type"] == reconciliation_type]
 
         # Calculate statistics
-        complete_count = sum(1 for recon in filtered_reconciliations.values() if recon["status"] == "complete")
-        in_progress_count = sum(1 for recon in filtered_reconciliations.values() if recon["status"] == "in_progress")
-        not_started_count = sum(1 for recon in filtered_reconciliations.values() if recon["status"] == "not_started")
+        status_counts = frame["status"].value_counts()
+        complete_count = int(status_counts.get("complete", 0))
+        in_progress_count = int(status_counts.get("in_progress", 0))
+        not_started_count = int(status_counts.get("not_started", 0))
+        total_count = len(frame)
+        completion_percentage = complete_count / total_count * 100 if total_count else 0
+
+        reconciliation_list = [
+            ReconciliationSummary(*row)
+            for row in frame[RECONCILIATION_SUMMARY_COLUMNS].itertuples(index=False, name=None)
+        ]
+        message_lines = [
+            f"- {recon.account_number}: {recon.account_name} ({_pretty(recon.status)}), "
+            f"Diff: {_fmt_amount(recon.difference)}"
+            for recon in reconciliation_list
+        ]
 
         return {
             "reconciliation_type": reconciliation_type,
             "as_of_date": reconciliation_date,
             "statistics": {
-                "total": len(filtered_reconciliations),
+                "total": total_count,
                 "complete": complete_count,
                 "in_progress": in_progress_count,
                 "not_started": not_started_count,
-                "completion_percentage": complete_count / len(filtered_reconciliations) * 100 if filtered_reconciliations else 0,
+                "completion_percentage": completion_percentage,
             },
-            "reconciliations": [
-                {
-                    "account_number": num,
-                    "account_name": recon["account_name"],
-                    "type": recon["type"],
-                    "status": recon["status"],
-                    "gl_balance": recon["gl_balance"],
-                    "comparison_balance": recon[f"{recon['type']}_balance"],
-                    "difference": recon["gl_balance"] - recon[f"{recon['type']}_balance"],
-                    "unreconciled_count": len(recon["unreconciled_items"]),
-                } for num, recon in filtered_reconciliations.items()
-            ],
+            "reconciliations": reconciliation_list,
             "message": (
                 f"Reconciliation Summary as of {reconciliation_date}:\n"
-                f"Total Reconciliations: {len(filtered_reconciliations)}\n"
+                f"Total Reconciliations: {total_count}\n"
                 f"Complete: {complete_count}\n"
                 f"In Progress: {in_progress_count}\n"
                 f"Not Started: {not_started_count}\n"
-                f"Completion Percentage: {complete_count / len(filtered_reconciliations) * 100 if filtered_reconciliations else 0:.1f}%\n\n"
+                f"Completion Percentage: {completion_percentage:.1f}%\n\n"
                 "Reconciliations:\n" +
-                "\n".join([
-                    f"- {num}: {recon['account_name']} ({recon['status'].replace('_', ' ').title()}), "
-                    f"Diff: ${recon['gl_balance'] - recon[f'{recon['type']}_balance']:,.2f}"
-                    for num, recon in filtered_reconciliations.items()
-                ])
+                "\n".join(message_lines)
             ),
         }
 
 
+async def _analysis_prompts(
+    statement_type: str,
+    analysis_type: str,
+    time_period: str,
+    current_data: Dict,
+    comparison_data: Optional[Dict] = None,
+) -> Tuple[str, str]:
+    """
+    Build the user and system prompts for a financial statement analysis.
+
+    Args:
+        statement_type: Key into FINANCIAL_DATA
+        analysis_type: Requested analysis, e.g. "ratio" or "trend"
+        time_period: Period of the statement being analyzed
+        current_data: Statement data for the analyzed period
+        comparison_data: Statement data for the comparison period, if any
+
+    Returns:
+        Tuple of (prompt, system prompt)
+    """
+    # Get RAG context for financial analysis (runs while the prompt is built)
+    query = f"financial statement analysis {statement_type} {analysis_type}"
+    filter_criteria = {"category": "accounting"}
+    rag_task = asyncio.create_task(cached_generate_context(query, filter_criteria=filter_criteria))
+
+    # Build the analysis prompt off the event loop while the RAG lookup
+    # runs and the LLM client is readied
+    system_prompt, context, _ = await asyncio.gather(
+        asyncio.to_thread(
+            _build_system_prompt, statement_type, analysis_type, time_period, current_data, comparison_data
+        ),
+        rag_task,
+        ensure_session(),
+    )
+    if context:
+        system_prompt = f"{system_prompt}\n\nAdditional relevant context for analysis:\n{context}"
+
+    statement_name = statement_type.replace('_', ' ')
+    prompt = f"Perform {analysis_type} analysis on the {statement_name}"
+    return prompt, system_prompt
+
+
 async def handle_financial_statement(entities: Dict) -> Dict:
     """
     Generate or analyze financial statements.
@@ -893,228 +2049,14 @@ async def handle_financial_statement(entities: Dict) -> Dict:
     comparison = entities.get("comparison", False)
     analysis_type = entities.get("analysis_type", "overview")
 
-    # Sample financial statement data (would come from accounting system in real implementation)
-    financial_data = {
-        "balance_sheet": {
-            "current": {
-                "date": "2025-03-31",
-                "assets": {
-                    "current_assets": {
-                        "cash": 1250000,
-                        "accounts_receivable": 850000,
-                        "inventory": 750000,
-                        "prepaid_expenses": 125000,
-                        "total_current_assets": 2975000,
-                    },
-                    "non_current_assets": {
-                        "property_plant_equipment": 3500000,
-                        "accumulated_depreciation": -850000,
-                        "intangible_assets": 750000,
-                        "investments": 1200000,
-                        "total_non_current_assets": 4600000,
-                    },
-                    "total_assets": 7575000,
-                },
-                "liabilities_equity": {
-                    "current_liabilities": {
-                        "accounts_payable": 650000,
-                        "accrued_expenses": 225000,
-                        "short_term_debt": 300000,
-                        "current_portion_long_term_debt": 250000,
-                        "total_current_liabilities": 1425000,
-                    },
-                    "non_current_liabilities": {
-                        "long_term_debt": 2250000,
-                        "deferred_tax_liabilities": 150000,
-                        "total_non_current_liabilities": 2400000,
-                    },
-                    "equity": {
-                        "common_stock": 1000000,
-                        "retained_earnings": 2750000,
-                        "total_equity": 3750000,
-                    },
-                    "total_liabilities_equity": 7575000,
-                },
-            },
-            "previous": {
-                "date": "2024-12-31",
-                "assets": {
-                    "current_assets": {
-                        "cash": 1175000,
-                        "accounts_receivable": 825000,
-                        "inventory": 725000,
-                        "prepaid_expenses": 110000,
-                        "total_current_assets": 2835000,
-                    },
-                    "non_current_assets": {
-                        "property_plant_equipment": 3450000,
-                        "accumulated_depreciation": -800000,
-                        "intangible_assets": 775000,
-                        "investments": 1150000,
-                        "total_non_current_assets": 4575000,
-                    },
-                    "total_assets": 7410000,
-                },
-                "liabilities_equity": {
-                    "current_liabilities": {
-                        "accounts_payable": 675000,
-                        "accrued_expenses": 200000,
-                        "short_term_debt": 350000,
-                        "current_portion_long_term_debt": 250000,
-                        "total_current_liabilities": 1475000,
-                    },
-                    "non_current_liabilities": {
-                        "long_term_debt": 2350000,
-                        "deferred_tax_liabilities": 135000,
-                        "total_non_current_liabilities": 2485000,
-                    },
-                    "equity": {
-                        "common_stock": 1000000,
-                        "retained_earnings": 2450000,
-                        "total_equity": 3450000,
-                    },
-                    "total_liabilities_equity": 7410000,
-                },
-            },
-        },
-        "income_statement": {
-            "current": {
-                "period": "Q1 2025",
-                "revenue": {
-                    "product_revenue": 2200000,
-                    "service_revenue": 1300000,
-                    "total_revenue": 3500000,
-                },
-                "cost_of_sales": {
-                    "product_costs": 1350000,
-                    "service_costs": 750000,
-                    "total_cost_of_sales": 2100000,
-                },
-                "gross_profit": 1400000,
-                "operating_expenses": {
-                    "salaries_wages": 750000,
-                    "rent": 95000,
-                    "utilities": 45000,
-                    "depreciation": 50000,
-                    "other_expenses": 60000,
-                    "total_operating_expenses": 950000,
-                },
-                "operating_income": 450000,
-                "other_income_expense": {
-                    "interest_expense": 125000,
-                    "interest_income": 35000,
-                    "total_other_income_expense": -90000,
-                },
-                "income_before_tax": 360000,
-                "tax_expense": 90000,
-                "net_income": 270000,
-            },
-            "previous": {
-                "period": "Q1 2024",
-                "revenue": {
-                    "product_revenue": 2050000,
-                    "service_revenue": 1150000,
-                    "total_revenue": 3200000,
-                },
-                "cost_of_sales": {
-                    "product_costs": 1280000,
-                    "service_costs": 670000,
-                    "total_cost_of_sales": 1950000,
-                },
-                "gross_profit": 1250000,
-                "operating_expenses": {
-                    "salaries_wages": 690000,
-                    "rent": 90000,
-                    "utilities": 40000,
-                    "depreciation": 45000,
-                    "other_expenses": 55000,
-                    "total_operating_expenses": 880000,
-                },
-                "operating_income": 370000,
-                "other_income_expense": {
-                    "interest_expense": 130000,
-                    "interest_income": 25000,
-                    "total_other_income_expense": -105000,
-                },
-                "income_before_tax": 265000,
-                "tax_expense": 66250,
-                "net_income": 198750,
-            },
-        },
-        "cash_flow_statement": {
-            "current": {
-                "period": "Q1 2025",
-                "operating_activities": {
-                    "net_income": 270000,
-                    "adjustments": {
-                        "depreciation": 50000,
-                        "changes_in_working_capital": {
-                            "accounts_receivable": -25000,
-                            "inventory": -25000,
-                            "prepaid_expenses": -15000,
-                            "accounts_payable": -25000,
-                            "accrued_expenses": 25000,
-                        },
-                        "total_adjustments": 10000,
-                    },
-                    "net_cash_from_operating": 280000,
-                },
-                "investing_activities": {
-                    "capital_expenditures": -100000,
-                    "investments": -50000,
-                    "net_cash_from_investing": -150000,
-                },
-                "financing_activities": {
-                    "debt_repayments": -100000,
-                    "dividends_paid": 0,
-                    "net_cash_from_financing": -100000,
-                },
-                "net_change_in_cash": 30000,
-                "beginning_cash": 1220000,
-                "ending_cash": 1250000,
-            },
-            "previous": {
-                "period": "Q1 2024",
-                "operating_activities": {
-                    "net_income": 198750,
-                    "adjustments": {
-                        "depreciation": 45000,
-                        "changes_in_working_capital": {
-                            "accounts_receivable": -30000,
-                            "inventory": -20000,
-                            "prepaid_expenses": -5000,
-                            "accounts_payable": 15000,
-                            "accrued_expenses": 10000,
-                        },
-                        "total_adjustments": 15000,
-                    },
-                    "net_cash_from_operating": 213750,
-                },
-                "investing_activities": {
-                    "capital_expenditures": -85000,
-                    "investments": -25000,
-                    "net_cash_from_investing": -110000,
-                },
-                "financing_activities": {
-                    "debt_repayments": -75000,
-                    "dividends_paid": 0,
-                    "net_cash_from_financing": -75000,
-                },
-                "net_change_in_cash": 28750,
-                "beginning_cash": 1110000,
-                "ending_cash": 1138750,
-            },
-        },
-    }
-
     # Get statement data for requested period
-    if statement_type not in financial_data:
+    if statement_type not in FINANCIAL_DATA:
         return {
             "error": f"Statement type '{statement_type}' not found",
-            "available_statements": list(financial_data.keys())
+            "available_statements": list(FINANCIAL_DATA.keys())
         }
 
-    statement_data = financial_data[statement_type]
+    statement_data = FINANCIAL_DATA[statement_type]
 
     if time_period not in statement_data:
         return {
@@ -1126,374 +2068,25 @@ async def handle_financial_statement(entities: Dict) -> Dict:
 
     # If analysis requested, provide detailed analysis
     if analysis_type != "overview":
-        # Get RAG context for financial analysis
-        query = f"financial statement analysis {statement_type} {analysis_type}"
-        context = await rag_module.generate_context(
-            query, filter_criteria={"category": "accounting"}
-        )
-
         # Prepare comparison data if requested
         comparison_data = None
         if comparison and "previous" in statement_data:
             comparison_data = statement_data["previous"]
 
-        # Generate financial statement analysis using LLM
-        system_prompt = f"""
-        You are a financial analyst reviewing financial statements. Provide a {analysis_type} analysis of this {statement_type.replace('_', ' ')}:
-        """
-
-        # Format the statement data as readable text
-        if statement_type == "balance_sheet":
-            period_text = f"As of {current_data['date']}"
-
-            system_prompt += f"""
-
-            {statement_type.replace('_', ' ').title()} {period_text}
-
-            Assets:
-            """
-
-            for category, accounts in current_data['assets'].items():
-                if category == "total_assets":
-                    system_prompt += f"Total Assets: ${accounts:,.0f}\n"
-                    continue
-
-                system_prompt += f"\n{category.replace('_', ' ').title()}:\n"
-                for account, amount in accounts.items():
-                    system_prompt += f"- {account.replace('_', ' ').title()}: ${amount:,.0f}\n"
-
-            system_prompt += "\nLiabilities & Equity:\n"
-
-            for category, accounts in current_data['liabilities_equity'].items():
-                if category == "total_liabilities_equity":
-                    system_prompt += f"Total Liabilities & Equity: ${accounts:,.0f}\n"
-                    continue
-
-                system_prompt += f"\n{category.replace('_', ' ').title()}:\n"
-                for account, amount in accounts.items():
-                    system_prompt += f"- {account.replace('_', ' ').title()}: ${amount:,.0f}\n"
-
-        elif statement_type == "income_statement":
-            period_text = f"For {current_data['period']}"
-
-            system_prompt += f"""
-
-            {statement_type.replace('_', ' ').title()} {period_text}
-
-            Revenue:
-            """
-
-            for account, amount in current_data['revenue'].items():
-                system_prompt += f"- {account.replace('_', ' ').title()}: ${amount:,.0f}\n"
-
-            system_prompt += "\nCost of Sales:\n"
-            for account, amount in current_data['cost_of_sales'].items():
-                system_prompt += f"- {account.replace('_', ' ').title()}: ${amount:,.0f}\n"
-
-            system_prompt += f"\nGross Profit: ${current_data['gross_profit']:,.0f}\n"
-
-            system_prompt += "\nOperating Expenses:\n"
-            for account, amount in current_data['operating_expenses'].items():
-                system_prompt += f"- {account.replace('_', ' ').title()}: ${amount:,.0f}\n"
-
-            system_prompt += f"\nOperating Income: ${current_data['operating_income']:,.0f}\n"
-
-            system_prompt += "\nOther Income/Expense:\n"
-            for account, amount in current_data['other_income_expense'].items():
-                system_prompt += f"- {account.replace('_', ' ').title()}: ${amount:,.0f}\n"
-
-            system_prompt += f"""
-            Income Before Tax: ${current_data['income_before_tax']:,.0f}
-            Tax Expense: ${current_data['tax_expense']:,.0f}
-            Net Income: ${current_data['net_income']:,.0f}
-            """
-
-        elif statement_type == "cash_flow_statement":
-            period_text = f"For {current_data['period']}"
-
-            system_prompt += f"""
-
-            {statement_type.replace('_', ' ').title()} {period_text}
-
-            Operating Activities:
-            - Net Income: ${current_data['operating_activities']['net_income']:,.0f}
-
-            Adjustments:
-            - Depreciation: ${current_data['operating_activities']['adjustments']['depreciation']:,.0f}
-
-            Changes in Working Capital:
-            """
-
-            for account, amount in current_data['operating_activities']['adjustments']['changes_in_working_capital'].items():
-                system_prompt += f"- {account.replace('_', ' ').title()}: ${amount:,.0f}\n"
-
-            system_prompt += f"""
-            Net Cash from Operating Activities: ${current_data['operating_activities']['net_cash_from_operating']:,.0f}
-
-            Investing Activities:
-            """
-
-            for account, amount in current_data['investing_activities'].items():
-                if account != "net_cash_from_investing":
-                    system_prompt += f"- {account.replace('_', ' ').title()}: ${amount:,.0f}\n"
-
-            system_prompt += f"""
-            Net Cash from Investing Activities: ${current_data['investing_activities']['net_cash_from_investing']:,.0f}
-
-            Financing Activities:
-            """
-
-            for account, amount in current_data['financing_activities'].items():
-                if account != "net_cash_from_financing":
-                    system_prompt += f"- {account.replace('_', ' ').title()}: ${amount:,.0f}\n"
-
-            system_prompt += f"""
-            Net Cash from Financing Activities: ${current_data['financing_activities']['net_cash_from_financing']:,.0f}
-
-            Net Change in Cash: ${current_data['net_change_in_cash']:,.0f}
-            Beginning Cash: ${current_data['beginning_cash']:,.0f}
-            Ending Cash: ${current_data['ending_cash']:,.0f}
-            """
-
-        # Add comparison data if available
-        if comparison_data:
-            system_prompt += f"""
-
-            Comparison to {comparison_data.get('period', comparison_data.get('date', 'previous period'))}:
-            """
-
-            if statement_type == "balance_sheet":
-                # Calculate key changes
-                current_assets_current = current_data['assets']['current_assets']['total_current_assets']
-                current_assets_prev = comparison_data['assets']['current_assets']['total_current_assets']
-                current_assets_change = current_assets_current - current_assets_prev
-                current_assets_pct_change = (current_assets_change / current_assets_prev) * 100
-
-                total_assets_current = current_data['assets']['total_assets']
-                total_assets_prev = comparison_data['assets']['total_assets']
-                total_assets_change = total_assets_current - total_assets_prev
-                total_assets_pct_change = (total_assets_change / total_assets_prev) * 100
-
-                total_liabilities_current = (current_data['liabilities_equity']['current_liabilities']['total_current_liabilities'] +
-                                            current_data['liabilities_equity']['non_current_liabilities']['total_non_current_liabilities'])
-                total_liabilities_prev = (comparison_data['liabilities_equity']['current_liabilities']['total_current_liabilities'] +
-                                        comparison_data['liabilities_equity']['non_current_liabilities']['total_non_current_liabilities'])
-                total_liabilities_change = total_liabilities_current - total_liabilities_prev
-                total_liabilities_pct_change = (total_liabilities_change / total_liabilities_prev) * 100
-
-                equity_current = current_data['liabilities_equity']['equity']['total_equity']
-                equity_prev = comparison_data['liabilities_equity']['equity']['total_equity']
-                equity_change = equity_current - equity_prev
-                equity_pct_change = (equity_change / equity_prev) * 100
-
-                system_prompt += f"""
-                - Current Assets: ${current_assets_change:,.0f} ({current_assets_pct_change:.1f}%)
-                - Total Assets: ${total_assets_change:,.0f} ({total_assets_pct_change:.1f}%)
-                - Total Liabilities: ${total_liabilities_change:,.0f} ({total_liabilities_pct_change:.1f}%)
-                - Total Equity: ${equity_change:,.0f} ({equity_pct_change:.1f}%)
-                """
-
-            elif statement_type == "income_statement":
-                # Calculate key changes
-                revenue_current = current_data['revenue']['total_revenue']
-                revenue_prev = comparison_data['revenue']['total_revenue']
-                revenue_change = revenue_current - revenue_prev
-                revenue_pct_change = (revenue_change / revenue_prev) * 100
-
-                gross_profit_current = current_data['gross_profit']
-                gross_profit_prev = comparison_data['gross_profit']
-                gross_profit_change = gross_profit_current - gross_profit_prev
-                gross_profit_pct_change = (gross_profit_change / gross_profit_prev) * 100
-
-                operating_income_current = current_data['operating_income']
-                operating_income_prev = comparison_data['operating_income']
-                operating_income_change = operating_income_current - operating_income_prev
-                operating_income_pct_change = (operating_income_change / operating_income_prev) * 100
-
-                net_income_current = current_data['net_income']
-                net_income_prev = comparison_data['net_income']
-                net_income_change = net_income_current - net_income_prev
-                net_income_pct_change = (net_income_change / net_income_prev) * 100
-
-                system_prompt += f"""
-                - Revenue: ${revenue_change:,.0f} ({revenue_pct_change:.1f}%)
-                - Gross Profit: ${gross_profit_change:,.0f} ({gross_profit_pct_change:.1f}%)
-                - Operating Income: ${operating_income_change:,.0f} ({operating_income_pct_change:.1f}%)
-                - Net Income: ${net_income_change:,.0f} ({net_income_pct_change:.1f}%)
-                """
-
-            elif statement_type == "cash_flow_statement":
-                # Calculate key changes
-                operating_current = current_data['operating_activities']['net_cash_from_operating']
-                operating_prev = comparison_data['operating_activities']['net_cash_from_operating']
-                operating_change = operating_current - operating_prev
-                operating_pct_change = (operating_change / operating_prev) * 100 if operating_prev != 0 else float('inf')
-
-                investing_current = current_data['investing_activities']['net_cash_from_investing']
-                investing_prev = comparison_data['investing_activities']['net_cash_from_investing']
-                investing_change = investing_current - investing_prev
-
-                financing_current = current_data['financing_activities']['net_cash_from_financing']
-                financing_prev = comparison_data['financing_activities']['net_cash_from_financing']
-                financing_change = financing_current - financing_prev
-
-                net_change_current = current_data['net_change_in_cash']
-                net_change_prev = comparison_data['net_change_in_cash']
-                net_change_change = net_change_current - net_change_prev
-                net_change_pct_change = (net_change_change / net_change_prev) * 100 if net_change_prev != 0 else float('inf')
-
-                system_prompt += f"""
-                - Operating Cash Flow: ${operating_change:,.0f} ({operating_pct_change:.1f}%)
-                - Investing Cash Flow: ${investing_change:,.0f}
-                - Financing Cash Flow: ${financing_change:,.0f}
-                - Net Change in Cash: ${net_change_change:,.0f} ({net_change_pct_change:.1f}%)
-                """
-
-        # Add ratio calculations for ratio analysis
-        if analysis_type == "ratio":
-            system_prompt += "\nKey Financial Ratios:\n"
-
-            if statement_type == "balance_sheet":
-                # Liquidity ratios
-                current_assets = current_data['assets']['current_assets']['total_current_assets']
-                current_liabilities = current_data['liabilities_equity']['current_liabilities']['total_current_liabilities']
-                current_ratio = current_assets / current_liabilities if current_liabilities != 0 else float('inf')
-
-                quick_assets = current_assets - current_data['assets']['current_assets']['inventory']
-                quick_ratio = quick_assets / current_liabilities if current_liabilities != 0 else float('inf')
-
-                # Leverage ratios
-                total_assets = current_data['assets']['total_assets']
-                total_liabilities = (current_data['liabilities_equity']['current_liabilities']['total_current_liabilities'] +
-                                    current_data['liabilities_equity']['non_current_liabilities']['total_non_current_liabilities'])
-                debt_to_assets = total_liabilities / total_assets if total_assets != 0 else float('inf')
-
-                total_equity = current_data['liabilities_equity']['equity']['total_equity']
-                debt_to_equity = total_liabilities / total_equity if total_equity != 0 else float('inf')
-
-                system_prompt += f"""
-                Liquidity Ratios:
-                - Current Ratio: {current_ratio:.2f}
-                - Quick Ratio: {quick_ratio:.2f}
-
-                Leverage Ratios:
-                - Debt to Assets: {debt_to_assets:.2f}
-                - Debt to Equity: {debt_to_equity:.2f}
-                """
-
-            elif statement_type == "income_statement":
-                # Assume we have balance sheet data available for some ratios
-                if "balance_sheet" in financial_data and time_period in financial_data["balance_sheet"]:
-                    balance_sheet = financial_data["balance_sheet"][time_period]
-
-                    # Profitability ratios
-                    revenue = current_data['revenue']['total_revenue']
-                    gross_profit = current_data['gross_profit']
-                    operating_income = current_data['operating_income']
-                    net_income = current_data['net_income']
-
-                    gross_margin = gross_profit / revenue if revenue != 0 else 0
-                    operating_margin = operating_income / revenue if revenue != 0 else 0
-                    net_margin = net_income / revenue if revenue != 0 else 0
-
-                    # Efficiency ratios
-                    total_assets = balance_sheet['assets']['total_assets']
-                    return_on_assets = net_income / total_assets if total_assets != 0 else 0
-
-                    total_equity = balance_sheet['liabilities_equity']['equity']['total_equity']
-                    return_on_equity = net_income / total_equity if total_equity != 0 else 0
-
-                    system_prompt += f"""
-                    Profitability Ratios:
-                    - Gross Margin: {gross_margin:.2f} ({gross_margin*100:.1f}%)
-                    - Operating Margin: {operating_margin:.2f} ({operating_margin*100:.1f}%)
-                    - Net Profit Margin: {net_margin:.2f} ({net_margin*100:.1f}%)
-
-                    Return Ratios:
-                    - Return on Assets (ROA): {return_on_assets:.2f} ({return_on_assets*100:.1f}%)
-                    - Return on Equity (ROE): {return_on_equity:.2f} ({return_on_equity*100:.1f}%)
-                    """
-                else:
-                    # Limited ratios without balance sheet
-                    revenue = current_data['revenue']['total_revenue']
-                    gross_profit = current_data['gross_profit']
-                    operating_income = current_data['operating_income']
-                    net_income = current_data['net_income']
-
-                    gross_margin = gross_profit / revenue if revenue != 0 else 0
-                    operating_margin = operating_income / revenue if revenue != 0 else 0
-                    net_margin = net_income / revenue if revenue != 0 else 0
-
-                    system_prompt += f"""
-                    Profitability Ratios:
-                    - Gross Margin: {gross_margin:.2f} ({gross_margin*100:.1f}%)
-                    - Operating Margin: {operating_margin:.2f} ({operating_margin*100:.1f}%)
-                    - Net Profit Margin: {net_margin:.2f} ({net_margin*100:.1f}%)
-                    """
-
-            elif statement_type == "cash_flow_statement":
-                # Cash flow ratios
-                if "income_statement" in financial_data and time_period in financial_data["income_statement"]:
-                    income_statement = financial_data["income_statement"][time_period]
-                    net_income = income_statement['net_income']
-
-                    operating_cash_flow = current_data['operating_activities']['net_cash_from_operating']
-                    operating_cash_flow_ratio = operating_cash_flow / net_income if net_income != 0 else float('inf')
-
-                    if "balance_sheet" in financial_data and time_period in financial_data["balance_sheet"]:
-                        balance_sheet = financial_data["balance_sheet"][time_period]
-                        total_liabilities = (balance_sheet['liabilities_equity']['current_liabilities']['total_current_liabilities'] +
-                                            balance_sheet['liabilities_equity']['non_current_liabilities']['total_non_current_liabilities'])
-
-                        cash_flow_to_debt = operating_cash_flow / total_liabilities if total_liabilities != 0 else float('inf')
-
-                        system_prompt += f"""
-                        Cash Flow Ratios:
-                        - Operating Cash Flow to Net Income: {operating_cash_flow_ratio:.2f}
-                        - Cash Flow to Debt: {cash_flow_to_debt:.2f}
-                        - Free Cash Flow: ${operating_cash_flow + current_data['investing_activities']['capital_expenditures']:,.0f}
-                        """
-                    else:
-                        system_prompt += f"""
-                        Cash Flow Ratios:
-                        - Operating Cash Flow to Net Income: {operating_cash_flow_ratio:.2f}
-                        - Free Cash Flow: ${operating_cash_flow + current_data['investing_activities']['capital_expenditures']:,.0f}
-                        """
-                else:
-                    system_prompt += f"""
-                    Cash Flow Metrics:
-                    - Operating Cash Flow: ${current_data['operating_activities']['net_cash_from_operating']:,.0f}
-                    - Free Cash Flow: ${current_data['operating_activities']['net_cash_from_operating'] + current_data['investing_activities']['capital_expenditures']:,.0f}
-                    - Cash Flow from Operations to Capital Expenditures: {current_data['operating_activities']['net_cash_from_operating'] / abs(current_data['investing_activities']['capital_expenditures']):,.2f}
-                    """
-
-        system_prompt += f"""
-
-        Based on the {statement_type.replace('_', ' ')} and the information provided, perform a detailed {analysis_type} analysis, including:
-
-        1. Key insights and trends
-        2. Strengths and areas of concern
-        3. Notable changes and their implications
-        4. Recommendations for management
-
-        Focus on the most important aspects that would be relevant to financial decision-makers.
-        """
-
-        if context:
-            system_prompt += f"\n\nAdditional relevant context for analysis:\n{context}"
-
-        analysis = await generate_text(
-            prompt=f"Perform {analysis_type} analysis on the {statement_type.replace('_', ' ')}",
-            system_prompt=system_prompt,
-            max_new_tokens=1024,
+        prompt, system_prompt = await _analysis_prompts(
+            statement_type, analysis_type, time_period, current_data, comparison_data
+        )
+        analysis = await _cached_generate(
+            ("llm", prompt, system_prompt, 1024),
+            lambda: generate_text(prompt=prompt, system_prompt=system_prompt, max_new_tokens=1024),
         )
 
         # Prepare response data
         statement_data = {
             "statement_type": statement_type,
             "time_period": time_period,
-            "data": current_data,
-            "comparison_data": comparison_data if comparison else None,
+            "data": copy.deepcopy(current_data),
+            "comparison_data": copy.deepcopy(comparison_data) if comparison else None,
             "analysis_type": analysis_type,
             "analysis": analysis,
         }
@@ -1511,92 +2104,27 @@ async def handle_financial_statement(entities: Dict) -> Dict:
             comparison_data = statement_data["previous"]
 
         # Calculate changes
-        comparison_changes = {
-            "assets": {},
-            "liabilities_equity": {},
-        }
-
-        # Process assets
-        for category in current_data["assets"]:
-            if category not in comparison_data["assets"]:
-                continue
-
-            if isinstance(current_data["assets"][category], dict):
-                comparison_changes["assets"][category] = {}
-                for account in current_data["assets"][category]:
-                    if account in comparison_data["assets"][category]:
-                        current_value = current_data["assets"][category][account]
-                        previous_value = comparison_data["assets"][category][account]
-                        change = current_value - previous_value
-                        pct_change = (change / previous_value) * 100 if previous_value != 0 else 0
-
-                        comparison_changes["assets"][category][account] = {
-                            "change": change,
-                            "pct_change": pct_change,
-                        }
-            else:
-                current_value = current_data["assets"][category]
-                previous_value = comparison_data["assets"][category]
-                change = current_value - previous_value
-                pct_change = (change / previous_value) * 100 if previous_value != 0 else 0
-
-                comparison_changes["assets"][category] = {
-                    "change": change,
-                    "pct_change": pct_change,
-                }
-
-        # Process liabilities & equity
-        for category in current_data["liabilities_equity"]:
-            if category not in comparison_data["liabilities_equity"]:
-                continue
-
-            if isinstance(current_data["liabilities_equity"][category], dict):
-                comparison_changes["liabilities_equity"][category] = {}
-                for account in current_data["liabilities_equity"][category]:
-                    if account in comparison_data["liabilities_equity"][category]:
-                        current_value = current_data["liabilities_equity"][category][account]
-                        previous_value = comparison_data["liabilities_equity"][category][account]
-                        change = current_value - previous_value
-                        pct_change = (change / previous_value) * 100 if previous_value != 0 else 0
-
-                        comparison_changes["liabilities_equity"][category][account] = {
-                            "change": change,
-                            "pct_change": pct_change,
-                        }
-            else:
-                current_value = current_data["liabilities_equity"][category]
-                previous_value = comparison_data["liabilities_equity"][category]
-                change = current_value - previous_value
-                pct_change = (change / previous_value) * 100 if previous_value != 0 else 0
+        comparison_changes = None
+        if comparison_data:
+            comparison_changes = _balance_sheet_changes(current_data, comparison_data)
 
-                comparison_changes["liabilities_equity"][category] = {
-                    "change": change,
-                    "pct_change": pct_change,
-                }
+        totals = BalanceSheetTotals.from_statement(current_data)
 
         return {
             "statement_type": statement_type,
             "period": period_text,
-            "data": current_data,
-            "comparison_data": comparison_data if comparison else None,
-            "comparison_changes": comparison_changes if comparison and comparison_data else None,
-            "message": (
-                f"Balance Sheet as of {current_data['date']}\n\n"
-                "ASSETS\n"
-                f"Current Assets: ${current_data['assets']['current_assets']['total_current_assets']:,.0f}\n"
-                f"Non-Current Assets: ${current_data['assets']['non_current_assets']['total_non_current_assets']:,.0f}\n"
-                f"Total Assets: ${current_data['assets']['total_assets']:,.0f}\n\n"
-                "LIABILITIES & EQUITY\n"
-                f"Current Liabilities: ${current_data['liabilities_equity']['current_liabilities']['total_current_liabilities']:,.0f}\n"
-                f"Non-Current Liabilities: ${current_data['liabilities_equity']['non_current_liabilities']['total_non_current_liabilities']:,.0f}\n"
-                f"Total Equity: ${current_data['liabilities_equity']['equity']['total_equity']:,.0f}\n"
-                f"Total Liabilities & Equity: ${current_data['liabilities_equity']['total_liabilities_equity']:,.0f}"
-            ),
+            "data": copy.deepcopy(current_data),
+            "comparison_data": copy.deepcopy(comparison_data) if comparison else None,
+            "comparison_changes": comparison_changes,
+            "message": _format_balance_sheet_message(s=totals),
         }
 
     elif statement_type == "income_statement":
         # Format period for display
         period_text = f"For {current_data['period']}"
+        totals = IncomeStatementTotals.from_statement(current_data)
+        # Margins come from the (memoized) ratio computation used by the analysis path
+        ratios = _compute_ratios(statement_type, time_period)
 
         # Calculate comparison data if requested
         comparison_data = None
@@ -1605,68 +2133,34 @@ async def handle_financial_statement(entities: Dict) -> Dict:
             comparison_data = statement_data["previous"]
 
             # Calculate key changes
-            revenue_current = current_data['revenue']['total_revenue']
-            revenue_prev = comparison_data['revenue']['total_revenue']
-            revenue_change = revenue_current - revenue_prev
-            revenue_pct_change = (revenue_change / revenue_prev) * 100 if revenue_prev != 0 else 0
-
-            gross_profit_current = current_data['gross_profit']
-            gross_profit_prev = comparison_data['gross_profit']
-            gross_profit_change = gross_profit_current - gross_profit_prev
-            gross_profit_pct_change = (gross_profit_change / gross_profit_prev) * 100 if gross_profit_prev != 0 else 0
-
-            operating_income_current = current_data['operating_income']
-            operating_income_prev = comparison_data['operating_income']
-            operating_income_change = operating_income_current - operating_income_prev
-            operating_income_pct_change = (operating_income_change / operating_income_prev) * 100 if operating_income_prev != 0 else 0
-
-            net_income_current = current_data['net_income']
-            net_income_prev = comparison_data['net_income']
-            net_income_change = net_income_current - net_income_prev
-            net_income_pct_change = (net_income_change / net_income_prev) * 100 if net_income_prev != 0 else 0
-
+            previous = IncomeStatementTotals.from_statement(comparison_data)
+            entries = _change_entries(
+                [totals.revenue, totals.gross_profit, totals.operating_income, totals.net_income],
+                [previous.revenue, previous.gross_profit, previous.operating_income, previous.net_income],
+            )
+            revenue_change, gross_profit_change, operating_income_change, net_income_change = entries
             comparison_changes = {
-                "revenue": {
-                    "change": revenue_change,
-                    "pct_change": revenue_pct_change,
-                },
-                "gross_profit": {
-                    "change": gross_profit_change,
-                    "pct_change": gross_profit_pct_change,
-                },
-                "operating_income": {
-                    "change": operating_income_change,
-                    "pct_change": operating_income_pct_change,
-                },
-                "net_income": {
-                    "change": net_income_change,
-                    "pct_change": net_income_pct_change,
-                },
+                "revenue": revenue_change,
+                "gross_profit": gross_profit_change,
+                "operating_income": operating_income_change,
+                "net_income": net_income_change,
             }
 
         return {
             "statement_type": statement_type,
             "period": period_text,
-            "data": current_data,
-            "comparison_data": comparison_data if comparison else None,
+            "data": copy.deepcopy(current_data),
+            "comparison_data": copy.deepcopy(comparison_data) if comparison else None,
             "comparison_changes": comparison_changes,
-            "message": (
-                f"Income Statement for {current_data['period']}\n\n"
-                f"Revenue: ${current_data['revenue']['total_revenue']:,.0f}\n"
-                f"Cost of Sales: ${current_data['cost_of_sales']['total_cost_of_sales']:,.0f}\n"
-                f"Gross Profit: ${current_data['gross_profit']:,.0f}\n"
-                f"Operating Expenses: ${current_data['operating_expenses']['total_operating_expenses']:,.0f}\n"
-                f"Operating Income: ${current_data['operating_income']:,.0f}\n"
-                f"Income Before Tax: ${current_data['income_before_tax']:,.0f}\n"
-                f"Net Income: ${current_data['net_income']:,.0f}\n"
-                f"Gross Margin: {(current_data['gross_profit'] / current_data['revenue']['total_revenue']) * 100:.1f}%\n"
-                f"Net Margin: {(current_data['net_income'] / current_data['revenue']['total_revenue']) * 100:.1f}%"
+            "message": _format_income_statement_message(
+                s=totals, gross_margin=ratios["gross_margin"], net_margin=ratios["net_margin"]
             ),
         }
 
     elif statement_type == "cash_flow_statement":
         # Format period for display
         period_text = f"For {current_data['period']}"
+        totals = CashFlowTotals.from_statement(current_data)
 
         # Calculate comparison data if requested
         comparison_data = None
@@ -1675,61 +2169,26 @@ async def handle_financial_statement(entities: Dict) -> Dict:
             comparison_data = statement_data["previous"]
 
             # Calculate key changes
-            operating_current = current_data['operating_activities']['net_cash_from_operating']
-            operating_prev = comparison_data['operating_activities']['net_cash_from_operating']
-            operating_change = operating_current - operating_prev
-            operating_pct_change = (operating_change / operating_prev) * 100 if operating_prev != 0 else 0
-
-            investing_current = current_data['investing_activities']['net_cash_from_investing']
-            investing_prev = comparison_data['investing_activities']['net_cash_from_investing']
-            investing_change = investing_current - investing_prev
-            investing_pct_change = (investing_change / investing_prev) * 100 if investing_prev != 0 else 0
-
-            financing_current = current_data['financing_activities']['net_cash_from_financing']
-            financing_prev = comparison_data['financing_activities']['net_cash_from_financing']
-            financing_change = financing_current - financing_prev
-            financing_pct_change = (financing_change / financing_prev) * 100 if financing_prev != 0 else 0
-
-            net_change_current = current_data['net_change_in_cash']
-            net_change_prev = comparison_data['net_change_in_cash']
-            net_change_change = net_change_current - net_change_prev
-            net_change_pct_change = (net_change_change / net_change_prev) * 100 if net_change_prev != 0 else 0
-
+            previous = CashFlowTotals.from_statement(comparison_data)
+            entries = _change_entries(
+                [totals.operating, totals.investing, totals.financing, totals.net_change_in_cash],
+                [previous.operating, previous.investing, previous.financing, previous.net_change_in_cash],
+            )
+            operating_change, investing_change, financing_change, net_change_change = entries
             comparison_changes = {
-                "operating_activities": {
-                    "change": operating_change,
-                    "pct_change": operating_pct_change,
-                },
-                "investing_activities": {
-                    "change": investing_change,
-                    "pct_change": investing_pct_change,
-                },
-                "financing_activities": {
-                    "change": financing_change,
-                    "pct_change": financing_pct_change,
-                },
-                "net_change_in_cash": {
-                    "change": net_change_change,
-                    "pct_change": net_change_pct_change,
-                },
+                "operating_activities": operating_change,
+                "investing_activities": investing_change,
+                "financing_activities": financing_change,
+                "net_change_in_cash": net_change_change,
             }
 
         return {
             "statement_type": statement_type,
             "period": period_text,
-            "data": current_data,
-            "comparison_data": comparison_data if comparison else None,
+            "data": copy.deepcopy(current_data),
+            "comparison_data": copy.deepcopy(comparison_data) if comparison else None,
             "comparison_changes": comparison_changes,
-            "message": (
-                f"Cash Flow Statement for {current_data['period']}\n\n"
-                f"Net Income: ${current_data['operating_activities']['net_income']:,.0f}\n"
-                f"Net Cash from Operating: ${current_data['operating_activities']['net_cash_from_operating']:,.0f}\n"
-                f"Net Cash from Investing: ${current_data['investing_activities']['net_cash_from_investing']:,.0f}\n"
-                f"Net Cash from Financing: ${current_data['financing_activities']['net_cash_from_financing']:,.0f}\n"
-                f"Net Change in Cash: ${current_data['net_change_in_cash']:,.0f}\n"
-                f"Beginning Cash: ${current_data['beginning_cash']:,.0f}\n"
-                f"Ending Cash: ${current_data['ending_cash']:,.0f}"
-            ),
+            "message": _format_cash_flow_message(s=totals),
         }
 
 
@@ -1747,39 +2206,27 @@ async def handle_accounting_policy(entities: Dict) -> Dict:
     policy_name = entities.get("policy_name")
     policy_category = entities.get("policy_category")
 
-    # Get context from RAG for accounting policies
+    # Get context from RAG for accounting policies (runs while the prompt is built)
     query = f"accounting policy {policy_name if policy_name else policy_category if policy_category else 'overview'}"
-    context = await rag_module.generate_context(
+    context_task = asyncio.create_task(cached_generate_context(
         query, filter_criteria={"category": "accounting"}
-    )
+    ))
 
     # Generate accounting policy information using LLM
-    system_prompt = """
-    You are an accounting policy specialist. Provide information about accounting policies and procedures.
-    """
-
     if policy_name:
-        system_prompt += f"\n\nThe user is asking about the '{policy_name}' accounting policy."
+        focus = f"The user is asking about the '{policy_name}' accounting policy."
     elif policy_category:
-        system_prompt += f"\n\nThe user is asking about policies in the '{policy_category}' category."
+        focus = f"The user is asking about policies in the '{policy_category}' category."
     else:
-        system_prompt += "\n\nThe user is asking for an overview of accounting policies."
+        focus = "The user is asking for an overview of accounting policies."
 
+    context = await context_task
     if context:
-        system_prompt += f"\n\nUse this relevant context for your response:\n{context}"
+        guidance = f"\n\nUse this relevant context for your response:\n{context}"
     else:
-        system_prompt += """
-
-        Without specific context about the company's policies, provide general information about standard accounting policies and procedures following GAAP or IFRS as appropriate. Include:
+        guidance = POLICY_NO_CONTEXT_GUIDE
 
-        1. Definition and purpose of the policy or policy area
-        2. Key principles and requirements
-        3. Implementation considerations
-        4. Common practices and industry standards
-        5. Relevant accounting standards (GAAP/IFRS references)
-
-        Tailor the response to be informative and educational while noting that specific company policies may vary.
-        """
+    system_prompt = f"{ACCOUNTING_POLICY_PROMPT}\n\n{focus}{guidance}"
 
     policy_info = await generate_text(
         prompt=f"Provide information about {policy_name if policy_name else policy_category if policy_category else 'accounting policies overview'}",
@@ -1792,4 +2239,57 @@ async def handle_accounting_policy(entities: Dict) -> Dict:
         "policy_category": policy_category,
         "context_available": bool(context),
         "formatted_response": policy_info,
-    }
\ No newline at end of file
+    }
+
+
+async def stream_financial_statement(entities: Dict) -> AsyncIterator[Dict]:
+    """
+    Stream a financial statement analysis as it is generated.
+
+    The statement data is yielded first, as {"stage": "data", "statement_data": ...},
+    followed by {"stage": "chunk", "text": ...} events carrying the analysis text.
+    Overviews and invalid requests yield a single data event with the
+    handle_financial_statement result.
+
+    Args:
+    entities: Dictionary of entities extracted from user intent
+
+    Yields:
+    Stream events
+    """
+    statement_type = entities.get("statement_type", "balance_sheet")
+    time_period = entities.get("time_period", "current")
+    comparison = entities.get("comparison", False)
+    analysis_type = entities.get("analysis_type", "overview")
+
+    statement_data = FINANCIAL_DATA.get(statement_type, {})
+    if analysis_type == "overview" or time_period not in statement_data:
+        yield {"stage": "data", "statement_data": await handle_financial_statement(entities)}
+        return
+
+    current_data = statement_data[time_period]
+    comparison_data = None
+    if comparison and "previous" in statement_data:
+        comparison_data = statement_data["previous"]
+
+    prompt_task = asyncio.create_task(_analysis_prompts(
+        statement_type, analysis_type, time_period, current_data, comparison_data
+    ))
+    try:
+        yield {
+            "stage": "data",
+            "statement_data": {
+                "statement_type": statement_type,
+                "time_period": time_period,
+                "data": copy.deepcopy(current_data),
+                "comparison_data": copy.deepcopy(comparison_data) if comparison else None,
+                "analysis_type": analysis_type,
+            },
+        }
+
+        prompt, system_prompt = await prompt_task
+        async for text in stream_text(prompt=prompt, system_prompt=system_prompt, max_new_tokens=1024):
+            yield {"stage": "chunk", "text": text}
+    finally:
+        if not prompt_task.done():
+            prompt_task.cancel()
@@ -14,16 +14,227 @@ Features:
 import asyncio
 import datetime
 import logging
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple
 
-from modules.bank_adapters import get_banking_adapter
+import orjson
+
+from modules.bank_adapters import BankingAdapter, get_banking_adapter
 from modules.llm_module import generate_text
-from modules.rag_module import rag_module
+from modules.rag_cache import cached_generate_context
+from modules.single_flight import single_flight
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
-async def handle_vendor_payment(entities: Dict[str, Any]) -> Dict[str, Any]:
+_adapter: Optional[BankingAdapter] = None
+_OPERATION_INFLIGHT: Dict[Tuple[str, bytes], asyncio.Task] = {}
+
+
+# RAG filter criteria per document category, shared by every request
+AP_PAYMENTS_FILTER = MappingProxyType({"category": "ap_payments"})
+AP_SCHEDULING_FILTER = MappingProxyType({"category": "ap_scheduling"})
+PAYMENT_DISCOUNTS_FILTER = MappingProxyType({"category": "payment_discounts"})
+VENDOR_NEGOTIATIONS_FILTER = MappingProxyType({"category": "vendor_negotiations"})
+AP_AGING_FILTER = MappingProxyType({"category": "ap_aging"})
+
+# System prompts, with variants for when no documents were retrieved
+NO_DOCS_NOTE = "\n\nNote: no docs found."
+CONTEXT_PROMPT_TEMPLATE = "{prompt}\n\nAdditional relevant context:\n{context}"
+
+VENDOR_PAYMENT_PROMPT = "You are a financial assistant specializing in accounts payable payment processing..."
+VENDOR_PAYMENT_NO_CONTEXT_PROMPT = VENDOR_PAYMENT_PROMPT + NO_DOCS_NOTE
+
+PAYMENT_SCHEDULE_PROMPT = "You are a financial assistant specializing in accounts payable payment scheduling..."
+PAYMENT_SCHEDULE_NO_CONTEXT_PROMPT = PAYMENT_SCHEDULE_PROMPT + NO_DOCS_NOTE
+
+EARLY_PAYMENT_DISCOUNT_PROMPT = "You are a financial assistant specializing in identifying and analyzing early payment discount opportunities..."
+EARLY_PAYMENT_DISCOUNT_NO_CONTEXT_PROMPT = EARLY_PAYMENT_DISCOUNT_PROMPT + NO_DOCS_NOTE
+
+PAYMENT_TERMS_NEGOTIATION_PROMPT = "You are a financial assistant specializing in vendor payment terms negotiation..."
+PAYMENT_TERMS_NEGOTIATION_NO_CONTEXT_PROMPT = PAYMENT_TERMS_NEGOTIATION_PROMPT + NO_DOCS_NOTE
+
+VENDOR_BALANCE_PROMPT = "You are a financial assistant specializing in accounts payable vendor analysis..."
+VENDOR_BALANCE_NO_CONTEXT_PROMPT = VENDOR_BALANCE_PROMPT + NO_DOCS_NOTE
+
+
+def _get_adapter() -> BankingAdapter:
+    """
+    Return the module's banking adapter, creating it on first use.
+
+    Handlers should share this instance rather than building a new adapter
+    (and its client session) per request. Not called yet: it is for the
+    handlers' TODOs once they fetch AP data from the bank.
+    """
+    global _adapter
+    if _adapter is None:
+        _adapter = get_banking_adapter()
+    return _adapter
+
+
+@lru_cache(maxsize=1)
+def _today_iso(ordinal: int) -> str:
+    """ISO date string for a date ordinal; memoized so each day is formatted once."""
+    return datetime.date.fromordinal(ordinal).isoformat()
+
+
+def _normalize_date(date_str: Optional[str]) -> str:
+    """Resolve "today" (or a missing date) to today's ISO date."""
+    return _today_iso(datetime.date.today().toordinal()) if date_str in ("today", None) else date_str
+
+
+# Query builders, one per operation
+def _vendor_payment_query(entities: Dict[str, Any]) -> str:
+    """Build the RAG/LLM query for handle_vendor_payment."""
+    date_str = _normalize_date(entities.get("payment_date", "today"))
+
+    vendor_id = entities.get("vendor_id")
+    invoice_ids = entities.get("invoice_ids", [])
+    payment_method = entities.get("payment_method", "ACH")
+
+    # TODO: Implement vendor payment logic
+
+    return "".join((
+        f"Process vendor payment for {vendor_id} on {date_str} via {payment_method}",
+        f" for invoices {', '.join(invoice_ids)}" if invoice_ids else "",
+    ))
+
+
+def _payment_schedule_query(entities: Dict[str, Any]) -> str:
+    """Build the RAG/LLM query for handle_payment_schedule."""
+    date_str = _normalize_date(entities.get("date", "today"))
+
+    vendor_id = entities.get("vendor_id")
+    prioritization = entities.get("prioritization", "due_date")
+
+    # TODO: Implement payment schedule logic
+
+    return "".join((
+        f"Generate a payment schedule starting from {date_str}",
+        f" for vendor {vendor_id}" if vendor_id else "",
+        f" prioritized by {prioritization}",
+    ))
+
+
+def _early_payment_discount_query(entities: Dict[str, Any]) -> str:
+    """Build the RAG/LLM query for handle_early_payment_discount."""
+    date_str = _normalize_date(entities.get("date", "today"))
+
+    vendor_id = entities.get("vendor_id")
+    minimum_discount = entities.get("minimum_discount", 1.0)  # Default 1% minimum
+
+    # TODO: Implement early payment discount logic
+
+    return "".join((
+        f"Identify early payment discount opportunities as of {date_str}",
+        f" for vendor {vendor_id}" if vendor_id else "",
+        f" with minimum discount of {minimum_discount}%",
+    ))
+
+
+def _payment_terms_negotiation_query(entities: Dict[str, Any]) -> str:
+    """Build the RAG/LLM query for handle_payment_terms_negotiation."""
+    vendor_id = entities.get("vendor_id")
+    target_terms = entities.get("target_terms")
+    relationship_length = entities.get("relationship_length")
+
+    # TODO: Implement payment terms negotiation logic
+
+    return "".join((
+        f"Generate a payment terms negotiation strategy for vendor {vendor_id}",
+        f" targeting terms of {target_terms}" if target_terms else "",
+        f" based on {relationship_length} relationship" if relationship_length else "",
+    ))
+
+
+def _vendor_balance_query(entities: Dict[str, Any]) -> str:
+    """Build the RAG/LLM query for handle_vendor_balance."""
+    date_str = _normalize_date(entities.get("date", "today"))
+
+    vendor_id = entities.get("vendor_id")
+    include_history = entities.get("include_history", False)
+
+    # TODO: Implement vendor balance logic
+
+    return "".join((
+        f"Retrieve vendor balance as of {date_str}",
+        f" for vendor {vendor_id}" if vendor_id else "",
+        " with payment history" if include_history else "",
+    ))
+
+
+# Operation name -> (query builder, RAG filter, system prompt, no-context system prompt)
+OPERATIONS = {
+    "vendor_payment": (_vendor_payment_query, AP_PAYMENTS_FILTER, VENDOR_PAYMENT_PROMPT, VENDOR_PAYMENT_NO_CONTEXT_PROMPT),
+    "payment_schedule": (_payment_schedule_query, AP_SCHEDULING_FILTER, PAYMENT_SCHEDULE_PROMPT, PAYMENT_SCHEDULE_NO_CONTEXT_PROMPT),
+    "early_payment_discount": (_early_payment_discount_query, PAYMENT_DISCOUNTS_FILTER, EARLY_PAYMENT_DISCOUNT_PROMPT, EARLY_PAYMENT_DISCOUNT_NO_CONTEXT_PROMPT),
+    "payment_terms_negotiation": (_payment_terms_negotiation_query, VENDOR_NEGOTIATIONS_FILTER, PAYMENT_TERMS_NEGOTIATION_PROMPT, PAYMENT_TERMS_NEGOTIATION_NO_CONTEXT_PROMPT),
+    "vendor_balance": (_vendor_balance_query, AP_AGING_FILTER, VENDOR_BALANCE_PROMPT, VENDOR_BALANCE_NO_CONTEXT_PROMPT),
+}
+
+
+async def _generate_narrative(op: str, entities: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the operation's query, retrieve RAG context for it and generate the narrative.
+
+    Args:
+        op: Operation name, a key of OPERATIONS
+        entities: Entities passed to the operation's handler
+        context: Optional RAG context already retrieved by the caller
+
+    Returns:
+        Dict with formatted_response, context_used and _metadata
+    """
+    build_query, rag_filter, system_prompt, no_context_prompt = OPERATIONS[op]
+    try:
+        query = build_query(entities)
+        if context is None:
+            context = await cached_generate_context(query, filter_criteria=rag_filter)
+        response = await generate_text(
+            prompt=query,
+            system_prompt=CONTEXT_PROMPT_TEMPLATE.format(prompt=system_prompt, context=context) if context else no_context_prompt,
+        )
+
+        # _metadata must be a fresh dict: the operation manager updates it in place
+        return {
+            "formatted_response": response,
+            "context_used": bool(context),
+            "_metadata": {"operation": f"ap_aging/{op}", "success": True},
+        }
+    except Exception as e:
+        logger.exception("Error in %s: %s", op, e)
+        return {"error": str(e), "_metadata": {"operation": f"ap_aging/{op}", "success": False}}
+
+
+async def _run_rag_llm(op: str, entities: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run an operation, sharing one RAG+LLM run between concurrent identical requests.
+
+    Calls for the same operation and entities that arrive while a run is in
+    flight wait for it and receive a copy of its result.
+
+    Args:
+        op: Operation name, a key of OPERATIONS
+        entities: Entities passed to the operation's handler
+        context: Optional RAG context already retrieved by the caller
+
+    Returns:
+        Dict with formatted_response, context_used and _metadata
+    """
+    if context is not None:
+        return await _generate_narrative(op, entities, context)
+    try:
+        key = (op, orjson.dumps(entities, option=orjson.OPT_SORT_KEYS))
+    except TypeError:
+        # Entities that cannot be serialized are never coalesced
+        return await _generate_narrative(op, entities)
+
+    result = await single_flight(_OPERATION_INFLIGHT, key, lambda: _generate_narrative(op, entities))
+    # Each caller gets its own _metadata: the operation manager updates it in place
+    return {**result, "_metadata": dict(result["_metadata"])}
+
+async def handle_vendor_payment(entities: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
     """
     Manage and process vendor payments.
     
@@ -33,6 +244,7 @@ async def handle_vendor_payment(entities: Dict[str, Any]) -> Dict[str, Any]:
             - invoice_ids: Optional list of specific invoices to pay
             - payment_date: When to make the payment (default: today)
             - payment_method: How to pay (check, ACH, wire, etc.)
+        context: Optional RAG context already retrieved by the caller
     
     Returns:
         Dict with:
@@ -40,40 +252,9 @@ async def handle_vendor_payment(entities: Dict[str, Any]) -> Dict[str, Any]:
             - payment_data: Structured payment data
             - _metadata: Metadata about the operation
     """
-    try:
-        # Normalize date
-        date_str = entities.get("payment_date", "today")
-        if date_str in ("today", None):
-            date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-            
-        vendor_id = entities.get("vendor_id")
-        invoice_ids = entities.get("invoice_ids", [])
-        payment_method = entities.get("payment_method", "ACH")
-            
-        # TODO: Implement vendor payment logic
-        adapter = get_banking_adapter()
-        
-        # Use RAG+LLM for narrative generation
-        query = f"Process vendor payment for {vendor_id} on {date_str} via {payment_method}"
-        if invoice_ids:
-            query += f" for invoices {', '.join(invoice_ids)}"
-            
-        context = await rag_module.generate_context(query, filter_criteria={"category": "ap_payments"})
-        system_prompt = "You are a financial assistant specializing in accounts payable payment processing..."
-        response = await generate_text(
-            prompt=query,
-            system_prompt=(system_prompt if context else system_prompt + "\n\nNote: no docs found."),
-            context=context
-        )
-        
-        result = {"formatted_response": response, "context_used": bool(context)}
-        result["_metadata"] = {"operation": "ap_aging/vendor_payment", "success": True}
-        return result
-    except Exception as e:
-        logger.error(f"Error in vendor_payment: {e}")
-        return {"error": str(e), "_metadata": {"operation": "ap_aging/vendor_payment", "success": False}}
+    return await _run_rag_llm("vendor_payment", entities, context)
 
-async def handle_payment_schedule(entities: Dict[str, Any]) -> Dict[str, Any]:
+async def handle_payment_schedule(entities: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
     """
     Generate or manage payment schedules for upcoming vendor payments.
     
@@ -82,6 +263,7 @@ async def handle_payment_schedule(entities: Dict[str, Any]) -> Dict[str, Any]:
             - date_range: str or dict with start_date and end_date
             - vendor_id: Optional vendor to filter by
             - prioritization: How to prioritize payments (due_date, discount, vendor_importance)
+        context: Optional RAG context already retrieved by the caller
     
     Returns:
         Dict with:
@@ -89,40 +271,9 @@ async def handle_payment_schedule(entities: Dict[str, Any]) -> Dict[str, Any]:
             - schedule_data: Structured payment schedule data
             - _metadata: Metadata about the operation
     """
-    try:
-        # Normalize date
-        date_str = entities.get("date", "today")
-        if date_str in ("today", None):
-            date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-            
-        vendor_id = entities.get("vendor_id")
-        prioritization = entities.get("prioritization", "due_date")
-            
-        # TODO: Implement payment schedule logic
-        adapter = get_banking_adapter()
-        
-        # Use RAG+LLM for narrative generation
-        query = f"Generate a payment schedule starting from {date_str}"
-        if vendor_id:
-            query += f" for vendor {vendor_id}"
-        query += f" prioritized by {prioritization}"
-            
-        context = await rag_module.generate_context(query, filter_criteria={"category": "ap_scheduling"})
-        system_prompt = "You are a financial assistant specializing in accounts payable payment scheduling..."
-        response = await generate_text(
-            prompt=query,
-            system_prompt=(system_prompt if context else system_prompt + "\n\nNote: no docs found."),
-            context=context
-        )
-        
-        result = {"formatted_response": response, "context_used": bool(context)}
-        result["_metadata"] = {"operation": "ap_aging/payment_schedule", "success": True}
-        return result
-    except Exception as e:
-        logger.error(f"Error in payment_schedule: {e}")
-        return {"error": str(e), "_metadata": {"operation": "ap_aging/payment_schedule", "success": False}}
+    return await _run_rag_llm("payment_schedule", entities, context)
 
-async def handle_early_payment_discount(entities: Dict[str, Any]) -> Dict[str, Any]:
+async def handle_early_payment_discount(entities: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
     """
     Identify and analyze early payment discount opportunities.
     
@@ -131,6 +282,7 @@ async def handle_early_payment_discount(entities: Dict[str, Any]) -> Dict[str, A
             - date_range: str or dict with start_date and end_date
             - vendor_id: Optional vendor to filter by
             - minimum_discount: Minimum discount percentage to consider
+        context: Optional RAG context already retrieved by the caller
     
     Returns:
         Dict with:
@@ -138,40 +290,9 @@ async def handle_early_payment_discount(entities: Dict[str, Any]) -> Dict[str, A
             - discount_data: Structured discount opportunity data
             - _metadata: Metadata about the operation
     """
-    try:
-        # Normalize date
-        date_str = entities.get("date", "today")
-        if date_str in ("today", None):
-            date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-            
-        vendor_id = entities.get("vendor_id")
-        minimum_discount = entities.get("minimum_discount", 1.0)  # Default 1% minimum
-            
-        # TODO: Implement early payment discount logic
-        adapter = get_banking_adapter()
-        
-        # Use RAG+LLM for narrative generation
-        query = f"Identify early payment discount opportunities as of {date_str}"
-        if vendor_id:
-            query += f" for vendor {vendor_id}"
-        query += f" with minimum discount of {minimum_discount}%"
-            
-        context = await rag_module.generate_context(query, filter_criteria={"category": "payment_discounts"})
-        system_prompt = "You are a financial assistant specializing in identifying and analyzing early payment discount opportunities..."
-        response = await generate_text(
-            prompt=query,
-            system_prompt=(system_prompt if context else system_prompt + "\n\nNote: no docs found."),
-            context=context
-        )
-        
-        result = {"formatted_response": response, "context_used": bool(context)}
-        result["_metadata"] = {"operation": "ap_aging/early_payment_discount", "success": True}
-        return result
-    except Exception as e:
-        logger.error(f"Error in early_payment_discount: {e}")
-        return {"error": str(e), "_metadata": {"operation": "ap_aging/early_payment_discount", "success": False}}
+    return await _run_rag_llm("early_payment_discount", entities, context)
 
-async def handle_payment_terms_negotiation(entities: Dict[str, Any]) -> Dict[str, Any]:
+async def handle_payment_terms_negotiation(entities: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
     """
     Generate strategies for negotiating better payment terms with vendors.
     
@@ -180,6 +301,7 @@ async def handle_payment_terms_negotiation(entities: Dict[str, Any]) -> Dict[str
             - vendor_id: Vendor to analyze for negotiation
             - target_terms: Desired payment terms (e.g., "net 45", "2/10 net 30")
             - relationship_length: How long we've worked with this vendor
+        context: Optional RAG context already retrieved by the caller
     
     Returns:
         Dict with:
@@ -187,37 +309,9 @@ async def handle_payment_terms_negotiation(entities: Dict[str, Any]) -> Dict[str
             - negotiation_data: Structured negotiation points
             - _metadata: Metadata about the operation
     """
-    try:
-        vendor_id = entities.get("vendor_id")
-        target_terms = entities.get("target_terms")
-        relationship_length = entities.get("relationship_length")
-            
-        # TODO: Implement payment terms negotiation logic
-        adapter = get_banking_adapter()
-        
-        # Use RAG+LLM for narrative generation
-        query = f"Generate a payment terms negotiation strategy for vendor {vendor_id}"
-        if target_terms:
-            query += f" targeting terms of {target_terms}"
-        if relationship_length:
-            query += f" based on {relationship_length} relationship"
-            
-        context = await rag_module.generate_context(query, filter_criteria={"category": "vendor_negotiations"})
-        system_prompt = "You are a financial assistant specializing in vendor payment terms negotiation..."
-        response = await generate_text(
-            prompt=query,
-            system_prompt=(system_prompt if context else system_prompt + "\n\nNote: no docs found."),
-            context=context
-        )
-        
-        result = {"formatted_response": response, "context_used": bool(context)}
-        result["_metadata"] = {"operation": "ap_aging/payment_terms_negotiation", "success": True}
-        return result
-    except Exception as e:
-        logger.error(f"Error in payment_terms_negotiation: {e}")
-        return {"error": str(e), "_metadata": {"operation": "ap_aging/payment_terms_negotiation", "success": False}}
+    return await _run_rag_llm("payment_terms_negotiation", entities, context)
 
-async def handle_vendor_balance(entities: Dict[str, Any]) -> Dict[str, Any]:
+async def handle_vendor_balance(entities: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
     """
     Retrieve and analyze vendor balances and payment history.
     
@@ -226,6 +320,7 @@ async def handle_vendor_balance(entities: Dict[str, Any]) -> Dict[str, Any]:
             - date: As of date for the balance (default: today)
             - vendor_id: Optional specific vendor to analyze
             - include_history: Whether to include payment history (default: False)
+        context: Optional RAG context already retrieved by the caller
     
     Returns:
         Dict with:
@@ -233,44 +328,77 @@ async def handle_vendor_balance(entities: Dict[str, Any]) -> Dict[str, Any]:
             - balance_data: Structured balance data
             - _metadata: Metadata about the operation
     """
+    return await _run_rag_llm("vendor_balance", entities, context)
+
+
+# Operations that can be combined in one handle_batch request
+BATCH_OPERATIONS = {
+    "vendor_payment": handle_vendor_payment,
+    "payment_schedule": handle_payment_schedule,
+    "early_payment_discount": handle_early_payment_discount,
+    "payment_terms_negotiation": handle_payment_terms_negotiation,
+    "vendor_balance": handle_vendor_balance,
+}
+
+async def _prefetch_context(op: str, entities: Dict[str, Any]) -> Optional[str]:
+    """
+    Retrieve the RAG context of one batched operation ahead of its LLM call.
+
+    Returns None on failure, so the operation retrieves the context itself
+    and reports any error in its own result rather than failing the batch.
+    """
+    build_query, rag_filter = OPERATIONS[op][:2]
     try:
-        # Normalize date
-        date_str = entities.get("date", "today")
-        if date_str in ("today", None):
-            date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-            
-        vendor_id = entities.get("vendor_id")
-        include_history = entities.get("include_history", False)
-            
-        # TODO: Implement vendor balance logic
-        adapter = get_banking_adapter()
-        
-        # Use RAG+LLM for narrative generation
-        query = f"Retrieve vendor balance as of {date_str}"
-        if vendor_id:
-            query += f" for vendor {vendor_id}"
-        if include_history:
-            query += " with payment history"
-            
-        context = await rag_module.generate_context(query, filter_criteria={"category": "ap_aging"})
-        system_prompt = "You are a financial assistant specializing in accounts payable vendor analysis..."
-        response = await generate_text(
-            prompt=query,
-            system_prompt=(system_prompt if context else system_prompt + "\n\nNote: no docs found."),
-            context=context
-        )
-        
-        result = {"formatted_response": response, "context_used": bool(context)}
-        result["_metadata"] = {"operation": "ap_aging/vendor_balance", "success": True}
-        return result
+        return await cached_generate_context(build_query(entities), filter_criteria=rag_filter)
+    except Exception as e:
+        logger.warning("Context prefetch failed for %s: %s", op, e)
+        return None
+
+async def handle_batch(entities: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run several AP operations concurrently.
+
+    The RAG contexts of all operations are retrieved first in one concurrent
+    pass (uncached lookups are served by the batcher with one retrieval), then
+    the LLM calls run concurrently with those contexts passed through.
+
+    Args:
+        entities: Dictionary containing:
+            - operations: List of {"operation": name, "entities": {...}} requests,
+              where name is a key of BATCH_OPERATIONS
+
+    Returns:
+        Dict with:
+            - results: Result of each operation, in request order
+            - _metadata: Metadata about the operation
+    """
+    try:
+        operations = entities.get("operations", [])
+        unknown = [op.get("operation") for op in operations if op.get("operation") not in BATCH_OPERATIONS]
+        if unknown:
+            return {
+                "error": f"Unknown operations: {', '.join(map(str, unknown))}",
+                "available_operations": list(BATCH_OPERATIONS),
+                "_metadata": {"operation": "ap_aging/batch", "success": False},
+            }
+
+        requests = [(op["operation"], op.get("entities") or {}) for op in operations]
+        contexts = await asyncio.gather(*(_prefetch_context(name, op_entities) for name, op_entities in requests))
+        results = await asyncio.gather(*(
+            BATCH_OPERATIONS[name](op_entities, context)
+            for (name, op_entities), context in zip(requests, contexts)
+        ))
+
+        return {"results": list(results), "_metadata": {"operation": "ap_aging/batch", "success": True}}
     except Exception as e:
-        logger.error(f"Error in vendor_balance: {e}")
-        return {"error": str(e), "_metadata": {"operation": "ap_aging/vendor_balance", "success": False}}
+        logger.exception("Error in batch: %s", e)
+        return {"error": str(e), "_metadata": {"operation": "ap_aging/batch", "success": False}}
 
 __all__ = [
     "handle_vendor_payment",
     "handle_payment_schedule",
     "handle_early_payment_discount",
     "handle_payment_terms_negotiation",
-    "handle_vendor_balance"
+    "handle_vendor_balance",
+    "handle_batch",
 ]
\ No newline at end of file
@@ -14,16 +14,220 @@ Features:
 import asyncio
 import datetime
 import logging
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple
 
-from modules.bank_adapters import get_banking_adapter
+import orjson
+
+from modules.bank_adapters import BankingAdapter, get_banking_adapter
 from modules.llm_module import generate_text
-from modules.rag_module import rag_module
+from modules.rag_cache import cached_generate_context
+from modules.single_flight import single_flight
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
-async def handle_customer_balance(entities: Dict[str, Any]) -> Dict[str, Any]:
+_adapter: Optional[BankingAdapter] = None
+_OPERATION_INFLIGHT: Dict[Tuple[str, bytes], asyncio.Task] = {}
+
+
+# RAG filter criteria per document category, shared by every request
+AR_AGING_FILTER = MappingProxyType({"category": "ar_aging"})
+COLLECTIONS_FILTER = MappingProxyType({"category": "collections"})
+CREDIT_MANAGEMENT_FILTER = MappingProxyType({"category": "credit_management"})
+BAD_DEBT_FILTER = MappingProxyType({"category": "bad_debt"})
+
+# System prompts, with variants for when no documents were retrieved
+NO_DOCS_NOTE = "\n\nNote: no docs found."
+CONTEXT_PROMPT_TEMPLATE = "{prompt}\n\nAdditional relevant context:\n{context}"
+
+CUSTOMER_BALANCE_PROMPT = "You are a financial assistant specializing in accounts receivable aging analysis..."
+CUSTOMER_BALANCE_NO_CONTEXT_PROMPT = CUSTOMER_BALANCE_PROMPT + NO_DOCS_NOTE
+
+OVERDUE_ACCOUNTS_PROMPT = "You are a financial assistant specializing in accounts receivable collection analysis..."
+OVERDUE_ACCOUNTS_NO_CONTEXT_PROMPT = OVERDUE_ACCOUNTS_PROMPT + NO_DOCS_NOTE
+
+COLLECTION_STRATEGY_PROMPT = "You are a financial assistant specializing in accounts receivable collection strategies..."
+COLLECTION_STRATEGY_NO_CONTEXT_PROMPT = COLLECTION_STRATEGY_PROMPT + NO_DOCS_NOTE
+
+CREDIT_LIMIT_PROMPT = "You are a financial assistant specializing in customer credit management..."
+CREDIT_LIMIT_NO_CONTEXT_PROMPT = CREDIT_LIMIT_PROMPT + NO_DOCS_NOTE
+
+BAD_DEBT_PROMPT = "You are a financial assistant specializing in accounts receivable bad debt analysis..."
+BAD_DEBT_NO_CONTEXT_PROMPT = BAD_DEBT_PROMPT + NO_DOCS_NOTE
+
+
+def _get_adapter() -> BankingAdapter:
+    """
+    Return the module's banking adapter, creating it on first use.
+
+    Handlers should share this instance rather than building a new adapter
+    (and its client session) per request. Not called yet: it is for the
+    handlers' TODOs once they fetch AR data from the bank.
+    """
+    global _adapter
+    if _adapter is None:
+        _adapter = get_banking_adapter()
+    return _adapter
+
+
+@lru_cache(maxsize=1)
+def _today_iso(ordinal: int) -> str:
+    """ISO date string for a date ordinal; memoized so each day is formatted once."""
+    return datetime.date.fromordinal(ordinal).isoformat()
+
+
+def _normalize_date(date_str: Optional[str]) -> str:
+    """Resolve "today" (or a missing date) to today's ISO date."""
+    return _today_iso(datetime.date.today().toordinal()) if date_str in ("today", None) else date_str
+
+
+# Query builders, one per operation
+def _customer_balance_query(entities: Dict[str, Any]) -> str:
+    """Build the RAG/LLM query for handle_customer_balance."""
+    date_str = _normalize_date(entities.get("date", "today"))
+
+    # Get customer info
+    customer_id = entities.get("customer_id")
+
+    # TODO: Implement customer balance logic
+
+    return "".join((
+        f"Generate a customer balance report with aging analysis as of {date_str}",
+        f" for customer {customer_id}" if customer_id else "",
+    ))
+
+
+def _overdue_accounts_query(entities: Dict[str, Any]) -> str:
+    """Build the RAG/LLM query for handle_overdue_accounts."""
+    date_str = _normalize_date(entities.get("date", "today"))
+
+    days_overdue = entities.get("days_overdue", 30)
+
+    # TODO: Implement overdue accounts logic
+
+    return f"Generate a report of accounts that are {days_overdue}+ days overdue as of {date_str}"
+
+
+def _collection_strategy_query(entities: Dict[str, Any]) -> str:
+    """Build the RAG/LLM query for handle_collection_strategy."""
+    # Get customer info
+    customer_id = entities.get("customer_id")
+    invoice_ids = entities.get("invoice_ids", [])
+    strategy_type = entities.get("strategy_type")
+
+    # TODO: Implement collection strategy logic
+
+    return "".join((
+        "Generate a collection strategy",
+        f" for customer {customer_id}" if customer_id else "",
+        f" using {strategy_type} approach" if strategy_type else "",
+    ))
+
+
+def _credit_limit_query(entities: Dict[str, Any]) -> str:
+    """Build the RAG/LLM query for handle_credit_limit."""
+    # Get customer and action info
+    customer_id = entities.get("customer_id")
+    action = entities.get("action", "check")
+    amount = entities.get("amount")
+
+    # TODO: Implement credit limit logic
+
+    return "".join((
+        f"Generate a {action} credit limit analysis",
+        f" for customer {customer_id}" if customer_id else "",
+        f" with proposed {action} to {amount}" if amount and action in ("increase", "decrease") else "",
+    ))
+
+
+def _bad_debt_query(entities: Dict[str, Any]) -> str:
+    """Build the RAG/LLM query for handle_bad_debt."""
+    date_str = _normalize_date(entities.get("date", "today"))
+
+    threshold_days = entities.get("threshold_days", 90)
+    customer_id = entities.get("customer_id")
+
+    # TODO: Implement bad debt analysis logic
+
+    return "".join((
+        f"Generate a bad debt analysis for accounts {threshold_days}+ days overdue as of {date_str}",
+        f" for customer {customer_id}" if customer_id else "",
+    ))
+
+
+# Operation name -> (query builder, RAG filter, system prompt, no-context system prompt)
+OPERATIONS = {
+    "customer_balance": (_customer_balance_query, AR_AGING_FILTER, CUSTOMER_BALANCE_PROMPT, CUSTOMER_BALANCE_NO_CONTEXT_PROMPT),
+    "overdue_accounts": (_overdue_accounts_query, AR_AGING_FILTER, OVERDUE_ACCOUNTS_PROMPT, OVERDUE_ACCOUNTS_NO_CONTEXT_PROMPT),
+    "collection_strategy": (_collection_strategy_query, COLLECTIONS_FILTER, COLLECTION_STRATEGY_PROMPT, COLLECTION_STRATEGY_NO_CONTEXT_PROMPT),
+    "credit_limit": (_credit_limit_query, CREDIT_MANAGEMENT_FILTER, CREDIT_LIMIT_PROMPT, CREDIT_LIMIT_NO_CONTEXT_PROMPT),
+    "bad_debt": (_bad_debt_query, BAD_DEBT_FILTER, BAD_DEBT_PROMPT, BAD_DEBT_NO_CONTEXT_PROMPT),
+}
+
+
+async def _generate_narrative(op: str, entities: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the operation's query, retrieve RAG context for it and generate the narrative.
+
+    Args:
+        op: Operation name, a key of OPERATIONS
+        entities: Entities passed to the operation's handler
+        context: Optional RAG context already retrieved by the caller
+
+    Returns:
+        Dict with formatted_response, context_used and _metadata
+    """
+    build_query, rag_filter, system_prompt, no_context_prompt = OPERATIONS[op]
+    try:
+        query = build_query(entities)
+        if context is None:
+            context = await cached_generate_context(query, filter_criteria=rag_filter)
+        response = await generate_text(
+            prompt=query,
+            system_prompt=CONTEXT_PROMPT_TEMPLATE.format(prompt=system_prompt, context=context) if context else no_context_prompt,
+        )
+
+        # _metadata must be a fresh dict: the operation manager updates it in place
+        return {
+            "formatted_response": response,
+            "context_used": bool(context),
+            "_metadata": {"operation": f"ar_aging/{op}", "success": True},
+        }
+    except Exception as e:
+        logger.exception("Error in %s: %s", op, e)
+        return {"error": str(e), "_metadata": {"operation": f"ar_aging/{op}", "success": False}}
+
+
+async def _run_rag_llm(op: str, entities: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run an operation, sharing one RAG+LLM run between concurrent identical requests.
+
+    Calls for the same operation and entities that arrive while a run is in
+    flight wait for it and receive a copy of its result.
+
+    Args:
+        op: Operation name, a key of OPERATIONS
+        entities: Entities passed to the operation's handler
+        context: Optional RAG context already retrieved by the caller
+
+    Returns:
+        Dict with formatted_response, context_used and _metadata
+    """
+    if context is not None:
+        return await _generate_narrative(op, entities, context)
+    try:
+        key = (op, orjson.dumps(entities, option=orjson.OPT_SORT_KEYS))
+    except TypeError:
+        # Entities that cannot be serialized are never coalesced
+        return await _generate_narrative(op, entities)
+
+    result = await single_flight(_OPERATION_INFLIGHT, key, lambda: _generate_narrative(op, entities))
+    # Each caller gets its own _metadata: the operation manager updates it in place
+    return {**result, "_metadata": dict(result["_metadata"])}
+
+async def handle_customer_balance(entities: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
     """
     Retrieve and analyze customer balances with aging buckets.
     
@@ -32,6 +236,7 @@ async def handle_customer_balance(entities: Dict[str, Any]) -> Dict[str, Any]:
             - date: As of date for the balance (default: today)
             - customer_id: Optional specific customer to analyze
             - aging_buckets: Optional custom aging buckets
+        context: Optional RAG context already retrieved by the caller
     
     Returns:
         Dict with:
@@ -39,40 +244,9 @@ async def handle_customer_balance(entities: Dict[str, Any]) -> Dict[str, Any]:
             - balance_data: Structured balance data
             - _metadata: Metadata about the operation
     """
-    try:
-        # Normalize date
-        date_str = entities.get("date", "today")
-        if date_str in ("today", None):
-            date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-            
-        # Get customer info
-        customer_id = entities.get("customer_id")
-            
-        # TODO: Implement customer balance logic
-        # Fetch AR data from banking adapter
-        adapter = get_banking_adapter()
-        
-        # Use RAG+LLM for narrative generation
-        query = f"Generate a customer balance report with aging analysis as of {date_str}"
-        if customer_id:
-            query += f" for customer {customer_id}"
-            
-        context = await rag_module.generate_context(query, filter_criteria={"category": "ar_aging"})
-        system_prompt = "You are a financial assistant specializing in accounts receivable aging analysis..."
-        response = await generate_text(
-            prompt=query,
-            system_prompt=(system_prompt if context else system_prompt + "\n\nNote: no docs found."),
-            context=context
-        )
-        
-        result = {"formatted_response": response, "context_used": bool(context)}
-        result["_metadata"] = {"operation": "ar_aging/customer_balance", "success": True}
-        return result
-    except Exception as e:
-        logger.error(f"Error in customer_balance: {e}")
-        return {"error": str(e), "_metadata": {"operation": "ar_aging/customer_balance", "success": False}}
+    return await _run_rag_llm("customer_balance", entities, context)
 
-async def handle_overdue_accounts(entities: Dict[str, Any]) -> Dict[str, Any]:
+async def handle_overdue_accounts(entities: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
     """
     Identify and report on overdue customer accounts.
     
@@ -81,6 +255,7 @@ async def handle_overdue_accounts(entities: Dict[str, Any]) -> Dict[str, Any]:
             - date: As of date for the analysis (default: today)
             - days_overdue: Minimum days overdue to include (default: 30)
             - sort_by: How to sort results (amount, days_overdue)
+        context: Optional RAG context already retrieved by the caller
     
     Returns:
         Dict with:
@@ -88,35 +263,9 @@ async def handle_overdue_accounts(entities: Dict[str, Any]) -> Dict[str, Any]:
             - overdue_data: Structured overdue accounts data
             - _metadata: Metadata about the operation
     """
-    try:
-        # Normalize date
-        date_str = entities.get("date", "today")
-        if date_str in ("today", None):
-            date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-            
-        days_overdue = entities.get("days_overdue", 30)
-            
-        # TODO: Implement overdue accounts logic
-        adapter = get_banking_adapter()
-        
-        # Use RAG+LLM for narrative generation
-        query = f"Generate a report of accounts that are {days_overdue}+ days overdue as of {date_str}"
-        context = await rag_module.generate_context(query, filter_criteria={"category": "ar_aging"})
-        system_prompt = "You are a financial assistant specializing in accounts receivable collection analysis..."
-        response = await generate_text(
-            prompt=query,
-            system_prompt=(system_prompt if context else system_prompt + "\n\nNote: no docs found."),
-            context=context
-        )
-        
-        result = {"formatted_response": response, "context_used": bool(context)}
-        result["_metadata"] = {"operation": "ar_aging/overdue_accounts", "success": True}
-        return result
-    except Exception as e:
-        logger.error(f"Error in overdue_accounts: {e}")
-        return {"error": str(e), "_metadata": {"operation": "ar_aging/overdue_accounts", "success": False}}
+    return await _run_rag_llm("overdue_accounts", entities, context)
 
-async def handle_collection_strategy(entities: Dict[str, Any]) -> Dict[str, Any]:
+async def handle_collection_strategy(entities: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
     """
     Generate collection strategies for past due accounts.
     
@@ -125,6 +274,7 @@ async def handle_collection_strategy(entities: Dict[str, Any]) -> Dict[str, Any]
             - customer_id: Optional specific customer to analyze
             - invoice_ids: Optional specific invoices to address
             - strategy_type: Type of collection strategy (email, call, payment_plan)
+        context: Optional RAG context already retrieved by the caller
     
     Returns:
         Dict with:
@@ -132,38 +282,9 @@ async def handle_collection_strategy(entities: Dict[str, Any]) -> Dict[str, Any]
             - action_items: Structured action items for collection
             - _metadata: Metadata about the operation
     """
-    try:
-        # Get customer info
-        customer_id = entities.get("customer_id")
-        invoice_ids = entities.get("invoice_ids", [])
-        strategy_type = entities.get("strategy_type")
-            
-        # TODO: Implement collection strategy logic
-        adapter = get_banking_adapter()
-        
-        # Use RAG+LLM for narrative generation
-        query = "Generate a collection strategy"
-        if customer_id:
-            query += f" for customer {customer_id}"
-        if strategy_type:
-            query += f" using {strategy_type} approach"
-            
-        context = await rag_module.generate_context(query, filter_criteria={"category": "collections"})
-        system_prompt = "You are a financial assistant specializing in accounts receivable collection strategies..."
-        response = await generate_text(
-            prompt=query,
-            system_prompt=(system_prompt if context else system_prompt + "\n\nNote: no docs found."),
-            context=context
-        )
-        
-        result = {"formatted_response": response, "context_used": bool(context)}
-        result["_metadata"] = {"operation": "ar_aging/collection_strategy", "success": True}
-        return result
-    except Exception as e:
-        logger.error(f"Error in collection_strategy: {e}")
-        return {"error": str(e), "_metadata": {"operation": "ar_aging/collection_strategy", "success": False}}
+    return await _run_rag_llm("collection_strategy", entities, context)
 
-async def handle_credit_limit(entities: Dict[str, Any]) -> Dict[str, Any]:
+async def handle_credit_limit(entities: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
     """
     Manage customer credit limits and approval processes.
     
@@ -173,6 +294,7 @@ async def handle_credit_limit(entities: Dict[str, Any]) -> Dict[str, Any]:
             - action: Action to perform (check, increase, decrease)
             - amount: New credit limit amount if updating
             - reason: Reason for credit limit change
+        context: Optional RAG context already retrieved by the caller
     
     Returns:
         Dict with:
@@ -180,38 +302,9 @@ async def handle_credit_limit(entities: Dict[str, Any]) -> Dict[str, Any]:
             - credit_data: Structured credit limit data
             - _metadata: Metadata about the operation
     """
-    try:
-        # Get customer and action info
-        customer_id = entities.get("customer_id")
-        action = entities.get("action", "check")
-        amount = entities.get("amount")
-            
-        # TODO: Implement credit limit logic
-        adapter = get_banking_adapter()
-        
-        # Use RAG+LLM for narrative generation
-        query = f"Generate a {action} credit limit analysis"
-        if customer_id:
-            query += f" for customer {customer_id}"
-        if amount and action in ("increase", "decrease"):
-            query += f" with proposed {action} to {amount}"
-            
-        context = await rag_module.generate_context(query, filter_criteria={"category": "credit_management"})
-        system_prompt = "You are a financial assistant specializing in customer credit management..."
-        response = await generate_text(
-            prompt=query,
-            system_prompt=(system_prompt if context else system_prompt + "\n\nNote: no docs found."),
-            context=context
-        )
-        
-        result = {"formatted_response": response, "context_used": bool(context)}
-        result["_metadata"] = {"operation": "ar_aging/credit_limit", "success": True}
-        return result
-    except Exception as e:
-        logger.error(f"Error in credit_limit: {e}")
-        return {"error": str(e), "_metadata": {"operation": "ar_aging/credit_limit", "success": False}}
+    return await _run_rag_llm("credit_limit", entities, context)
 
-async def handle_bad_debt(entities: Dict[str, Any]) -> Dict[str, Any]:
+async def handle_bad_debt(entities: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
     """
     Assess and report on potential bad debt and provisions.
     
@@ -220,6 +313,7 @@ async def handle_bad_debt(entities: Dict[str, Any]) -> Dict[str, Any]:
             - date: As of date for the analysis (default: today)
             - threshold_days: Days overdue to consider for bad debt (default: 90)
             - customer_id: Optional specific customer to analyze
+        context: Optional RAG context already retrieved by the caller
     
     Returns:
         Dict with:
@@ -227,42 +321,77 @@ async def handle_bad_debt(entities: Dict[str, Any]) -> Dict[str, Any]:
             - bad_debt_data: Structured bad debt data
             - _metadata: Metadata about the operation
     """
+    return await _run_rag_llm("bad_debt", entities, context)
+
+
+# Operations that can be combined in one handle_batch request
+BATCH_OPERATIONS = {
+    "customer_balance": handle_customer_balance,
+    "overdue_accounts": handle_overdue_accounts,
+    "collection_strategy": handle_collection_strategy,
+    "credit_limit": handle_credit_limit,
+    "bad_debt": handle_bad_debt,
+}
+
+async def _prefetch_context(op: str, entities: Dict[str, Any]) -> Optional[str]:
+    """
+    Retrieve the RAG context of one batched operation ahead of its LLM call.
+
+    Returns None on failure, so the operation retrieves the context itself
+    and reports any error in its own result rather than failing the batch.
+    """
+    build_query, rag_filter = OPERATIONS[op][:2]
     try:
-        # Normalize date
-        date_str = entities.get("date", "today")
-        if date_str in ("today", None):
-            date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-            
-        threshold_days = entities.get("threshold_days", 90)
-        customer_id = entities.get("customer_id")
-            
-        # TODO: Implement bad debt analysis logic
-        adapter = get_banking_adapter()
-        
-        # Use RAG+LLM for narrative generation
-        query = f"Generate a bad debt analysis for accounts {threshold_days}+ days overdue as of {date_str}"
-        if customer_id:
-            query += f" for customer {customer_id}"
-            
-        context = await rag_module.generate_context(query, filter_criteria={"category": "bad_debt"})
-        system_prompt = "You are a financial assistant specializing in accounts receivable bad debt analysis..."
-        response = await generate_text(
-            prompt=query,
-            system_prompt=(system_prompt if context else system_prompt + "\n\nNote: no docs found."),
-            context=context
-        )
-        
-        result = {"formatted_response": response, "context_used": bool(context)}
-        result["_metadata"] = {"operation": "ar_aging/bad_debt", "success": True}
-        return result
+        return await cached_generate_context(build_query(entities), filter_criteria=rag_filter)
+    except Exception as e:
+        logger.warning("Context prefetch failed for %s: %s", op, e)
+        return None
+
+async def handle_batch(entities: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run several AR operations concurrently.
+
+    The RAG contexts of all operations are retrieved first in one concurrent
+    pass (uncached lookups are served by the batcher with one retrieval), then
+    the LLM calls run concurrently with those contexts passed through.
+
+    Args:
+        entities: Dictionary containing:
+            - operations: List of {"operation": name, "entities": {...}} requests,
+              where name is a key of BATCH_OPERATIONS
+
+    Returns:
+        Dict with:
+            - results: Result of each operation, in request order
+            - _metadata: Metadata about the operation
+    """
+    try:
+        operations = entities.get("operations", [])
+        unknown = [op.get("operation") for op in operations if op.get("operation") not in BATCH_OPERATIONS]
+        if unknown:
+            return {
+                "error": f"Unknown operations: {', '.join(map(str, unknown))}",
+                "available_operations": list(BATCH_OPERATIONS),
+                "_metadata": {"operation": "ar_aging/batch", "success": False},
+            }
+
+        requests = [(op["operation"], op.get("entities") or {}) for op in operations]
+        contexts = await asyncio.gather(*(_prefetch_context(name, op_entities) for name, op_entities in requests))
+        results = await asyncio.gather(*(
+            BATCH_OPERATIONS[name](op_entities, context)
+            for (name, op_entities), context in zip(requests, contexts)
+        ))
+
+        return {"results": list(results), "_metadata": {"operation": "ar_aging/batch", "success": True}}
     except Exception as e:
-        logger.error(f"Error in bad_debt: {e}")
-        return {"error": str(e), "_metadata": {"operation": "ar_aging/bad_debt", "success": False}}
+        logger.exception("Error in batch: %s", e)
+        return {"error": str(e), "_metadata": {"operation": "ar_aging/batch", "success": False}}
 
 __all__ = [
     "handle_customer_balance",
     "handle_overdue_accounts",
     "handle_collection_strategy",
     "handle_credit_limit",
-    "handle_bad_debt"
+    "handle_bad_debt",
+    "handle_batch",
 ]
\ No newline at end of file
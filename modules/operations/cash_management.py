@@ -14,24 +14,186 @@ Features:
 
 Dependencies:
 - bank_adapters: For banking data access
-- rag_module: For retrieving relevant cash documents
+- rag_cache: For retrieving (and reusing) relevant cash documents
 - llm_module: For analysis and recommendations
+- single_flight: For sharing one FX rate lookup between concurrent requests
 """
 
 import asyncio
 import datetime
 import logging
-from typing import Dict, List, Optional
+import time
+from bisect import bisect_left
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
 
 from modules.bank_adapters import get_banking_adapter
+from modules.jit import njit
 from modules.llm_module import generate_text
-from modules.rag_module import rag_module
+from modules.rag_cache import cached_generate_context
+from modules.single_flight import single_flight
 
 from config.settings import settings
 
 
 logger = logging.getLogger(__name__)
 
+# RAG metadata filter shared by every retrieval in this module
+CASH_MANAGEMENT_FILTER = MappingProxyType({"category": "cash_management"})
+
+# (source, target) currency -> (fetched at, rate)
+_FX_RATE_CACHE: Dict[Tuple[str, str], Tuple[float, float]] = {}
+_FX_RATE_INFLIGHT: Dict[Tuple[str, str], asyncio.Task] = {}
+
+_bank_semaphore: Optional[asyncio.Semaphore] = None
+_bank_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_bank_semaphore() -> asyncio.Semaphore:
+    """
+    Return the semaphore bounding concurrent banking API calls.
+
+    It is created per event loop, since a semaphore cannot be shared
+    between loops.
+    """
+    global _bank_semaphore, _bank_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _bank_semaphore is None or _bank_semaphore_loop is not loop:
+        _bank_semaphore = asyncio.Semaphore(settings.BANKING_API_MAX_CONCURRENCY)
+        _bank_semaphore_loop = loop
+    return _bank_semaphore
+
+
+async def _bank_call(method, *args):
+    """Call a banking adapter method, waiting for a free slot under the concurrency limit."""
+    async with _get_bank_semaphore():
+        return await method(*args)
+
+
+async def _get_fx_rate(banking_adapter, source: str, target: str) -> float:
+    """
+    Return the source -> target FX rate, reusing a recently fetched one.
+
+    Rates are cached for FX_RATE_CACHE_TTL_SECONDS, and concurrent misses for
+    the same pair share a single get_fx_rates call.
+
+    Args:
+        banking_adapter: Banking adapter to query on a cache miss
+        source: Currency to convert from
+        target: Currency to convert to
+
+    Returns:
+        Conversion rate
+    """
+    key = (source, target)
+    cached = _FX_RATE_CACHE.get(key)
+    if cached is not None and time.monotonic() - cached[0] < settings.FX_RATE_CACHE_TTL_SECONDS:
+        return cached[1]
+
+    async def fetch() -> float:
+        fx_rates = await _bank_call(banking_adapter.get_fx_rates, source, [target])
+        rate = fx_rates["rates"][target]
+        _FX_RATE_CACHE[key] = (time.monotonic(), rate)
+        return rate
+
+    return await single_flight(_FX_RATE_INFLIGHT, key, fetch)
+
+
+async def _fetch_all_balances(
+    banking_adapter, account_ids: Optional[List[str]] = None
+) -> Tuple[List[Dict], List[str]]:
+    """
+    Fetch several account balances concurrently.
+
+    Args:
+        banking_adapter: Banking adapter to query
+        account_ids: Accounts to fetch (default: settings.CASH_ACCOUNT_IDS)
+
+    Returns:
+        Tuple of (balance data for each account that loaded, IDs of the accounts
+        that failed to load); failures are also logged
+    """
+    if account_ids is None:
+        account_ids = settings.CASH_ACCOUNT_IDS
+    results = await asyncio.gather(
+        *(_bank_call(banking_adapter.get_account_balance, acct_id) for acct_id in account_ids),
+        return_exceptions=True,
+    )
+    accounts_data: List[Dict] = []
+    unavailable: List[str] = []
+    for acct_id, result in zip(account_ids, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error fetching account {acct_id}: {result}")
+            unavailable.append(acct_id)
+        else:
+            accounts_data.append(result)
+    return accounts_data, unavailable
+
+
+async def _convert_balances(
+    banking_adapter, accounts_data: List[Dict], currency: str, raise_errors: bool = False
+) -> Tuple[List[Dict], List[str]]:
+    """
+    Convert foreign-currency balances to the reporting currency.
+
+    One FX rate is fetched per distinct source currency, all concurrently,
+    rather than one lookup per account.
+
+    Args:
+        banking_adapter: Banking adapter to query
+        accounts_data: Account balance data; foreign accounts gain
+            converted_balance/converted_currency in place
+        currency: Reporting currency
+        raise_errors: Raise conversion failures instead of logging and
+            skipping the affected accounts
+
+    Returns:
+        Tuple of (the accounts that were converted or needed no conversion,
+        IDs of the accounts skipped because their FX rate was unavailable)
+    """
+    sources = list(dict.fromkeys(
+        account["currency"] for account in accounts_data if account["currency"] != currency
+    ))
+    rates = await asyncio.gather(
+        *(_get_fx_rate(banking_adapter, source, currency) for source in sources),
+        return_exceptions=True,
+    )
+    rates_by_source = dict(zip(sources, rates))
+
+    # Partition once: native accounts pass through, the rest are converted together
+    converted: List[Dict] = []
+    unconverted: List[str] = []
+    foreign: List[Dict] = []
+    foreign_rates: List[float] = []
+    for account in accounts_data:
+        if account["currency"] == currency:
+            converted.append(account)
+            continue
+        rate = rates_by_source[account["currency"]]
+        if rate is None:
+            rate = ValueError(f"No FX rate from {account['currency']} to {currency}")
+        if isinstance(rate, Exception):
+            if raise_errors:
+                raise rate
+            logger.error(f"Error fetching account {account['account_id']}: {rate}")
+            unconverted.append(account["account_id"])
+            continue
+        converted.append(account)
+        foreign.append(account)
+        foreign_rates.append(rate)
+
+    if foreign:
+        balances = np.array([account["balance"] for account in foreign], dtype=np.float64)
+        converted_balances = (balances * np.array(foreign_rates, dtype=np.float64)).tolist()
+        for account, converted_balance in zip(foreign, converted_balances):
+            account["converted_balance"] = converted_balance
+            account["converted_currency"] = currency
+
+    return converted, unconverted
+
 
 async def handle_cash_position(entities: Dict) -> Dict:
     """
@@ -50,50 +212,31 @@ async def handle_cash_position(entities: Dict) -> Dict:
 
     # Convert "today" to actual date
     if as_of_date == "today":
-        as_of_date = datetime.datetime.now().strftime("%Y-%m-%d")
+        as_of_date = datetime.date.today().isoformat()
 
     # Get banking adapter
     banking_adapter = get_banking_adapter()
 
     try:
-        accounts_data: List[Dict] = []
-        total_balance: float = 0.0
-
         # If specific account requested
         if account_id:
-            account_data = await banking_adapter.get_account_balance(account_id)
-            accounts_data.append(account_data)
-
-            # Convert if different currency
-            if account_data["currency"] != currency:
-                fx_rates = await banking_adapter.get_fx_rates(
-                    account_data["currency"], [currency]
-                )
-                rate = fx_rates["rates"][currency]
-                converted_balance = account_data["balance"] * rate
-                account_data["converted_balance"] = converted_balance
-                account_data["converted_currency"] = currency
-                total_balance += converted_balance
-            else:
-                total_balance += account_data["balance"]
+            account_data = await _bank_call(banking_adapter.get_account_balance, account_id)
+            accounts_data, unavailable_accounts = await _convert_balances(
+                banking_adapter, [account_data], currency, raise_errors=True
+            )
         else:
-            # Get all accounts (using sample account IDs from bank_adapters)
-            for acct_id in ["1001", "1002", "1003", "1004"]:
-                account_data = await banking_adapter.get_account_balance(acct_id)
-                accounts_data.append(account_data)
-
-                # Convert if different currency
-                if account_data["currency"] != currency:
-                    fx_rates = await banking_adapter.get_fx_rates(
-                        account_data["currency"], [currency]
-                    )
-                    rate = fx_rates["rates"][currency]
-                    converted_balance = account_data["balance"] * rate
-                    account_data["converted_balance"] = converted_balance
-                    account_data["converted_currency"] = currency
-                    total_balance += converted_balance
-                else:
-                    total_balance += account_data["balance"]
+            # Get all configured accounts; ones that fail to load or convert
+            # are reported rather than silently left out of the total
+            accounts_data, unavailable_accounts = await _fetch_all_balances(banking_adapter)
+            accounts_data, unconverted_accounts = await _convert_balances(
+                banking_adapter, accounts_data, currency
+            )
+            unavailable_accounts += unconverted_accounts
+
+        total_balance: float = float(np.sum(
+            [account.get("converted_balance", account["balance"]) for account in accounts_data],
+            dtype=np.float64,
+        ))
 
         # Format response
         message = (
@@ -101,25 +244,117 @@ async def handle_cash_position(entities: Dict) -> Dict:
             f"{total_balance:,.2f} {currency}"
         )
 
-        return {
+        result = {
             "total_balance": total_balance,
             "currency": currency,
             "as_of_date": as_of_date,
             "accounts": accounts_data,
             "message": message,
         }
+        if unavailable_accounts:
+            result["unavailable_accounts"] = unavailable_accounts
+            result["message"] += (
+                f" (incomplete: excludes unavailable accounts {', '.join(unavailable_accounts)})"
+            )
+        return result
 
     except Exception as e:
         logger.error(f"Error in cash position: {e}")
         return {"error": f"Failed to retrieve cash position: {e}"}
 
 
+# Sample forecast parameters: balances and flows grow linearly per period
+FORECAST_START_BALANCE = 1_500_000
+FORECAST_INFLOW_BASE = 800_000
+FORECAST_INFLOW_STEP = 50_000
+FORECAST_OUTFLOW_BASE = 700_000
+FORECAST_OUTFLOW_STEP = 30_000
+
+
+@njit(cache=True)
+def _forecast_kernel(
+    num_periods: int, start_balance: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Sample forecast columns: (inflows, outflows, net flow, beginning, ending balance)."""
+    # Integer arithmetic keeps the sample amounts exact whole numbers
+    steps = np.arange(num_periods).astype(np.int64)
+    inflows = FORECAST_INFLOW_BASE + steps * FORECAST_INFLOW_STEP
+    outflows = FORECAST_OUTFLOW_BASE + steps * FORECAST_OUTFLOW_STEP
+    net_flows = inflows - outflows
+    ending_balances = start_balance + np.cumsum(net_flows)
+    beginning_balances = ending_balances - net_flows
+    return inflows, outflows, net_flows, beginning_balances, ending_balances
+
+
+def _forecast_period_names(period: str, start_date: datetime.date, num_periods: int) -> List[str]:
+    """
+    Label each forecast period, generating all period dates in one pass.
+
+    Args:
+        period: Period type (day, week, month; anything else means quarter)
+        start_date: Date the forecast starts from
+        num_periods: Number of periods to label
+
+    Returns:
+        One display name per period
+    """
+    # ISO day labels come from NumPy's vectorized formatter rather than strftime
+    if period == "day":
+        dates = pd.date_range(start_date + datetime.timedelta(days=1), periods=num_periods, freq="D")
+        return np.datetime_as_string(dates.values, unit="D").tolist()
+    if period == "week":
+        dates = pd.date_range(start_date + datetime.timedelta(weeks=1), periods=num_periods, freq="7D")
+        return [
+            f"Week {i} ({iso[5:7]}/{iso[8:10]})"
+            for i, iso in enumerate(np.datetime_as_string(dates.values, unit="D").tolist(), start=1)
+        ]
+    if period == "month":
+        # Months and quarters start with the one containing start_date
+        dates = pd.date_range(start_date.replace(day=1), periods=num_periods, freq="MS")
+        return dates.strftime("%b %Y").tolist()
+    quarter_start = start_date.replace(month=(start_date.month - 1) // 3 * 3 + 1, day=1)
+    dates = pd.date_range(quarter_start, periods=num_periods, freq="QS")
+    return [f"Q{quarter} {year}" for quarter, year in zip(dates.quarter, dates.year)]
+
+
+def _forecast_rows(
+    period_names: List[str], columns: Tuple[np.ndarray, ...]
+) -> Iterator[Dict]:
+    """
+    Yield one forecast row per period from the _forecast_kernel columns.
+
+    Args:
+        period_names: Display name of each period
+        columns: (inflows, outflows, net flow, beginning, ending balance) arrays
+
+    Yields:
+        Forecast row dicts
+    """
+    inflows, outflows, net_flows, beginning_balances, ending_balances = (
+        column.tolist() for column in columns
+    )
+    for i, period_name in enumerate(period_names):
+        yield {
+            "period": period_name,
+            "inflows": inflows[i],
+            "outflows": outflows[i],
+            "net_flow": net_flows[i],
+            "beginning_balance": beginning_balances[i],
+            "ending_balance": ending_balances[i],
+        }
+
+
 async def handle_cash_flow_forecast(entities: Dict) -> Dict:
     """
     Generate cash flow forecast for specified period.
 
     Args:
-        entities: Dictionary of entities extracted from user intent
+        entities: Dictionary of entities extracted from user intent, containing:
+            - period: Period length, one of day, week, month or quarter (default: month)
+            - num_periods: Number of periods to forecast (default: 3)
+            - currency: Reporting currency (default: USD)
+            - include_rows: Whether to return per-period forecast_data; False
+              returns only the summary (default: True)
 
     Returns:
         Dictionary with cash flow forecast data
@@ -128,11 +363,12 @@ async def handle_cash_flow_forecast(entities: Dict) -> Dict:
     period = entities.get("period", "month")
     num_periods = int(entities.get("num_periods", 3))
     currency = entities.get("currency", "USD")
+    include_rows = entities.get("include_rows", True)
 
     # Get RAG context for cash flow assumptions
     query = f"cash flow forecast {period} {num_periods} periods"
-    context = await rag_module.generate_context(
-        query, filter_criteria={"category": "cash_management"}
+    context = await cached_generate_context(
+        query, filter_criteria=CASH_MANAGEMENT_FILTER
     )
 
     system_prompt = (
@@ -147,50 +383,9 @@ async def handle_cash_flow_forecast(entities: Dict) -> Dict:
 
     # If no context, generate sample data
     if not context:
-        start_date = datetime.datetime.now()
-        forecast_data: List[Dict] = []
-        current_balance = 1_500_000  # Starting balance
-
-        for i in range(num_periods):
-            # Calculate period end date and name
-            if period == "day":
-                period_end = start_date + datetime.timedelta(days=i + 1)
-                period_name = period_end.strftime("%Y-%m-%d")
-            elif period == "week":
-                period_end = start_date + datetime.timedelta(weeks=i + 1)
-                period_name = f"Week {i + 1} ({period_end.strftime('%m/%d')})"
-            elif period == "month":
-                month = start_date.month + i
-                year = start_date.year + (month - 1) // 12
-                month = (month - 1) % 12 + 1
-                period_end = start_date.replace(year=year, month=month)
-                period_name = period_end.strftime("%b %Y")
-            else:  # quarter
-                extra_quarters = i + (start_date.month - 1) // 3
-                extra_years = extra_quarters // 4
-                quarter_month = (extra_quarters % 4) * 3 + 1
-                period_end = start_date.replace(
-                    year=start_date.year + extra_years, month=quarter_month
-                )
-                quarter_num = (quarter_month - 1) // 3 + 1
-                period_name = f"Q{quarter_num} {period_end.year}"
-
-            # Sample data with variability
-            inflows = 800_000 + (i * 50_000)
-            outflows = 700_000 + (i * 30_000)
-            net_flow = inflows - outflows
-            ending_balance = current_balance + net_flow
-
-            forecast_data.append({
-                "period": period_name,
-                "inflows": inflows,
-                "outflows": outflows,
-                "net_flow": net_flow,
-                "beginning_balance": current_balance,
-                "ending_balance": ending_balance,
-            })
-
-            current_balance = ending_balance
+        # Sample data with variability
+        columns = _forecast_kernel(num_periods, FORECAST_START_BALANCE)
+        _, _, _, beginning_balances, ending_balances = columns
 
         periods_text = (
             "days" if period == "day" else
@@ -198,8 +393,8 @@ async def handle_cash_flow_forecast(entities: Dict) -> Dict:
             "months" if period == "month" else
             "quarters"
         )
-        start_balance = forecast_data[0]["beginning_balance"]
-        end_balance = forecast_data[-1]["ending_balance"]
+        start_balance = beginning_balances[0].item()
+        end_balance = ending_balances[-1].item()
         net_change = end_balance - start_balance
 
         message = (
@@ -210,13 +405,17 @@ async def handle_cash_flow_forecast(entities: Dict) -> Dict:
             f"({(net_change / start_balance * 100):.1f}%)"
         )
 
-        return {
+        result = {
             "period_type": period,
             "num_periods": num_periods,
             "currency": currency,
-            "forecast_data": forecast_data,
-            "message": message,
         }
+        # Per-period rows are only materialized when the caller wants them
+        if include_rows:
+            period_names = _forecast_period_names(period, datetime.date.today(), num_periods)
+            result["forecast_data"] = list(_forecast_rows(period_names, columns))
+        result["message"] = message
+        return result
 
     # Generate forecast via LLM
     formatted_response = await generate_text(
@@ -228,6 +427,100 @@ async def handle_cash_flow_forecast(entities: Dict) -> Dict:
     return {"formatted_response": formatted_response}
 
 
+# Sample balance sheet data backing the liquidity analysis (read-only, shared by all requests)
+LIQUIDITY_DATA = MappingProxyType({
+    "current": MappingProxyType({
+        "current_assets": 2_500_000,
+        "cash_equivalents": 1_200_000,
+        "accounts_receivable": 800_000,
+        "inventory": 500_000,
+        "current_liabilities": 1_800_000,
+        "accounts_payable": 750_000,
+        "short_term_debt": 650_000,
+        "accrued_expenses": 400_000,
+    }),
+    "previous_quarter": MappingProxyType({
+        "current_assets": 2_300_000,
+        "cash_equivalents": 1_000_000,
+        "accounts_receivable": 850_000,
+        "inventory": 450_000,
+        "current_liabilities": 1_700_000,
+        "accounts_payable": 720_000,
+        "short_term_debt": 650_000,
+        "accrued_expenses": 330_000,
+    }),
+    "previous_year": MappingProxyType({
+        "current_assets": 2_100_000,
+        "cash_equivalents": 850_000,
+        "accounts_receivable": 780_000,
+        "inventory": 470_000,
+        "current_liabilities": 1_550_000,
+        "accounts_payable": 680_000,
+        "short_term_debt": 600_000,
+        "accrued_expenses": 270_000,
+    }),
+})
+
+# Liquidity data as a structured array with one record per LIQUIDITY_DATA
+# period; each field reads as a typed int64 column across all periods
+_LIQUIDITY_PERIODS = list(LIQUIDITY_DATA)
+_LIQUIDITY_TABLE = np.rec.fromrecords(
+    [tuple(period_data.values()) for period_data in LIQUIDITY_DATA.values()],
+    names=list(LIQUIDITY_DATA["current"]),
+)
+
+
+def _liquidity_ratios(table: np.recarray) -> Dict[str, np.ndarray]:
+    """
+    Compute every liquidity metric for all periods at once.
+
+    Args:
+        table: Liquidity records with LIQUIDITY_DATA's field names
+
+    Returns:
+        Metric name -> array of values, one per record, in report order
+    """
+    daily_revenue = 3_000_000 / 90
+    daily_cogs = 2_000_000 / 90
+    return {
+        "current_ratio": table.current_assets / table.current_liabilities,
+        "quick_ratio": (table.current_assets - table.inventory) / table.current_liabilities,
+        "cash_ratio": table.cash_equivalents / table.current_liabilities,
+        "working_capital": table.current_assets - table.current_liabilities,
+        "dso": table.accounts_receivable / daily_revenue,
+        "dpo": table.accounts_payable / daily_cogs,
+    }
+
+
+# Period -> metric -> value, computed once since the sample data is constant
+_LIQUIDITY_RATIOS: Dict[str, Dict[str, float]] = {
+    period: {name: values[row].item() for name, values in _liquidity_ratios(_LIQUIDITY_TABLE).items()}
+    for row, period in enumerate(_LIQUIDITY_PERIODS)
+}
+
+# Status bands: a ratio above the n-th threshold earns _STATUS_LABELS[n + 1]
+_STATUS_LABELS = ("concerning", "adequate", "strong")
+_STATUS_THRESHOLDS = {
+    "current_ratio": (1.5, 2),
+    "quick_ratio": (1, 1.5),
+    "cash_ratio": (0.5, 0.8),
+}
+
+
+def _ratio_status(metric: str, value: float) -> str:
+    """Classify a liquidity ratio as strong, adequate or concerning."""
+    return _STATUS_LABELS[bisect_left(_STATUS_THRESHOLDS[metric], value)]
+
+
+# Analysis message line per reported metric, in display order
+RATIO_LINE_TEMPLATES = {
+    "current_ratio": "Current Ratio: {value:.2f} ({status})",
+    "quick_ratio": "Quick Ratio: {value:.2f} ({status})",
+    "cash_ratio": "Cash Ratio: {value:.2f} ({status})",
+    "working_capital": "Working Capital: ${value:,.2f}",
+}
+
+
 async def handle_liquidity_analysis(entities: Dict) -> Dict:
     """
     Perform liquidity analysis with key metrics.
@@ -244,90 +537,29 @@ async def handle_liquidity_analysis(entities: Dict) -> Dict:
     if isinstance(metrics, str):
         metrics = [metrics]
 
-    liquidity_data = {
-        "current": {
-            "current_assets": 2_500_000,
-            "cash_equivalents": 1_200_000,
-            "accounts_receivable": 800_000,
-            "inventory": 500_000,
-            "current_liabilities": 1_800_000,
-            "accounts_payable": 750_000,
-            "short_term_debt": 650_000,
-            "accrued_expenses": 400_000,
-        },
-        "previous_quarter": {
-            "current_assets": 2_300_000,
-            "cash_equivalents": 1_000_000,
-            "accounts_receivable": 850_000,
-            "inventory": 450_000,
-            "current_liabilities": 1_700_000,
-            "accounts_payable": 720_000,
-            "short_term_debt": 650_000,
-            "accrued_expenses": 330_000,
-        },
-        "previous_year": {
-            "current_assets": 2_100_000,
-            "cash_equivalents": 850_000,
-            "accounts_receivable": 780_000,
-            "inventory": 470_000,
-            "current_liabilities": 1_550_000,
-            "accounts_payable": 680_000,
-            "short_term_debt": 600_000,
-            "accrued_expenses": 270_000,
-        },
-    }
-
-    if time_period not in liquidity_data:
+    if time_period not in LIQUIDITY_DATA:
         return {
             "error": f"Data not available for time period: {time_period}",
-            "available_periods": list(liquidity_data.keys()),
+            "available_periods": list(LIQUIDITY_DATA.keys()),
         }
 
-    period_data = liquidity_data[time_period]
-    ratios: Dict[str, float] = {}
-
-    if "current_ratio" in metrics:
-        ratios["current_ratio"] = (
-            period_data["current_assets"] / period_data["current_liabilities"]
-        )
-    if "quick_ratio" in metrics:
-        ratios["quick_ratio"] = (
-            (period_data["current_assets"] - period_data["inventory"])
-            / period_data["current_liabilities"]
-        )
-    if "cash_ratio" in metrics:
-        ratios["cash_ratio"] = (
-            period_data["cash_equivalents"] / period_data["current_liabilities"]
-        )
-    if "working_capital" in metrics:
-        ratios["working_capital"] = (
-            period_data["current_assets"] - period_data["current_liabilities"]
-        )
-    if "dso" in metrics:
-        daily_revenue = 3_000_000 / 90
-        ratios["dso"] = period_data["accounts_receivable"] / daily_revenue
-    if "dpo" in metrics:
-        daily_cogs = 2_000_000 / 90
-        ratios["dpo"] = period_data["accounts_payable"] / daily_cogs
+    period_data = LIQUIDITY_DATA[time_period]
+    ratios: Dict[str, float] = {
+        name: value
+        for name, value in _LIQUIDITY_RATIOS[time_period].items()
+        if name in metrics
+    }
 
     # Generate analysis message
     analysis_lines: List[str] = [f"Liquidity Analysis ({time_period}):"]
-
-    if "current_ratio" in ratios:
-        cr = ratios["current_ratio"]
-        status = "strong" if cr > 2 else "adequate" if cr > 1.5 else "concerning"
-        analysis_lines.append(f"Current Ratio: {cr:.2f} ({status})")
-    if "quick_ratio" in ratios:
-        qr = ratios["quick_ratio"]
-        status = "strong" if qr > 1.5 else "adequate" if qr > 1 else "concerning"
-        analysis_lines.append(f"Quick Ratio: {qr:.2f} ({status})")
-    if "cash_ratio" in ratios:
-        cashr = ratios["cash_ratio"]
-        status = "strong" if cashr > 0.8 else "adequate" if cashr > 0.5 else "concerning"
-        analysis_lines.append(f"Cash Ratio: {cashr:.2f} ({status})")
-    if "working_capital" in ratios:
-        wc = ratios["working_capital"]
-        analysis_lines.append(f"Working Capital: ${wc:,.2f}")
+    analysis_lines.extend(
+        template.format(
+            value=ratios[metric],
+            status=_ratio_status(metric, ratios[metric]) if metric in _STATUS_THRESHOLDS else None,
+        )
+        for metric, template in RATIO_LINE_TEMPLATES.items()
+        if metric in ratios
+    )
     if "dso" in metrics and "dpo" in metrics:
         ccc = ratios.get("dso", 0) - ratios.get("dpo", 0)
         analysis_lines.append(f"Cash Conversion Cycle: {ccc:.1f} days")
@@ -336,7 +568,7 @@ async def handle_liquidity_analysis(entities: Dict) -> Dict:
         "time_period": time_period,
         "metrics": metrics,
         "ratios": ratios,
-        "raw_data": period_data,
+        "raw_data": dict(period_data),
         "message": "\n".join(analysis_lines),
     }
 
@@ -358,8 +590,8 @@ async def handle_working_capital(entities: Dict) -> Dict:
     if focus_area:
         query += f" {focus_area}"
 
-    context = await rag_module.generate_context(
-        query, filter_criteria={"category": "cash_management"}
+    context = await cached_generate_context(
+        query, filter_criteria=CASH_MANAGEMENT_FILTER
     )
 
     system_prompt = (
@@ -409,14 +641,6 @@ async def handle_cash_pooling(entities: Dict) -> Dict:
     region = entities.get("region")
 
     banking_adapter = get_banking_adapter()
-    accounts_data: List[Dict] = []
-
-    for acct_id in ["1001", "1002", "1003", "1004"]:
-        try:
-            account_data = await banking_adapter.get_account_balance(acct_id)
-            accounts_data.append(account_data)
-        except Exception as e:
-            logger.error(f"Error fetching account {acct_id}: {e}")
 
     query = f"cash pooling {pooling_type}"
     if currency:
@@ -424,8 +648,12 @@ async def handle_cash_pooling(entities: Dict) -> Dict:
     if region:
         query += f" {region}"
 
-    context = await rag_module.generate_context(
-        query, filter_criteria={"category": "cash_management"}
+    # Account balances and RAG context are independent, so fetch them together
+    (accounts_data, _), context = await asyncio.gather(
+        _fetch_all_balances(banking_adapter),
+        cached_generate_context(
+            query, filter_criteria=CASH_MANAGEMENT_FILTER
+        ),
     )
 
     system_prompt = (
@@ -14,175 +14,921 @@ Features:
 
 Dependencies:
 - bank_adapters: For financial data access
-- rag_module: For retrieving relevant financing documents
+- rag_cache: For retrieving (and reusing) relevant financing documents
 - llm_module: For analysis and recommendations
 """
 
 import asyncio
+import bisect
+import calendar
 import datetime
 import logging
 import random
-from typing import Dict, List, Optional
+import re
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
 
 from modules.bank_adapters import get_banking_adapter
-from modules.llm_module import generate_text
-from modules.rag_module import rag_module
+from modules.jit import njit
+from modules.llm_module import generate_text, generate_text_batch, stream_text
+from modules.rag_cache import cached_generate_context
 
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# RAG metadata filter shared by every retrieval in this module
+EXTERNAL_FINANCING_FILTER = MappingProxyType({"category": "external_financing"})
+
+# Sample market data by currency (would come from financial data provider in real implementation)
+MARKET_RATES = MappingProxyType({
+    "USD": {
+        "risk_free": {
+            "1y": 3.85,
+            "2y": 4.10,
+            "3y": 4.20,
+            "5y": 4.25,
+            "7y": 4.30,
+            "10y": 4.35,
+            "30y": 4.45,
+        },
+        "corporate": {
+            "AA": {
+                "1y": 4.10,
+                "2y": 4.40,
+                "3y": 4.55,
+                "5y": 4.70,
+                "7y": 4.80,
+                "10y": 4.90,
+                "30y": 5.10,
+            },
+            "A": {
+                "1y": 4.35,
+                "2y": 4.70,
+                "3y": 4.90,
+                "5y": 5.10,
+                "7y": 5.25,
+                "10y": 5.40,
+                "30y": 5.65,
+            },
+            "BBB": {
+                "1y": 4.85,
+                "2y": 5.20,
+                "3y": 5.40,
+                "5y": 5.65,
+                "7y": 5.85,
+                "10y": 6.05,
+                "30y": 6.45,
+            },
+        }
+    },
+    "EUR": {
+        "risk_free": {
+            "1y": 2.95,
+            "2y": 3.05,
+            "3y": 3.10,
+            "5y": 3.15,
+            "7y": 3.20,
+            "10y": 3.30,
+            "30y": 3.45,
+        },
+        "corporate": {
+            "AA": {
+                "1y": 3.25,
+                "2y": 3.40,
+                "3y": 3.50,
+                "5y": 3.60,
+                "7y": 3.70,
+                "10y": 3.85,
+                "30y": 4.10,
+            },
+            "A": {
+                "1y": 3.50,
+                "2y": 3.70,
+                "3y": 3.85,
+                "5y": 4.00,
+                "7y": 4.15,
+                "10y": 4.35,
+                "30y": 4.70,
+            },
+            "BBB": {
+                "1y": 4.00,
+                "2y": 4.25,
+                "3y": 4.45,
+                "5y": 4.70,
+                "7y": 4.90,
+                "10y": 5.15,
+                "30y": 5.60,
+            },
+        }
+    }
+})
+
+# Company credit profile (would come from financial system in real implementation)
+COMPANY_CREDIT = MappingProxyType({
+    "rating": "BBB+",
+    "rating_outlook": "stable",
+    "debt_to_ebitda": 2.8,
+    "interest_coverage": 4.2,
+    "existing_debt": 85000000,
+    "existing_debt_currency": "USD",
+})
+
+# Credit rating -> rating band used for rate lookups; anything else is BBB
+RATING_BANDS = MappingProxyType({
+    **dict.fromkeys(("AAA", "AA+", "AA", "AA-"), "AA"),
+    **dict.fromkeys(("A+", "A", "A-"), "A"),
+})
+
+# Requested term -> tenor used for rate lookups
+TERM_MAPPING = MappingProxyType({
+    "1y": "1y", "2y": "2y", "3y": "3y", "5y": "5y",
+    "7y": "7y", "10y": "10y", "30y": "30y",
+    "short": "3y", "medium": "5y", "long": "10y"
+})
+
+# MARKET_RATES as a (currency, curve, tenor) tensor; curve 0 is risk-free and
+# the rest are the corporate rating bands, so one index pair reads both rates
+_RATE_CURVES = ("risk_free", "AA", "A", "BBB")
+_RATE_TERMS = tuple(MARKET_RATES["USD"]["risk_free"])
+_CCY_IDX = {currency: i for i, currency in enumerate(MARKET_RATES)}
+_RATING_IDX = {curve: i for i, curve in enumerate(_RATE_CURVES)}
+_TERM_IDX = {term: i for i, term in enumerate(_RATE_TERMS)}
+_RATES_TENSOR = np.array([
+    [
+        [(rates["risk_free"] if curve == "risk_free" else rates["corporate"][curve])[term] for term in _RATE_TERMS]
+        for curve in _RATE_CURVES
+    ]
+    for rates in MARKET_RATES.values()
+])
+
+@dataclass(slots=True, frozen=True)
+class LoanFees:
+    """Fees of a loan facility."""
+    upfront_fee: float  # percent
+    agency_fee: int  # per year, in the loan currency
+    commitment_fee: Optional[float] = None  # percent
+
+
+@dataclass(slots=True, frozen=True)
+class Loan:
+    """Terms of a loan facility."""
+    loan_id: str
+    name: str
+    type: str
+    lender: str
+    bank_id: str
+    original_amount: int
+    outstanding_amount: int
+    currency: str
+    start_date: str
+    maturity_date: str
+    term: str
+    interest_rate_type: str
+    benchmark: str
+    spread: int  # basis points
+    current_rate: float  # percent
+    payment_frequency: str
+    principal_payment: str
+    prepayment_penalty: str
+    financial_covenants: Tuple[str, ...]
+    security: str
+    key_terms: Tuple[str, ...]
+    fees: LoanFees
+    amortization_schedule: Optional[str] = None
+    collateral: Optional[str] = None
+
+
+def _details_dict(items: List[Tuple[str, Any]]) -> Dict[str, Any]:
+    """asdict() factory that leaves out unset optional fields and returns lists for tuples."""
+    return {
+        name: list(value) if isinstance(value, tuple) else value
+        for name, value in items
+        if value is not None
+    }
 
-async def handle_debt_issuance(entities: Dict) -> Dict:
+
+def _loan_details(record) -> Dict[str, Any]:
+    """Convert a Loan (without its ID) or LoanFees into a plain dict for a response."""
+    details = asdict(record, dict_factory=_details_dict)
+    details.pop("loan_id", None)
+    return details
+
+
+# Sample loan data (would come from debt management system in real implementation)
+LOANS = MappingProxyType({
+    "L001": Loan(
+        loan_id="L001",
+        name="Term Loan A",
+        type="term_loan",
+        lender="Global Trust Bank",
+        bank_id="BNK001",
+        original_amount=25000000,
+        outstanding_amount=20000000,
+        currency="USD",
+        start_date="2022-06-15",
+        maturity_date="2027-06-15",
+        term="5 years",
+        interest_rate_type="floating",
+        benchmark="SOFR",
+        spread=175,  # basis points
+        current_rate=5.5,  # percent
+        payment_frequency="quarterly",
+        principal_payment="amortizing",
+        amortization_schedule="5 years",
+        prepayment_penalty="1% in year 1, 0.5% in year 2, none thereafter",
+        financial_covenants=("Debt/EBITDA <= 3.5x", "Interest Coverage >= 3.0x"),
+        security="unsecured",
+        key_terms=(
+            "Change of control provision",
+            "Material adverse change clause",
+            "Cross-default provision",
+            "Restriction on additional debt"
+        ),
+        fees=LoanFees(
+            upfront_fee=0.75,  # percent
+            commitment_fee=0.375,  # percent
+            agency_fee=25000,  # USD per year
+        ),
+    ),
+    "L002": Loan(
+        loan_id="L002",
+        name="Revolving Credit Facility",
+        type="revolver",
+        lender="Global Trust Bank",
+        bank_id="BNK001",
+        original_amount=15000000,
+        outstanding_amount=8000000,
+        currency="USD",
+        start_date="2022-06-15",
+        maturity_date="2027-06-15",
+        term="5 years",
+        interest_rate_type="floating",
+        benchmark="SOFR",
+        spread=150,  # basis points
+        current_rate=5.25,  # percent
+        payment_frequency="quarterly",
+        principal_payment="bullet",
+        prepayment_penalty="none",
+        financial_covenants=("Debt/EBITDA <= 3.5x", "Interest Coverage >= 3.0x"),
+        security="unsecured",
+        key_terms=(
+            "Change of control provision",
+            "Material adverse change clause",
+            "Cross-default provision",
+            "Restriction on additional debt"
+        ),
+        fees=LoanFees(
+            upfront_fee=0.5,  # percent
+            commitment_fee=0.375,  # percent
+            agency_fee=25000,  # USD per year
+        ),
+    ),
+    "L003": Loan(
+        loan_id="L003",
+        name="Term Loan B",
+        type="term_loan",
+        lender="Continental Financial",
+        bank_id="BNK002",
+        original_amount=50000000,
+        outstanding_amount=48750000,
+        currency="USD",
+        start_date="2023-03-10",
+        maturity_date="2030-03-10",
+        term="7 years",
+        interest_rate_type="floating",
+        benchmark="SOFR",
+        spread=225,  # basis points
+        current_rate=6.0,  # percent
+        payment_frequency="quarterly",
+        principal_payment="1% annual amortization, remainder bullet",
+        amortization_schedule="1% per year, 94% bullet",
+        prepayment_penalty="2% in year 1, 1% in year 2, none thereafter",
+        financial_covenants=("Debt/EBITDA <= 4.0x",),
+        security="secured",
+        collateral="All assets",
+        key_terms=(
+            "Change of control provision",
+            "Material adverse change clause",
+            "Cross-default provision",
+            "Restriction on additional debt",
+            "Excess cash flow sweep"
+        ),
+        fees=LoanFees(
+            upfront_fee=1.5,  # percent
+            agency_fee=35000,  # USD per year
+        ),
+    ),
+    "L004": Loan(
+        loan_id="L004",
+        name="Euro Term Loan",
+        type="term_loan",
+        lender="European Credit Bank",
+        bank_id="BNK003",
+        original_amount=20000000,
+        outstanding_amount=20000000,
+        currency="EUR",
+        start_date="2023-09-15",
+        maturity_date="2028-09-15",
+        term="5 years",
+        interest_rate_type="floating",
+        benchmark="EURIBOR",
+        spread=200,  # basis points
+        current_rate=4.5,  # percent
+        payment_frequency="quarterly",
+        principal_payment="bullet",
+        prepayment_penalty="1% in year 1, none thereafter",
+        financial_covenants=("Debt/EBITDA <= 3.75x", "Interest Coverage >= 3.0x"),
+        security="unsecured",
+        key_terms=(
+            "Change of control provision",
+            "Material adverse change clause",
+            "Cross-default provision"
+        ),
+        fees=LoanFees(
+            upfront_fee=0.75,  # percent
+            commitment_fee=0.35,  # percent
+            agency_fee=25000,  # EUR per year
+        ),
+    ),
+})
+
+# Sample exchange rates, USD per unit of currency (would come from banking API in real implementation)
+FX_RATES = MappingProxyType({"USD": 1.0, "EUR": 1.09})
+
+# Column arrays over LOANS for the portfolio summary; currencies are indexed
+# in order of first appearance
+_LOAN_CURRENCIES = list(dict.fromkeys(loan.currency for loan in LOANS.values()))
+_LOAN_AMOUNTS = np.array([loan.outstanding_amount for loan in LOANS.values()], dtype=np.int64)
+_LOAN_RATES = np.array([loan.current_rate for loan in LOANS.values()], dtype=np.float64)
+_LOAN_CURRENCY_IDX = np.array([_LOAN_CURRENCIES.index(loan.currency) for loan in LOANS.values()], dtype=np.intp)
+_CURRENCY_FX = np.array([FX_RATES[currency] for currency in _LOAN_CURRENCIES], dtype=np.float64)
+
+# Loan ID -> display fields of LOANS used in prompts and messages, formatted once
+_LOAN_DISPLAY = {
+    loan_id: {
+        "covenants": ", ".join(loan.financial_covenants),
+        "upfront_fee": loan.fees.upfront_fee,
+    }
+    for loan_id, loan in LOANS.items()
+}
+
+# System prompt for debt issuance strategy
+DEBT_ISSUANCE_PROMPT = """
+You are a debt capital markets advisor. Provide a debt issuance strategy for a {currency} {amount:,} financing with these parameters:
+
+Term: {term}
+Purpose: {purpose}
+
+Current Market Conditions:
+- Risk-Free Rate ({mapped_term}): {risk_free_rate:.2f}%
+- Corporate {rating_band} Rate ({mapped_term}): {corporate_rate:.2f}%
+- Credit Spread: {spread:.2f}%
+- Estimated All-in Rate: {all_in_rate:.2f}%
+
+Company Credit Profile:
+- Credit Rating: {credit[rating]} ({credit[rating_outlook]})
+- Debt/EBITDA: {credit[debt_to_ebitda]}x
+- Interest Coverage: {credit[interest_coverage]}x
+- Existing Debt: {credit[existing_debt_currency]} {credit[existing_debt]:,}
+
+Provide a comprehensive debt issuance strategy including:
+1. Recommended debt structure (public bonds vs. private placement vs. bank loan)
+2. Pricing expectations and timing considerations
+3. Key terms to negotiate
+4. Risk factors to consider
+5. Process timeline and key milestones
+
+Be specific and actionable in your recommendations, considering the company's credit profile and current market conditions.
+"""
+
+# System prompt for comparing two loans, filled with _LOAN_PROMPT_SECTIONS
+LOAN_COMPARISON_PROMPT = """
+You are a debt financing analyst. Provide a comparison analysis between these two loans:
+
+Loan 1: {primary}
+
+Loan 2: {comparison}
+
+Provide a detailed comparison that includes:
+1. Key differences in pricing and terms
+2. Relative advantages and disadvantages of each loan
+3. Recommendations for potential refinancing or renegotiation
+4. Market context for the terms of each loan
+
+Focus on practical insights that could help optimize the debt structure.
+"""
+
+# Description of one refinancing opportunity; fields are a refinancing opportunity dict
+REFINANCING_OPPORTUNITY_SECTION = """{name} ({loan_id}):
+- Outstanding: {currency} {outstanding_amount:,}
+- Current Rate: {current_rate}%
+- Potential New Rate: {estimated_new_rate:.2f}%
+- Rate Reduction: {rate_reduction:.2f}%
+- Annual Savings: {currency} {annual_savings:,.2f}
+- Refinancing Cost: {currency} {refinancing_cost:,.2f}
+- Breakeven: {breakeven_years:.2f} years
+- Prepayment Penalty: {prepayment_penalty}"""
+
+# Per-opportunity prompt for batched portfolio refinancing advice
+REFINANCING_OPPORTUNITY_PROMPT = """
+You are a debt refinancing advisor. Assess this refinancing opportunity:
+
+""" + REFINANCING_OPPORTUNITY_SECTION + """
+
+Recommend whether to refinance now, later, or not at all, with the main reasons and risks.
+"""
+
+# Description of one loan in the comparison prompt
+LOAN_PROMPT_SECTION = """{loan.name} ({loan.loan_id})
+- Type: {loan.type}
+- Amount: {loan.currency} {loan.original_amount:,}
+- Term: {loan.term}
+- Rate: {loan.current_rate}% ({loan.benchmark} + {loan.spread} bps)
+- Amortization: {loan.principal_payment}
+- Prepayment: {loan.prepayment_penalty}
+- Security: {loan.security}
+- Covenants: {covenants}
+- Upfront Fee: {upfront_fee}%"""
+
+# Loan ID -> rendered LOAN_PROMPT_SECTION; the loan data is constant
+_LOAN_PROMPT_SECTIONS = {
+    loan_id: LOAN_PROMPT_SECTION.format(loan=loan, **_LOAN_DISPLAY[loan_id])
+    for loan_id, loan in LOANS.items()
+}
+
+
+@njit(cache=True)
+def _summarize_loans(
+    amounts: np.ndarray, rates: np.ndarray, fx: np.ndarray, currency_idx: np.ndarray
+) -> Tuple[float, float, np.ndarray]:
+    """Portfolio totals: (USD-weighted average rate, USD equivalent, outstanding per currency)."""
+    totals = np.zeros(fx.shape[0], dtype=np.int64)
+    total_usd = 0.0
+    weighted_sum = 0.0
+    for i in range(amounts.shape[0]):
+        usd_amount = amounts[i] * fx[currency_idx[i]]
+        totals[currency_idx[i]] += amounts[i]
+        total_usd += usd_amount
+        weighted_sum += rates[i] * usd_amount
+    return weighted_sum / total_usd, total_usd, totals
+
+
+# LOANS is immutable, so its summary and per-loan messages are formatted once
+@lru_cache(maxsize=1)
+def _loan_totals() -> Tuple[float, float, Tuple[Tuple[str, int], ...]]:
+    """LOANS totals: (USD-weighted average rate, USD equivalent, (currency, outstanding) pairs)."""
+    weighted_rate, total_usd, totals = _summarize_loans(
+        _LOAN_AMOUNTS, _LOAN_RATES, _CURRENCY_FX, _LOAN_CURRENCY_IDX
+    )
+    return float(weighted_rate), float(total_usd), tuple(zip(_LOAN_CURRENCIES, totals.tolist()))
+
+
+@lru_cache(maxsize=1)
+def _loan_summary_message() -> str:
+    """Message for the all-loans summary of handle_loan_terms."""
+    weighted_rate, total_usd_equivalent, total_debt = _loan_totals()
+    return (
+        f"Loan Summary:\n"
+        f"Total Loans: {len(LOANS)}\n"
+        f"Total Debt: " + ", ".join([f"{currency} {amount:,}" for currency, amount in total_debt]) + "\n"
+        f"USD Equivalent: ${total_usd_equivalent:,.2f}\n"
+        f"Weighted Average Rate: {weighted_rate:.2f}%\n\n"
+        "Loans:\n" +
+        "\n".join([
+            f"- {loan.name} ({loan_id}): {loan.currency} {loan.outstanding_amount:,}, "
+            f"{loan.current_rate}%, matures {loan.maturity_date}"
+            for loan_id, loan in LOANS.items()
+        ])
+    )
+
+
+@lru_cache(maxsize=256)
+def _format_loan_message(loan_id: str) -> str:
+    """Message for a single loan's terms in handle_loan_terms."""
+    loan = LOANS[loan_id]
+    return (
+        f"Loan Terms: {loan.name} ({loan_id})\n"
+        f"Type: {loan.type}\n"
+        f"Lender: {loan.lender} ({loan.bank_id})\n"
+        f"Amount: {loan.currency} {loan.original_amount:,} (Outstanding: {loan.currency} {loan.outstanding_amount:,})\n"
+        f"Term: {loan.term} ({loan.start_date} to {loan.maturity_date})\n"
+        f"Interest: {loan.current_rate}% ({loan.interest_rate_type}: {loan.benchmark} + {loan.spread} bps)\n"
+        f"Payment: {loan.payment_frequency} ({loan.principal_payment})\n"
+        f"Security: {loan.security}\n"
+        f"Covenants: {_LOAN_DISPLAY[loan_id]['covenants']}"
+    )
+
+
+def _group_loan_ids(key: Callable[[Loan], Hashable]) -> Dict[Hashable, List[str]]:
+    """Group the IDs of LOANS by key(loan), keeping their original order."""
+    groups: Dict[Hashable, List[str]] = {}
+    for loan_id, loan in LOANS.items():
+        groups.setdefault(key(loan), []).append(loan_id)
+    return groups
+
+
+# Loan IDs indexed by (type, currency), type and currency for picking comparison loans
+_LOANS_BY_TYPE_CURRENCY = _group_loan_ids(lambda loan: (loan.type, loan.currency))
+_LOANS_BY_TYPE = _group_loan_ids(lambda loan: loan.type)
+_LOANS_BY_CURRENCY = _group_loan_ids(lambda loan: loan.currency)
+
+
+def _find_comparison_loan(loan_id: str) -> Optional[str]:
     """
-    Analyze debt issuance options and provide recommendations.
+    Pick the loan to compare a loan against.
+
+    Prefers another loan of the same type and currency, then the same type,
+    then the same currency.
 
     Args:
-        entities: Dictionary of entities extracted from user intent
+        loan_id: ID of a loan in LOANS
 
     Returns:
-        Dictionary with debt issuance analysis
+        ID of the comparison loan, or None if no other loan is similar
     """
-    # Extract relevant entities
-    amount = entities.get("amount", 10000000)
-    currency = entities.get("currency", "USD")
-    term = entities.get("term", "5y")
-    purpose = entities.get("purpose", "general")
-
-    # Get RAG context for debt issuance
-    query = f"debt issuance {currency} {term} {purpose}"
-    context = await rag_module.generate_context(
-        query, filter_criteria={"category": "external_financing"}
+    loan = LOANS[loan_id]
+    # The fallback groups are only looked up if the closer match has no other loan
+    return next(
+        (
+            candidate_id
+            for index, key in (
+                (_LOANS_BY_TYPE_CURRENCY, (loan.type, loan.currency)),
+                (_LOANS_BY_TYPE, loan.type),
+                (_LOANS_BY_CURRENCY, loan.currency),
+            )
+            for candidate_id in index[key]
+            if candidate_id != loan_id
+        ),
+        None,
     )
 
-    # Sample market data (would come from financial data provider in real implementation)
-    market_rates = {
-        "USD": {
-            "risk_free": {
-                "1y": 3.85,
-                "2y": 4.10,
-                "3y": 4.20,
-                "5y": 4.25,
-                "7y": 4.30,
-                "10y": 4.35,
-                "30y": 4.45,
-            },
-            "corporate": {
-                "AA": {
-                    "1y": 4.10,
-                    "2y": 4.40,
-                    "3y": 4.55,
-                    "5y": 4.70,
-                    "7y": 4.80,
-                    "10y": 4.90,
-                    "30y": 5.10,
-                },
-                "A": {
-                    "1y": 4.35,
-                    "2y": 4.70,
-                    "3y": 4.90,
-                    "5y": 5.10,
-                    "7y": 5.25,
-                    "10y": 5.40,
-                    "30y": 5.65,
-                },
-                "BBB": {
-                    "1y": 4.85,
-                    "2y": 5.20,
-                    "3y": 5.40,
-                    "5y": 5.65,
-                    "7y": 5.85,
-                    "10y": 6.05,
-                    "30y": 6.45,
-                },
-            }
+@dataclass(slots=True, frozen=True)
+class RefinancingCosts:
+    """Estimated costs of refinancing a loan."""
+    prepayment_fee: float  # in the loan currency
+    upfront_fee_estimate: float  # percent
+    legal_fees_estimate: int  # in the loan currency
+
+
+# Estimated refinancing costs per LOANS entry (would come from debt management system in real implementation)
+REFINANCING_COSTS = MappingProxyType({
+    "L001": RefinancingCosts(
+        prepayment_fee=0,  # beyond penalty period
+        upfront_fee_estimate=0.75,  # percent
+        legal_fees_estimate=150000,  # USD
+    ),
+    "L002": RefinancingCosts(
+        prepayment_fee=0,  # no penalty
+        upfront_fee_estimate=0.5,  # percent
+        legal_fees_estimate=100000,  # USD
+    ),
+    "L003": RefinancingCosts(
+        prepayment_fee=0.01 * 48750000,  # 1% penalty still applies
+        upfront_fee_estimate=1.5,  # percent
+        legal_fees_estimate=250000,  # USD
+    ),
+    "L004": RefinancingCosts(
+        prepayment_fee=0.01 * 20000000,  # 1% penalty still applies
+        upfront_fee_estimate=0.75,  # percent
+        legal_fees_estimate=150000,  # EUR
+    ),
+})
+
+# Sample risk-free curves and new-loan spreads by rating band (would come from financial data provider in real implementation)
+REFINANCING_MARKET_RATES = MappingProxyType({
+    "USD": {
+        "risk_free": {
+            "1y": 3.85,
+            "2y": 4.10,
+            "3y": 4.20,
+            "5y": 4.25,
+            "7y": 4.30,
+            "10y": 4.35,
         },
-        "EUR": {
-            "risk_free": {
-                "1y": 2.95,
-                "2y": 3.05,
-                "3y": 3.10,
-                "5y": 3.15,
-                "7y": 3.20,
-                "10y": 3.30,
-                "30y": 3.45,
-            },
-            "corporate": {
-                "AA": {
-                    "1y": 3.25,
-                    "2y": 3.40,
-                    "3y": 3.50,
-                    "5y": 3.60,
-                    "7y": 3.70,
-                    "10y": 3.85,
-                    "30y": 4.10,
-                },
-                "A": {
-                    "1y": 3.50,
-                    "2y": 3.70,
-                    "3y": 3.85,
-                    "5y": 4.00,
-                    "7y": 4.15,
-                    "10y": 4.35,
-                    "30y": 4.70,
-                },
-                "BBB": {
-                    "1y": 4.00,
-                    "2y": 4.25,
-                    "3y": 4.45,
-                    "5y": 4.70,
-                    "7y": 4.90,
-                    "10y": 5.15,
-                    "30y": 5.60,
-                },
-            }
-        }
-    }
+        "term_loan": {
+            "AA": {"spread": 125},
+            "A": {"spread": 150},
+            "BBB": {"spread": 200},
+        },
+        "revolver": {
+            "AA": {"spread": 100},
+            "A": {"spread": 125},
+            "BBB": {"spread": 175},
+        },
+    },
+    "EUR": {
+        "risk_free": {
+            "1y": 2.95,
+            "2y": 3.05,
+            "3y": 3.10,
+            "5y": 3.15,
+            "7y": 3.20,
+            "10y": 3.30,
+        },
+        "term_loan": {
+            "AA": {"spread": 150},
+            "A": {"spread": 175},
+            "BBB": {"spread": 225},
+        },
+        "revolver": {
+            "AA": {"spread": 125},
+            "A": {"spread": 150},
+            "BBB": {"spread": 200},
+        },
+    },
+})
 
-    # Company credit profile (would come from financial system in real implementation)
-    company_credit = {
-        "rating": "BBB+",
-        "rating_outlook": "stable",
-        "debt_to_ebitda": 2.8,
-        "interest_coverage": 4.2,
-        "existing_debt": 85000000,
-        "existing_debt_currency": "USD",
-    }
 
-    # Map term to years for lookup
-    term_mapping = {
-        "1y": "1y", "2y": "2y", "3y": "3y", "5y": "5y",
-        "7y": "7y", "10y": "10y", "30y": "30y",
-        "short": "3y", "medium": "5y", "long": "10y"
+# Loan term such as "5 years" or "7-year" -> number of years
+_TERM_RE = re.compile(r"(\d+)\s*-?\s*year", re.I)
+
+# Tenors quoted in REFINANCING_MARKET_RATES
+_REFINANCING_TERMS = frozenset(REFINANCING_MARKET_RATES["USD"]["risk_free"])
+
+
+def _term_key(term: Optional[str], default: str = "5y") -> str:
+    """Map a loan term such as "5 years" to the tenor used for rate lookups."""
+    match = _TERM_RE.search(term or "")
+    if match is None:
+        return default
+    term_key = f"{int(match.group(1))}y"
+    return term_key if term_key in _REFINANCING_TERMS else default
+
+
+# Loan ID -> (market rate category, tenor) used to price refinancing
+_REFINANCING_RATE_KEYS = {
+    loan_id: (
+        "term_loan" if LOANS[loan_id].type in ["term_loan", "term"] else "revolver",
+        _term_key(LOANS[loan_id].term),
+    )
+    for loan_id in REFINANCING_COSTS
+}
+
+def _build_refinancing_quotes() -> Dict[Tuple[str, str], Tuple[float, int]]:
+    """(loan ID, rating band) -> (risk-free rate, new-loan spread in bps) for loans with market data."""
+    quotes = {}
+    for loan_id, (loan_type, term_key) in _REFINANCING_RATE_KEYS.items():
+        market = REFINANCING_MARKET_RATES.get(LOANS[loan_id].currency)
+        if market is None or term_key not in market["risk_free"]:
+            continue
+        for rating_band, quote in market[loan_type].items():
+            quotes[loan_id, rating_band] = (market["risk_free"][term_key], quote["spread"])
+    return quotes
+
+
+_REFINANCING_QUOTES = _build_refinancing_quotes()
+
+# Refinancing inputs as a structured array with one record per REFINANCING_COSTS entry
+_REFINANCING_IDS = list(REFINANCING_COSTS)
+_REFINANCING_TABLE = np.rec.fromrecords(
+    [
+        (
+            LOANS[loan_id].outstanding_amount,
+            LOANS[loan_id].current_rate,
+            costs.prepayment_fee,
+            costs.upfront_fee_estimate,
+            costs.legal_fees_estimate,
+        )
+        for loan_id, costs in REFINANCING_COSTS.items()
+    ],
+    names=["outstanding_amount", "current_rate", "prepayment_fee", "upfront_fee_estimate", "legal_fees_estimate"],
+)
+
+def _refinancing_new_rates(rating_band: str) -> np.ndarray:
+    """Estimated new rate per _REFINANCING_TABLE row; NaN where market data is not available."""
+    new_rates = np.full(len(_REFINANCING_IDS), np.nan)
+    for row, loan_id in enumerate(_REFINANCING_IDS):
+        quote = _REFINANCING_QUOTES.get((loan_id, rating_band))
+        if quote is not None:
+            risk_free_rate, spread = quote
+            new_rates[row] = risk_free_rate + (spread / 100)
+    return new_rates
+
+
+# Rating band -> market-implied new rates; every band RATING_BANDS can resolve to
+_REFINANCING_NEW_RATES = {
+    rating_band: _refinancing_new_rates(rating_band)
+    for rating_band in dict.fromkeys((*RATING_BANDS.values(), "BBB"))
+}
+
+
+def _refinancing_economics(loans, new_rate) -> Dict[str, np.ndarray]:
+    """
+    Compute refinancing savings, costs and breakeven, broadcasting over loans and rates.
+
+    Args:
+        loans: Record (or records) of _REFINANCING_TABLE
+        new_rate: Refinanced rate in percent, scalar or one per loan
+
+    Returns:
+        Metric name -> value(s); breakeven is infinite where nothing is saved
+    """
+    annual_interest_current = loans.outstanding_amount * (loans.current_rate / 100)
+    annual_interest_new = loans.outstanding_amount * (new_rate / 100)
+    annual_savings = annual_interest_current - annual_interest_new
+    upfront_fee = loans.outstanding_amount * (loans.upfront_fee_estimate / 100)
+    total_cost = loans.prepayment_fee + upfront_fee + loans.legal_fees_estimate
+    return {
+        "rate_reduction": loans.current_rate - new_rate,
+        "annual_interest_current": annual_interest_current,
+        "annual_interest_new": annual_interest_new,
+        "annual_savings": annual_savings,
+        "upfront_fee": upfront_fee,
+        "total_cost": total_cost,
+        "breakeven_years": np.divide(
+            total_cost, annual_savings,
+            out=np.full(np.shape(annual_savings), np.inf),
+            where=annual_savings > 0,
+        ),
     }
 
-    mapped_term = term_mapping.get(term, "5y")
+
+@dataclass(slots=True, frozen=True)
+class Debt:
+    """A debt instrument in the portfolio and its interest terms."""
+    name: str
+    type: str
+    outstanding_amount: int
+    currency: str
+    maturity_date: str
+    interest_rate_type: str
+    current_rate: float  # percent
+    payment_frequency: str
+    next_payment_date: str
+    annual_interest: int  # in the debt currency
+
+
+# Sample debt data (would come from debt management system in real implementation)
+DEBTS = MappingProxyType({
+    "L001": Debt(
+        name="Term Loan A",
+        type="term_loan",
+        outstanding_amount=20000000,
+        currency="USD",
+        maturity_date="2027-06-15",
+        interest_rate_type="floating",
+        current_rate=5.5,
+        payment_frequency="quarterly",
+        next_payment_date="2025-06-15",
+        annual_interest=1100000,  # 5.5% of 20M
+    ),
+    "L002": Debt(
+        name="Revolving Credit Facility",
+        type="revolver",
+        outstanding_amount=8000000,
+        currency="USD",
+        maturity_date="2027-06-15",
+        interest_rate_type="floating",
+        current_rate=5.25,
+        payment_frequency="quarterly",
+        next_payment_date="2025-06-15",
+        annual_interest=420000,  # 5.25% of 8M
+    ),
+    "L003": Debt(
+        name="Term Loan B",
+        type="term_loan",
+        outstanding_amount=48750000,
+        currency="USD",
+        maturity_date="2030-03-10",
+        interest_rate_type="floating",
+        current_rate=6.0,
+        payment_frequency="quarterly",
+        next_payment_date="2025-06-10",
+        annual_interest=2925000,  # 6.0% of 48.75M
+    ),
+    "L004": Debt(
+        name="Euro Term Loan",
+        type="term_loan",
+        outstanding_amount=20000000,
+        currency="EUR",
+        maturity_date="2028-09-15",
+        interest_rate_type="floating",
+        current_rate=4.5,
+        payment_frequency="quarterly",
+        next_payment_date="2025-06-15",
+        annual_interest=900000,  # 4.5% of 20M
+    ),
+    "B001": Debt(
+        name="Senior Notes Series A",
+        type="bond",
+        outstanding_amount=75000000,
+        currency="USD",
+        maturity_date="2029-12-15",
+        interest_rate_type="fixed",
+        current_rate=5.75,
+        payment_frequency="semi-annual",
+        next_payment_date="2025-06-15",
+        annual_interest=4312500,  # 5.75% of 75M
+    ),
+    "B002": Debt(
+        name="Senior Notes Series B",
+        type="bond",
+        outstanding_amount=50000000,
+        currency="USD",
+        maturity_date="2031-06-30",
+        interest_rate_type="fixed",
+        current_rate=6.25,
+        payment_frequency="semi-annual",
+        next_payment_date="2025-06-30",
+        annual_interest=3125000,  # 6.25% of 50M
+    ),
+    "CP001": Debt(
+        name="Commercial Paper Program",
+        type="commercial_paper",
+        outstanding_amount=25000000,
+        currency="USD",
+        maturity_date="2025-12-31",
+        interest_rate_type="fixed",
+        current_rate=4.25,
+        payment_frequency="at maturity",
+        next_payment_date="2025-12-31",
+        annual_interest=1062500,  # 4.25% of 25M
+    ),
+})
+
+
+# Interest payments per year by payment frequency; anything else pays quarterly
+_PAYMENTS_PER_YEAR = MappingProxyType({
+    "monthly": 12,
+    "quarterly": 4,
+    "semi-annual": 2,
+    "annual": 1,
+    "at maturity": 1,
+})
+
+# Months between interest payments; debts paying "at maturity" have a single payment
+_PAYMENT_INTERVAL_MONTHS = MappingProxyType({
+    "monthly": 1,
+    "quarterly": 3,
+    "semi-annual": 6,
+    "annual": 12,
+})
+
+
+def _add_months(date: datetime.datetime, months: int) -> datetime.datetime:
+    """Move a date by whole months, clamping the day to the end of a shorter month."""
+    total_months = date.year * 12 + (date.month - 1) + months
+    year, month = divmod(total_months, 12)
+    month += 1
+    return date.replace(year=year, month=month, day=min(date.day, calendar.monthrange(year, month)[1]))
+
+
+async def _with_financing_context(system_prompt: str, query: str, heading: str) -> str:
+    """Append the RAG context retrieved for query, if any, under heading."""
+    context = await cached_generate_context(query, filter_criteria=EXTERNAL_FINANCING_FILTER)
+    if context:
+        system_prompt += f"\n\n{heading}:\n{context}"
+    return system_prompt
+
+
+def _price_debt_issuance(entities: Dict) -> Tuple[Dict, Optional[Dict]]:
+    """
+    Price a debt issuance from current market rates and the company credit profile.
+
+    Args:
+        entities: Dictionary of entities extracted from user intent
+
+    Returns:
+        Tuple of (issuance analysis without the LLM strategy, DEBT_ISSUANCE_PROMPT
+        fields); the prompt fields are None when the request cannot be priced and
+        the analysis is an error dict
+    """
+    # Extract relevant entities
+    amount = entities.get("amount", 10000000)
+    currency = entities.get("currency", "USD")
+    term = entities.get("term", "5y")
+    purpose = entities.get("purpose", "general")
+
+    mapped_term = TERM_MAPPING.get(term, "5y")
 
     # Determine credit rating band (simplified)
-    if company_credit["rating"] in ["AAA", "AA+", "AA", "AA-"]:
-        rating_band = "AA"
-    elif company_credit["rating"] in ["A+", "A", "A-"]:
-        rating_band = "A"
-    else:
-        rating_band = "BBB"
+    rating_band = RATING_BANDS.get(COMPANY_CREDIT["rating"], "BBB")
 
     # Check if we have market data for the requested currency
-    if currency not in market_rates:
+    if currency not in _CCY_IDX:
         return {
             "error": f"Market data not available for {currency}",
-            "available_currencies": list(market_rates.keys())
-        }
+            "available_currencies": list(MARKET_RATES.keys())
+        }, None
 
     # Get applicable rates
     try:
-        risk_free_rate = market_rates[currency]["risk_free"][mapped_term]
-        corporate_rate = market_rates[currency]["corporate"][rating_band][mapped_term]
+        risk_free_rate, corporate_rate = _RATES_TENSOR[
+            _CCY_IDX[currency], [0, _RATING_IDX[rating_band]], _TERM_IDX[mapped_term]
+        ].tolist()
         spread = corporate_rate - risk_free_rate
     except KeyError:
         return {
             "error": f"Rate data not available for {term} term",
-            "available_terms": list(term_mapping.keys())
-        }
+            "available_terms": list(TERM_MAPPING.keys())
+        }, None
 
     # Calculate estimated all-in rate
     all_in_rate = corporate_rate + 0.25  # Adding 25bps for new issuance premium
@@ -190,46 +936,7 @@ async def handle_debt_issuance(entities: Dict) -> Dict:
     # Calculate annual interest expense
     annual_interest = amount * (all_in_rate / 100)
 
-    # Generate debt issuance strategy using LLM
-    system_prompt = f"""
-    You are a debt capital markets advisor. Provide a debt issuance strategy for a {currency} {amount:,} financing with these parameters:
-
-    Term: {term}
-    Purpose: {purpose}
-
-    Current Market Conditions:
-    - Risk-Free Rate ({mapped_term}): {risk_free_rate:.2f}%
-    - Corporate {rating_band} Rate ({mapped_term}): {corporate_rate:.2f}%
-    - Credit Spread: {spread:.2f}%
-    - Estimated All-in Rate: {all_in_rate:.2f}%
-
-    Company Credit Profile:
-    - Credit Rating: {company_credit['rating']} ({company_credit['rating_outlook']})
-    - Debt/EBITDA: {company_credit['debt_to_ebitda']}x
-    - Interest Coverage: {company_credit['interest_coverage']}x
-    - Existing Debt: {company_credit['existing_debt_currency']} {company_credit['existing_debt']:,}
-
-    Provide a comprehensive debt issuance strategy including:
-    1. Recommended debt structure (public bonds vs. private placement vs. bank loan)
-    2. Pricing expectations and timing considerations
-    3. Key terms to negotiate
-    4. Risk factors to consider
-    5. Process timeline and key milestones
-
-    Be specific and actionable in your recommendations, considering the company's credit profile and current market conditions.
-    """
-
-    if context:
-        system_prompt += f"\n\nAdditional context for your analysis:\n{context}"
-
-    issuance_strategy = await generate_text(
-        prompt=f"Develop debt issuance strategy for {currency} {amount:,} {term} {purpose}",
-        system_prompt=system_prompt,
-        max_new_tokens=1024,
-    )
-
-    # Return results
-    return {
+    analysis = {
         "amount": amount,
         "currency": currency,
         "term": term,
@@ -240,13 +947,79 @@ async def handle_debt_issuance(entities: Dict) -> Dict:
             "credit_spread": spread,
             "estimated_all_in_rate": all_in_rate,
         },
-        "company_credit": company_credit,
+        "company_credit": dict(COMPANY_CREDIT),
         "financing_impact": {
             "annual_interest": annual_interest,
-            "new_total_debt": company_credit["existing_debt"] + amount if company_credit["existing_debt_currency"] == currency else None,
+            "new_total_debt": COMPANY_CREDIT["existing_debt"] + amount if COMPANY_CREDIT["existing_debt_currency"] == currency else None,
         },
-        "formatted_response": issuance_strategy,
     }
+    prompt_fields = {
+        "currency": currency,
+        "amount": amount,
+        "term": term,
+        "purpose": purpose,
+        "mapped_term": mapped_term,
+        "risk_free_rate": risk_free_rate,
+        "rating_band": rating_band,
+        "corporate_rate": corporate_rate,
+        "spread": spread,
+        "all_in_rate": all_in_rate,
+        "credit": COMPANY_CREDIT,
+    }
+    return analysis, prompt_fields
+
+
+async def _debt_issuance_prompts(prompt_fields: Dict) -> Tuple[str, str]:
+    """
+    Build the prompts for the debt issuance strategy, adding any retrieved context.
+
+    Args:
+        prompt_fields: DEBT_ISSUANCE_PROMPT fields from _price_debt_issuance
+
+    Returns:
+        Tuple of (prompt, system prompt)
+    """
+    currency = prompt_fields["currency"]
+    amount = prompt_fields["amount"]
+    term = prompt_fields["term"]
+    purpose = prompt_fields["purpose"]
+
+    # Get RAG context for debt issuance (runs while the prompt is built)
+    query = f"debt issuance {currency} {term} {purpose}"
+    rag_task = asyncio.create_task(cached_generate_context(query, filter_criteria=EXTERNAL_FINANCING_FILTER))
+
+    system_prompt = DEBT_ISSUANCE_PROMPT.format_map(prompt_fields)
+
+    context = await rag_task
+    if context:
+        system_prompt += f"\n\nAdditional context for your analysis:\n{context}"
+
+    prompt = f"Develop debt issuance strategy for {currency} {amount:,} {term} {purpose}"
+    return prompt, system_prompt
+
+
+async def handle_debt_issuance(entities: Dict) -> Dict:
+    """
+    Analyze debt issuance options and provide recommendations.
+
+    Args:
+        entities: Dictionary of entities extracted from user intent
+
+    Returns:
+        Dictionary with debt issuance analysis
+    """
+    analysis, prompt_fields = _price_debt_issuance(entities)
+    if prompt_fields is None:
+        return analysis
+
+    # Generate debt issuance strategy using LLM
+    prompt, system_prompt = await _debt_issuance_prompts(prompt_fields)
+    analysis["formatted_response"] = await generate_text(
+        prompt=prompt,
+        system_prompt=system_prompt,
+        max_new_tokens=1024,
+    )
+    return analysis
 
 
 async def handle_loan_terms(entities: Dict) -> Dict:
@@ -263,264 +1036,81 @@ async def handle_loan_terms(entities: Dict) -> Dict:
     loan_id = entities.get("loan_id")
     compare = entities.get("compare", False)
 
-    # Sample loan data (would come from debt management system in real implementation)
-    loans = {
-        "L001": {
-            "name": "Term Loan A",
-            "type": "term_loan",
-            "lender": "Global Trust Bank",
-            "bank_id": "BNK001",
-            "original_amount": 25000000,
-            "outstanding_amount": 20000000,
-            "currency": "USD",
-            "start_date": "2022-06-15",
-            "maturity_date": "2027-06-15",
-            "term": "5 years",
-            "interest_rate_type": "floating",
-            "benchmark": "SOFR",
-            "spread": 175,  # basis points
-            "current_rate": 5.5,  # percent
-            "payment_frequency": "quarterly",
-            "principal_payment": "amortizing",
-            "amortization_schedule": "5 years",
-            "prepayment_penalty": "1% in year 1, 0.5% in year 2, none thereafter",
-            "financial_covenants": ["Debt/EBITDA <= 3.5x", "Interest Coverage >= 3.0x"],
-            "security": "unsecured",
-            "key_terms": [
-                "Change of control provision",
-                "Material adverse change clause",
-                "Cross-default provision",
-                "Restriction on additional debt"
-            ],
-            "fees": {
-                "upfront_fee": 0.75,  # percent
-                "commitment_fee": 0.375,  # percent
-                "agency_fee": 25000,  # USD per year
-            },
-        },
-        "L002": {
-            "name": "Revolving Credit Facility",
-            "type": "revolver",
-            "lender": "Global Trust Bank",
-            "bank_id": "BNK001",
-            "original_amount": 15000000,
-            "outstanding_amount": 8000000,
-            "currency": "USD",
-            "start_date": "2022-06-15",
-            "maturity_date": "2027-06-15",
-            "term": "5 years",
-            "interest_rate_type": "floating",
-            "benchmark": "SOFR",
-            "spread": 150,  # basis points
-            "current_rate": 5.25,  # percent
-            "payment_frequency": "quarterly",
-            "principal_payment": "bullet",
-            "prepayment_penalty": "none",
-            "financial_covenants": ["Debt/EBITDA <= 3.5x", "Interest Coverage >= 3.0x"],
-            "security": "unsecured",
-            "key_terms": [
-                "Change of control provision",
-                "Material adverse change clause",
-                "Cross-default provision",
-                "Restriction on additional debt"
-            ],
-            "fees": {
-                "upfront_fee": 0.5,  # percent
-                "commitment_fee": 0.375,  # percent
-                "agency_fee": 25000,  # USD per year
-            },
-        },
-        "L003": {
-            "name": "Term Loan B",
-            "type": "term_loan",
-            "lender": "Continental Financial",
-            "bank_id": "BNK002",
-            "original_amount": 50000000,
-            "outstanding_amount": 48750000,
-            "currency": "USD",
-            "start_date": "2023-03-10",
-            "maturity_date": "2030-03-10",
-            "term": "7 years",
-            "interest_rate_type": "floating",
-            "benchmark": "SOFR",
-            "spread": 225,  # basis points
-            "current_rate": 6.0,  # percent
-            "payment_frequency": "quarterly",
-            "principal_payment": "1% annual amortization, remainder bullet",
-            "amortization_schedule": "1% per year, 94% bullet",
-            "prepayment_penalty": "2% in year 1, 1% in year 2, none thereafter",
-            "financial_covenants": ["Debt/EBITDA <= 4.0x"],
-            "security": "secured",
-            "collateral": "All assets",
-            "key_terms": [
-                "Change of control provision",
-                "Material adverse change clause",
-                "Cross-default provision",
-                "Restriction on additional debt",
-                "Excess cash flow sweep"
-            ],
-            "fees": {
-                "upfront_fee": 1.5,  # percent
-                "agency_fee": 35000,  # USD per year
-            },
-        },
-        "L004": {
-            "name": "Euro Term Loan",
-            "type": "term_loan",
-            "lender": "European Credit Bank",
-            "bank_id": "BNK003",
-            "original_amount": 20000000,
-            "outstanding_amount": 20000000,
-            "currency": "EUR",
-            "start_date": "2023-09-15",
-            "maturity_date": "2028-09-15",
-            "term": "5 years",
-            "interest_rate_type": "floating",
-            "benchmark": "EURIBOR",
-            "spread": 200,  # basis points
-            "current_rate": 4.5,  # percent
-            "payment_frequency": "quarterly",
-            "principal_payment": "bullet",
-            "prepayment_penalty": "1% in year 1, none thereafter",
-            "financial_covenants": ["Debt/EBITDA <= 3.75x", "Interest Coverage >= 3.0x"],
-            "security": "unsecured",
-            "key_terms": [
-                "Change of control provision",
-                "Material adverse change clause",
-                "Cross-default provision"
-            ],
-            "fees": {
-                "upfront_fee": 0.75,  # percent
-                "commitment_fee": 0.35,  # percent
-                "agency_fee": 25000,  # EUR per year
-            },
-        },
-    }
-
     # If specific loan requested
     if loan_id:
-        if loan_id not in loans:
+        if loan_id not in LOANS:
             return {
                 "error": f"Loan {loan_id} not found",
-                "available_loans": list(loans.keys())
+                "available_loans": list(LOANS.keys())
             }
 
-        loan = loans[loan_id]
+        loan = LOANS[loan_id]
 
         # Compare with other loans if requested
         if compare:
-            # Find similar loans for comparison
-            same_type_loans = [l for l_id, l in loans.items() if l["type"] == loan["type"] and l_id != loan_id]
-            same_currency_loans = [l for l_id, l in loans.items() if l["currency"] == loan["currency"] and l_id != loan_id]
-
             # Pick the most relevant loan for comparison
-            comparison_loan = None
-            comparison_loan_id = None
-
-            # Prefer same type and currency
-            for l_id, l in loans.items():
-                if l_id != loan_id and l["type"] == loan["type"] and l["currency"] == loan["currency"]:
-                    comparison_loan = l
-                    comparison_loan_id = l_id
-                    break
-
-            # If no exact match, prefer same type
-            if comparison_loan is None and same_type_loans:
-                comparison_loan = same_type_loans[0]
-                comparison_loan_id = next(l_id for l_id, l in loans.items() if l is comparison_loan)
-
-            # If still no match, prefer same currency
-            if comparison_loan is None and same_currency_loans:
-                comparison_loan = same_currency_loans[0]
-                comparison_loan_id = next(l_id for l_id, l in loans.items() if l is comparison_loan)
+            comparison_loan_id = _find_comparison_loan(loan_id)
+            comparison_loan = LOANS[comparison_loan_id] if comparison_loan_id else None
 
             if comparison_loan:
+                # Get RAG context for loan terms benchmarking (runs while the prompt is built)
+                query = f"loan terms benchmark {loan.type} {loan.currency}"
+                rag_task = asyncio.create_task(
+                    cached_generate_context(query, filter_criteria=EXTERNAL_FINANCING_FILTER)
+                )
+
                 # Prepare comparison analysis
                 comparison = {
                     "loan_id": loan_id,
                     "comparison_loan_id": comparison_loan_id,
                     "interest_rate": {
-                        "primary": loan["current_rate"],
-                        "comparison": comparison_loan["current_rate"],
-                        "difference": loan["current_rate"] - comparison_loan["current_rate"],
+                        "primary": loan.current_rate,
+                        "comparison": comparison_loan.current_rate,
+                        "difference": loan.current_rate - comparison_loan.current_rate,
                     },
                     "spread": {
-                        "primary": loan["spread"],
-                        "comparison": comparison_loan["spread"],
-                        "difference": loan["spread"] - comparison_loan["spread"],
+                        "primary": loan.spread,
+                        "comparison": comparison_loan.spread,
+                        "difference": loan.spread - comparison_loan.spread,
                     },
                     "term": {
-                        "primary": loan["term"],
-                        "comparison": comparison_loan["term"],
+                        "primary": loan.term,
+                        "comparison": comparison_loan.term,
                     },
                     "amortization": {
-                        "primary": loan.get("principal_payment", "N/A"),
-                        "comparison": comparison_loan.get("principal_payment", "N/A"),
+                        "primary": loan.principal_payment,
+                        "comparison": comparison_loan.principal_payment,
                     },
                     "prepayment_penalty": {
-                        "primary": loan.get("prepayment_penalty", "None"),
-                        "comparison": comparison_loan.get("prepayment_penalty", "None"),
+                        "primary": loan.prepayment_penalty,
+                        "comparison": comparison_loan.prepayment_penalty,
                     },
                     "covenants": {
-                        "primary": loan.get("financial_covenants", []),
-                        "comparison": comparison_loan.get("financial_covenants", []),
+                        "primary": list(loan.financial_covenants),
+                        "comparison": list(comparison_loan.financial_covenants),
                     },
                 }
 
-                # Get RAG context for loan terms benchmarking
-                query = f"loan terms benchmark {loan['type']} {loan['currency']}"
-                context = await rag_module.generate_context(
-                    query, filter_criteria={"category": "external_financing"}
-                )
-
                 # Generate loan terms comparison analysis using LLM
-                system_prompt = f"""
-                You are a debt financing analyst. Provide a comparison analysis between these two loans:
-
-                Loan 1: {loan['name']} ({loan_id})
-                - Type: {loan['type']}
-                - Amount: {loan['currency']} {loan['original_amount']:,}
-                - Term: {loan['term']}
-                - Rate: {loan['current_rate']}% ({loan['benchmark']} + {loan['spread']} bps)
-                - Amortization: {loan.get('principal_payment', 'N/A')}
-                - Prepayment: {loan.get('prepayment_penalty', 'None')}
-                - Security: {loan['security']}
-                - Covenants: {', '.join(loan.get('financial_covenants', ['None']))}
-                - Upfront Fee: {loan['fees'].get('upfront_fee', 0)}%
-
-                Loan 2: {comparison_loan['name']} ({comparison_loan_id})
-                - Type: {comparison_loan['type']}
-                - Amount: {comparison_loan['currency']} {comparison_loan['original_amount']:,}
-                - Term: {comparison_loan['term']}
-                - Rate: {comparison_loan['current_rate']}% ({comparison_loan['benchmark']} + {comparison_loan['spread']} bps)
-                - Amortization: {comparison_loan.get('principal_payment', 'N/A')}
-                - Prepayment: {comparison_loan.get('prepayment_penalty', 'None')}
-                - Security: {comparison_loan['security']}
-                - Covenants: {', '.join(comparison_loan.get('financial_covenants', ['None']))}
-                - Upfront Fee: {comparison_loan['fees'].get('upfront_fee', 0)}%
-
-                Provide a detailed comparison that includes:
-                1. Key differences in pricing and terms
-                2. Relative advantages and disadvantages of each loan
-                3. Recommendations for potential refinancing or renegotiation
-                4. Market context for the terms of each loan
-
-                Focus on practical insights that could help optimize the debt structure.
-                """
+                system_prompt = LOAN_COMPARISON_PROMPT.format(
+                    primary=_LOAN_PROMPT_SECTIONS[loan_id],
+                    comparison=_LOAN_PROMPT_SECTIONS[comparison_loan_id],
+                )
 
+                context = await rag_task
                 if context:
                     system_prompt += f"\n\nAdditional market context for your analysis:\n{context}"
 
                 comparison_analysis = await generate_text(
-                    prompt=f"Compare loan terms between {loan['name']} and {comparison_loan['name']}",
+                    prompt=f"Compare loan terms between {loan.name} and {comparison_loan.name}",
                     system_prompt=system_prompt,
                 )
 
                 return {
                     "loan_id": loan_id,
-                    "loan_details": loan,
+                    "loan_details": _loan_details(loan),
                     "comparison_loan_id": comparison_loan_id,
-                    "comparison_loan_details": comparison_loan,
+                    "comparison_loan_details": _loan_details(comparison_loan),
                     "comparison": comparison,
                     "formatted_response": comparison_analysis,
                 }
@@ -528,101 +1118,147 @@ async def handle_loan_terms(entities: Dict) -> Dict:
         # Return single loan details
         return {
             "loan_id": loan_id,
-            "name": loan["name"],
-            "type": loan["type"],
-            "lender": loan["lender"],
-            "bank_id": loan["bank_id"],
-            "original_amount": loan["original_amount"],
-            "outstanding_amount": loan["outstanding_amount"],
-            "currency": loan["currency"],
-            "start_date": loan["start_date"],
-            "maturity_date": loan["maturity_date"],
-            "term": loan["term"],
+            "name": loan.name,
+            "type": loan.type,
+            "lender": loan.lender,
+            "bank_id": loan.bank_id,
+            "original_amount": loan.original_amount,
+            "outstanding_amount": loan.outstanding_amount,
+            "currency": loan.currency,
+            "start_date": loan.start_date,
+            "maturity_date": loan.maturity_date,
+            "term": loan.term,
             "interest_rate": {
-                "type": loan["interest_rate_type"],
-                "benchmark": loan["benchmark"],
-                "spread": loan["spread"],
-                "current_rate": loan["current_rate"],
+                "type": loan.interest_rate_type,
+                "benchmark": loan.benchmark,
+                "spread": loan.spread,
+                "current_rate": loan.current_rate,
             },
             "payment_terms": {
-                "frequency": loan["payment_frequency"],
-                "principal_payment": loan["principal_payment"],
-                "amortization_schedule": loan.get("amortization_schedule"),
-                "prepayment_penalty": loan.get("prepayment_penalty"),
+                "frequency": loan.payment_frequency,
+                "principal_payment": loan.principal_payment,
+                "amortization_schedule": loan.amortization_schedule,
+                "prepayment_penalty": loan.prepayment_penalty,
             },
-            "covenants": loan.get("financial_covenants", []),
-            "security": loan["security"],
-            "collateral": loan.get("collateral"),
-            "key_terms": loan.get("key_terms", []),
-            "fees": loan["fees"],
-            "message": (
-                f"Loan Terms: {loan['name']} ({loan_id})\n"
-                f"Type: {loan['type']}\n"
-                f"Lender: {loan['lender']} ({loan['bank_id']})\n"
-                f"Amount: {loan['currency']} {loan['original_amount']:,} (Outstanding: {loan['currency']} {loan['outstanding_amount']:,})\n"
-                f"Term: {loan['term']} ({loan['start_date']} to {loan['maturity_date']})\n"
-                f"Interest: {loan['current_rate']}% ({loan['interest_rate_type']}: {loan['benchmark']} + {loan['spread']} bps)\n"
-                f"Payment: {loan['payment_frequency']} ({loan['principal_payment']})\n"
-                f"Security: {loan['security']}\n"
-                f"Covenants: {', '.join(loan.get('financial_covenants', ['None']))}"
-            ),
+            "covenants": list(loan.financial_covenants),
+            "security": loan.security,
+            "collateral": loan.collateral,
+            "key_terms": list(loan.key_terms),
+            "fees": _loan_details(loan.fees),
+            "message": _format_loan_message(loan_id),
         }
 
     # Return summary of all loans
     else:
-        total_debt = {}
-
-        for loan in loans.values():
-            currency = loan["currency"]
-            if currency not in total_debt:
-                total_debt[currency] = 0
-            total_debt[currency] += loan["outstanding_amount"]
-
-        weighted_rate = 0
-        total_usd_equivalent = 0
-
-        # Sample exchange rates (would come from banking API in real implementation)
-        fx_rates = {"USD": 1.0, "EUR": 1.09}  # USD per unit of currency
-
-        for loan in loans.values():
-            currency = loan["currency"]
-            usd_amount = loan["outstanding_amount"] * fx_rates[currency]
-            weighted_rate += loan["current_rate"] * (usd_amount / (total_debt["USD"] + total_debt.get("EUR", 0) * fx_rates["EUR"]))
-            total_usd_equivalent += usd_amount
+        weighted_rate, total_usd_equivalent, total_debt = _loan_totals()
 
         return {
-            "total_loans": len(loans),
-            "total_debt": total_debt,
+            "total_loans": len(LOANS),
+            "total_debt": dict(total_debt),
             "total_usd_equivalent": total_usd_equivalent,
             "weighted_average_rate": weighted_rate,
             "loans_summary": [
                 {
                     "loan_id": loan_id,
-                    "name": loan["name"],
-                    "type": loan["type"],
-                    "lender": loan["lender"],
-                    "currency": loan["currency"],
-                    "outstanding_amount": loan["outstanding_amount"],
-                    "maturity_date": loan["maturity_date"],
-                    "current_rate": loan["current_rate"],
-                } for loan_id, loan in loans.items()
+                    "name": loan.name,
+                    "type": loan.type,
+                    "lender": loan.lender,
+                    "currency": loan.currency,
+                    "outstanding_amount": loan.outstanding_amount,
+                    "maturity_date": loan.maturity_date,
+                    "current_rate": loan.current_rate,
+                } for loan_id, loan in LOANS.items()
             ],
-            "message": (
-                f"Loan Summary:\n"
-                f"Total Loans: {len(loans)}\n"
-                f"Total Debt: " + ", ".join([f"{currency} {amount:,}" for currency, amount in total_debt.items()]) + "\n"
-                f"USD Equivalent: ${total_usd_equivalent:,.2f}\n"
-                f"Weighted Average Rate: {weighted_rate:.2f}%\n\n"
-                "Loans:\n" +
-                "\n".join([
-                    f"- {loan['name']} ({loan_id}): {loan['currency']} {loan['outstanding_amount']:,}, "
-                    f"{loan['current_rate']}%, matures {loan['maturity_date']}"
-                    for loan_id, loan in loans.items()
-                ])
-            ),
+            "message": _loan_summary_message(),
         }
 
 
+def _price_refinancing_portfolio(rating_band: str) -> Tuple[Dict, str]:
+    """
+    Find and price the refinancing opportunities across the loan portfolio.
+
+    Args:
+        rating_band: Rating band used to price the new loans
+
+    Returns:
+        Tuple of (portfolio analysis without the LLM strategy, system prompt
+        without retrieved context)
+    """
+    # Estimated new rate per loan; NaN where market data is not available
+    new_rates = _REFINANCING_NEW_RATES[rating_band]
+
+    # Savings, costs and breakeven for every loan at once
+    economics = _refinancing_economics(_REFINANCING_TABLE, new_rates)
+
+    # Loans with market data that would get a lower rate, by breakeven period
+    eligible_rows = np.flatnonzero(economics["rate_reduction"] > 0)
+    eligible_rows = eligible_rows[
+        np.argsort(economics["breakeven_years"][eligible_rows], kind="stable")
+    ]
+
+    # Calculate total potential savings over the opportunities
+    total_annual_savings = economics["annual_savings"][eligible_rows].sum().item()
+    total_refinancing_cost = economics["total_cost"][eligible_rows].sum().item()
+    average_breakeven = economics["breakeven_years"][eligible_rows].mean().item() if eligible_rows.size else 0
+    eligible_rows = eligible_rows.tolist()
+
+    # Results are converted to Python floats column by column, so the
+    # response holds no NumPy scalars
+    new_rates = new_rates.tolist()
+    economics = {name: values.tolist() for name, values in economics.items()}
+
+    refinancing_opportunities = []
+    for row in eligible_rows:
+        loan_id = _REFINANCING_IDS[row]
+        loan = LOANS[loan_id]
+        refinancing_opportunities.append({
+            "loan_id": loan_id,
+            "name": loan.name,
+            "currency": loan.currency,
+            "outstanding_amount": loan.outstanding_amount,
+            "current_rate": loan.current_rate,
+            "estimated_new_rate": new_rates[row],
+            "rate_reduction": economics["rate_reduction"][row],
+            "annual_savings": economics["annual_savings"][row],
+            "refinancing_cost": economics["total_cost"][row],
+            "breakeven_years": economics["breakeven_years"][row],
+            "prepayment_penalty": loan.prepayment_penalty,
+        })
+
+    # Portfolio refinancing strategy prompt
+    prompt_parts = ["""
+        You are a debt portfolio manager. Develop a comprehensive refinancing strategy for this loan portfolio:
+
+        Refinancing Opportunities:
+        """]
+
+    for opp in refinancing_opportunities:
+        prompt_parts.append("\n\n" + REFINANCING_OPPORTUNITY_SECTION.format_map(opp) + "\n")
+
+    prompt_parts.append("""
+
+        Provide a strategic refinancing approach for the overall debt portfolio, including:
+        1. Prioritization of which loans to refinance first
+        2. Potential for combining multiple refinancings
+        3. Optimal timing considerations
+        4. Impact on overall debt portfolio structure
+        5. Market and execution risks to consider
+
+        Be specific and actionable in your recommendations, focusing on maximizing financial benefits while managing execution risks.
+        """)
+
+    analysis = {
+        "refinancing_opportunities": refinancing_opportunities,
+        "opportunity_count": len(refinancing_opportunities),
+        "total_potential_savings": {
+            "annual": total_annual_savings,
+            "costs": total_refinancing_cost,
+            "average_breakeven": average_breakeven,
+        },
+    }
+    return analysis, "".join(prompt_parts)
+
+
 async def handle_refinancing(entities: Dict) -> Dict:
     """
     Analyze refinancing opportunities and provide recommendations.
@@ -637,254 +1273,66 @@ async def handle_refinancing(entities: Dict) -> Dict:
     loan_id = entities.get("loan_id")
     target_rate = entities.get("target_rate")
 
-    # Sample loan data (would come from debt management system in real implementation)
-    loans = {
-        "L001": {
-            "name": "Term Loan A",
-            "type": "term_loan",
-            "lender": "Global Trust Bank",
-            "bank_id": "BNK001",
-            "original_amount": 25000000,
-            "outstanding_amount": 20000000,
-            "currency": "USD",
-            "start_date": "2022-06-15",
-            "maturity_date": "2027-06-15",
-            "term": "5 years",
-            "interest_rate_type": "floating",
-            "benchmark": "SOFR",
-            "spread": 175,  # basis points
-            "current_rate": 5.5,  # percent
-            "payment_frequency": "quarterly",
-            "principal_payment": "amortizing",
-            "amortization_schedule": "5 years",
-            "prepayment_penalty": "1% in year 1, 0.5% in year 2, none thereafter",
-            "financial_covenants": ["Debt/EBITDA <= 3.5x", "Interest Coverage >= 3.0x"],
-            "security": "unsecured",
-            "refinancing_costs": {
-                "prepayment_fee": 0,  # beyond penalty period
-                "upfront_fee_estimate": 0.75,  # percent
-                "legal_fees_estimate": 150000,  # USD
-            },
-        },
-        "L002": {
-            "name": "Revolving Credit Facility",
-            "type": "revolver",
-            "lender": "Global Trust Bank",
-            "bank_id": "BNK001",
-            "original_amount": 15000000,
-            "outstanding_amount": 8000000,
-            "currency": "USD",
-            "start_date": "2022-06-15",
-            "maturity_date": "2027-06-15",
-            "term": "5 years",
-            "interest_rate_type": "floating",
-            "benchmark": "SOFR",
-            "spread": 150,  # basis points
-            "current_rate": 5.25,  # percent
-            "payment_frequency": "quarterly",
-            "principal_payment": "bullet",
-            "prepayment_penalty": "none",
-            "financial_covenants": ["Debt/EBITDA <= 3.5x", "Interest Coverage >= 3.0x"],
-            "security": "unsecured",
-            "refinancing_costs": {
-                "prepayment_fee": 0,  # no penalty
-                "upfront_fee_estimate": 0.5,  # percent
-                "legal_fees_estimate": 100000,  # USD
-            },
-        },
-        "L003": {
-            "name": "Term Loan B",
-            "type": "term_loan",
-            "lender": "Continental Financial",
-            "bank_id": "BNK002",
-            "original_amount": 50000000,
-            "outstanding_amount": 48750000,
-            "currency": "USD",
-            "start_date": "2023-03-10",
-            "maturity_date": "2030-03-10",
-            "term": "7 years",
-            "interest_rate_type": "floating",
-            "benchmark": "SOFR",
-            "spread": 225,  # basis points
-            "current_rate": 6.0,  # percent
-            "payment_frequency": "quarterly",
-            "principal_payment": "1% annual amortization, remainder bullet",
-            "amortization_schedule": "1% per year, 94% bullet",
-            "prepayment_penalty": "2% in year 1, 1% in year 2, none thereafter",
-            "financial_covenants": ["Debt/EBITDA <= 4.0x"],
-            "security": "secured",
-            "collateral": "All assets",
-            "refinancing_costs": {
-                "prepayment_fee": 0.01 * 48750000,  # 1% penalty still applies
-                "upfront_fee_estimate": 1.5,  # percent
-                "legal_fees_estimate": 250000,  # USD
-            },
-        },
-        "L004": {
-            "name": "Euro Term Loan",
-            "type": "term_loan",
-            "lender": "European Credit Bank",
-            "bank_id": "BNK003",
-            "original_amount": 20000000,
-            "outstanding_amount": 20000000,
-            "currency": "EUR",
-            "start_date": "2023-09-15",
-            "maturity_date": "2028-09-15",
-            "term": "5 years",
-            "interest_rate_type": "floating",
-            "benchmark": "EURIBOR",
-            "spread": 200,  # basis points
-            "current_rate": 4.5,  # percent
-            "payment_frequency": "quarterly",
-            "principal_payment": "bullet",
-            "prepayment_penalty": "1% in year 1, none thereafter",
-            "financial_covenants": ["Debt/EBITDA <= 3.75x", "Interest Coverage >= 3.0x"],
-            "security": "unsecured",
-            "refinancing_costs": {
-                "prepayment_fee": 0.01 * 20000000,  # 1% penalty still applies
-                "upfront_fee_estimate": 0.75,  # percent
-                "legal_fees_estimate": 150000,  # EUR
-            },
-        },
-    }
-
-    # Sample market data (would come from financial data provider in real implementation)
-    market_rates = {
-        "USD": {
-            "risk_free": {
-                "1y": 3.85,
-                "2y": 4.10,
-                "3y": 4.20,
-                "5y": 4.25,
-                "7y": 4.30,
-                "10y": 4.35,
-            },
-            "term_loan": {
-                "AA": {"spread": 125},
-                "A": {"spread": 150},
-                "BBB": {"spread": 200},
-            },
-            "revolver": {
-                "AA": {"spread": 100},
-                "A": {"spread": 125},
-                "BBB": {"spread": 175},
-            },
-        },
-        "EUR": {
-            "risk_free": {
-                "1y": 2.95,
-                "2y": 3.05,
-                "3y": 3.10,
-                "5y": 3.15,
-                "7y": 3.20,
-                "10y": 3.30,
-            },
-            "term_loan": {
-                "AA": {"spread": 150},
-                "A": {"spread": 175},
-                "BBB": {"spread": 225},
-            },
-            "revolver": {
-                "AA": {"spread": 125},
-                "A": {"spread": 150},
-                "BBB": {"spread": 200},
-            },
-        },
-    }
-
-    # Company credit profile
-    company_credit = {
-        "rating": "BBB+",
-        "rating_outlook": "stable",
-    }
-
     # Determine credit rating band (simplified)
-    if company_credit["rating"] in ["AAA", "AA+", "AA", "AA-"]:
-        rating_band = "AA"
-    elif company_credit["rating"] in ["A+", "A", "A-"]:
-        rating_band = "A"
-    else:
-        rating_band = "BBB"
+    rating_band = RATING_BANDS.get(COMPANY_CREDIT["rating"], "BBB")
 
     # If specific loan requested
     if loan_id:
-        if loan_id not in loans:
+        if loan_id not in REFINANCING_COSTS:
             return {
                 "error": f"Loan {loan_id} not found",
-                "available_loans": list(loans.keys())
+                "available_loans": list(REFINANCING_COSTS.keys())
             }
 
-        loan = loans[loan_id]
-        currency = loan["currency"]
-        loan_type = "term_loan" if loan["type"] in ["term_loan", "term"] else "revolver"
+        loan = LOANS[loan_id]
+        costs = REFINANCING_COSTS[loan_id]
+        currency = loan.currency
+        loan_type, term_key = _REFINANCING_RATE_KEYS[loan_id]
 
         # Check if market data is available
-        if currency not in market_rates:
+        if currency not in REFINANCING_MARKET_RATES:
             return {
                 "error": f"Market data not available for {currency}",
-                "available_currencies": list(market_rates.keys())
+                "available_currencies": list(REFINANCING_MARKET_RATES.keys())
             }
 
-        # Determine loan term for rate lookup
-        if "term" in loan:
-            if "7 year" in loan["term"] or "7-year" in loan["term"]:
-                term_key = "7y"
-            elif "10 year" in loan["term"] or "10-year" in loan["term"]:
-                term_key = "10y"
-            elif "5 year" in loan["term"] or "5-year" in loan["term"]:
-                term_key = "5y"
-            elif "3 year" in loan["term"] or "3-year" in loan["term"]:
-                term_key = "3y"
-            elif "2 year" in loan["term"] or "2-year" in loan["term"]:
-                term_key = "2y"
-            elif "1 year" in loan["term"] or "1-year" in loan["term"]:
-                term_key = "1y"
-            else:
-                term_key = "5y"  # Default to 5 years
-        else:
-            term_key = "5y"  # Default to 5 years
+        # Get RAG context for refinancing (runs while the economics and prompt are built)
+        query = f"refinancing {loan.type} {currency} {COMPANY_CREDIT['rating']}"
+        rag_task = asyncio.create_task(
+            cached_generate_context(query, filter_criteria=EXTERNAL_FINANCING_FILTER)
+        )
 
         # Calculate estimated new rate
-        risk_free_rate = market_rates[currency]["risk_free"][term_key]
-        spread = market_rates[currency][loan_type][rating_band]["spread"]
+        risk_free_rate, spread = _REFINANCING_QUOTES[loan_id, rating_band]
         estimated_new_rate = risk_free_rate + (spread / 100)
 
         # If target rate is provided, use that instead
         if target_rate is not None:
             estimated_new_rate = float(target_rate)
 
-        # Calculate potential savings
-        rate_reduction = loan["current_rate"] - estimated_new_rate
-        annual_interest_current = loan["outstanding_amount"] * (loan["current_rate"] / 100)
-        annual_interest_new = loan["outstanding_amount"] * (estimated_new_rate / 100)
-        annual_savings = annual_interest_current - annual_interest_new
-
-        # Calculate refinancing costs
-        upfront_fee = loan["outstanding_amount"] * (loan["refinancing_costs"]["upfront_fee_estimate"] / 100)
-        total_refinancing_cost = loan["refinancing_costs"]["prepayment_fee"] + upfront_fee + loan["refinancing_costs"]["legal_fees_estimate"]
-
-        # Calculate breakeven
-        if annual_savings > 0:
-            breakeven_years = total_refinancing_cost / annual_savings
-        else:
-            breakeven_years = float('inf')
-
-        # Get RAG context for refinancing
-        query = f"refinancing {loan['type']} {currency} {company_credit['rating']}"
-        context = await rag_module.generate_context(
-            query, filter_criteria={"category": "external_financing"}
-        )
+        # Calculate potential savings, refinancing costs and breakeven
+        record = _REFINANCING_TABLE[_REFINANCING_IDS.index(loan_id)]
+        economics = {
+            name: float(value) for name, value in _refinancing_economics(record, estimated_new_rate).items()
+        }
+        rate_reduction = economics["rate_reduction"]
+        annual_interest_current = economics["annual_interest_current"]
+        annual_interest_new = economics["annual_interest_new"]
+        annual_savings = economics["annual_savings"]
+        upfront_fee = economics["upfront_fee"]
+        total_refinancing_cost = economics["total_cost"]
+        breakeven_years = economics["breakeven_years"]
 
         # Generate refinancing analysis using LLM
         system_prompt = f"""
         You are a debt refinancing advisor. Analyze the refinancing opportunity for this debt:
 
-        Loan: {loan['name']} ({loan_id})
-        Type: {loan['type']}
-        Outstanding Amount: {currency} {loan['outstanding_amount']:,}
-        Current Rate: {loan['current_rate']}% ({loan['benchmark']} + {loan['spread']} bps)
-        Maturity: {loan['maturity_date']}
-        Prepayment Penalty: {loan.get('prepayment_penalty', 'None')}
+        Loan: {loan.name} ({loan_id})
+        Type: {loan.type}
+        Outstanding Amount: {currency} {loan.outstanding_amount:,}
+        Current Rate: {loan.current_rate}% ({loan.benchmark} + {loan.spread} bps)
+        Maturity: {loan.maturity_date}
+        Prepayment Penalty: {loan.prepayment_penalty}
 
         Market Conditions:
         - Current {currency} {term_key} Risk-Free Rate: {risk_free_rate}%
@@ -898,9 +1346,9 @@ async def handle_refinancing(entities: Dict) -> Dict:
         - Annual Savings: {currency} {annual_savings:,.2f}
 
         Refinancing Costs:
-        - Prepayment Fee: {currency} {loan['refinancing_costs']['prepayment_fee']:,.2f}
+        - Prepayment Fee: {currency} {costs.prepayment_fee:,.2f}
         - Estimated Upfront Fee: {currency} {upfront_fee:,.2f}
-        - Legal and Other Fees: {currency} {loan['refinancing_costs']['legal_fees_estimate']:,.2f}
+        - Legal and Other Fees: {currency} {costs.legal_fees_estimate:,.2f}
         - Total Refinancing Cost: {currency} {total_refinancing_cost:,.2f}
 
         Breakeven Period: {breakeven_years:.2f} years
@@ -915,23 +1363,24 @@ async def handle_refinancing(entities: Dict) -> Dict:
         Be specific and actionable in your recommendations, considering the financial impact and market conditions.
         """
 
+        context = await rag_task
         if context:
             system_prompt += f"\n\nAdditional market context for your analysis:\n{context}"
 
         refinancing_analysis = await generate_text(
-            prompt=f"Analyze refinancing opportunity for {loan['name']}",
+            prompt=f"Analyze refinancing opportunity for {loan.name}",
             system_prompt=system_prompt,
         )
 
         return {
             "loan_id": loan_id,
             "loan_details": {
-                "name": loan["name"],
-                "type": loan["type"],
-                "outstanding_amount": loan["outstanding_amount"],
+                "name": loan.name,
+                "type": loan.type,
+                "outstanding_amount": loan.outstanding_amount,
                 "currency": currency,
-                "current_rate": loan["current_rate"],
-                "maturity_date": loan["maturity_date"],
+                "current_rate": loan.current_rate,
+                "maturity_date": loan.maturity_date,
             },
             "market_conditions": {
                 "risk_free_rate": risk_free_rate,
@@ -945,9 +1394,9 @@ async def handle_refinancing(entities: Dict) -> Dict:
                 "annual_savings": annual_savings,
             },
             "refinancing_costs": {
-                "prepayment_fee": loan["refinancing_costs"]["prepayment_fee"],
+                "prepayment_fee": costs.prepayment_fee,
                 "upfront_fee": upfront_fee,
-                "legal_fees": loan["refinancing_costs"]["legal_fees_estimate"],
+                "legal_fees": costs.legal_fees_estimate,
                 "total_cost": total_refinancing_cost,
             },
             "breakeven_years": breakeven_years,
@@ -956,221 +1405,54 @@ async def handle_refinancing(entities: Dict) -> Dict:
 
     # Portfolio-level refinancing analysis
     else:
-        # Analyze all loans for refinancing opportunities
-        refinancing_opportunities = []
-
-        for loan_id, loan in loans.items():
-            currency = loan["currency"]
-            loan_type = "term_loan" if loan["type"] in ["term_loan", "term"] else "revolver"
-
-            # Skip if market data not available
-            if currency not in market_rates:
-                continue
-
-            # Determine loan term for rate lookup
-            if "term" in loan:
-                if "7 year" in loan["term"] or "7-year" in loan["term"]:
-                    term_key = "7y"
-                elif "10 year" in loan["term"] or "10-year" in loan["term"]:
-                    term_key = "10y"
-                elif "5 year" in loan["term"] or "5-year" in loan["term"]:
-                    term_key = "5y"
-                elif "3 year" in loan["term"] or "3-year" in loan["term"]:
-                    term_key = "3y"
-                elif "2 year" in loan["term"] or "2-year" in loan["term"]:
-                    term_key = "2y"
-                elif "1 year" in loan["term"] or "1-year" in loan["term"]:
-                    term_key = "1y"
-                else:
-                    term_key = "5y"  # Default to 5 years
-            else:
-                term_key = "5y"  # Default to 5 years
-
-            # Check if term_key exists in market_rates
-            if term_key not in market_rates[currency]["risk_free"]:
-                continue
-
-            # Calculate estimated new rate
-            risk_free_rate = market_rates[currency]["risk_free"][term_key]
-            spread = market_rates[currency][loan_type][rating_band]["spread"]
-            estimated_new_rate = risk_free_rate + (spread / 100)
-
-            # Calculate potential savings
-            rate_reduction = loan["current_rate"] - estimated_new_rate
-            annual_interest_current = loan["outstanding_amount"] * (loan["current_rate"] / 100)
-            annual_interest_new = loan["outstanding_amount"] * (estimated_new_rate / 100)
-            annual_savings = annual_interest_current - annual_interest_new
-
-            # Calculate refinancing costs
-            upfront_fee = loan["outstanding_amount"] * (loan["refinancing_costs"]["upfront_fee_estimate"] / 100)
-            total_refinancing_cost = loan["refinancing_costs"]["prepayment_fee"] + upfront_fee + loan["refinancing_costs"]["legal_fees_estimate"]
-
-            # Calculate breakeven
-            if annual_savings > 0:
-                breakeven_years = total_refinancing_cost / annual_savings
-            else:
-                breakeven_years = float('inf')
-
-            # Add to opportunities if there are savings
-            if rate_reduction > 0:
-                refinancing_opportunities.append({
-                    "loan_id": loan_id,
-                    "name": loan["name"],
-                    "currency": currency,
-                    "outstanding_amount": loan["outstanding_amount"],
-                    "current_rate": loan["current_rate"],
-                    "estimated_new_rate": estimated_new_rate,
-                    "rate_reduction": rate_reduction,
-                    "annual_savings": annual_savings,
-                    "refinancing_cost": total_refinancing_cost,
-                    "breakeven_years": breakeven_years,
-                    "prepayment_penalty": loan.get("prepayment_penalty", "None"),
-                })
-
-        # Sort opportunities by breakeven period
-        refinancing_opportunities.sort(key=lambda x: x["breakeven_years"])
-
-        # Get RAG context for portfolio refinancing
-        query = f"debt portfolio refinancing strategy {company_credit['rating']}"
-        context = await rag_module.generate_context(
-            query, filter_criteria={"category": "external_financing"}
+        analysis, system_prompt = _price_refinancing_portfolio(rating_band)
+        system_prompt = await _with_financing_context(
+            system_prompt,
+            f"debt portfolio refinancing strategy {COMPANY_CREDIT['rating']}",
+            "Additional market context for your strategy",
         )
-
-        # Generate portfolio refinancing strategy using LLM
-        system_prompt = """
-        You are a debt portfolio manager. Develop a comprehensive refinancing strategy for this loan portfolio:
-
-        Refinancing Opportunities:
-        """
-
-        for opp in refinancing_opportunities:
-            system_prompt += f"""
-
-            {opp['name']} ({opp['loan_id']}):
-            - Outstanding: {opp['currency']} {opp['outstanding_amount']:,}
-            - Current Rate: {opp['current_rate']}%
-            - Potential New Rate: {opp['estimated_new_rate']:.2f}%
-            - Rate Reduction: {opp['rate_reduction']:.2f}%
-            - Annual Savings: {opp['currency']} {opp['annual_savings']:,.2f}
-            - Refinancing Cost: {opp['currency']} {opp['refinancing_cost']:,.2f}
-            - Breakeven: {opp['breakeven_years']:.2f} years
-            - Prepayment Penalty: {opp['prepayment_penalty']}
-            """
-
-        system_prompt += """
-
-        Provide a strategic refinancing approach for the overall debt portfolio, including:
-        1. Prioritization of which loans to refinance first
-        2. Potential for combining multiple refinancings
-        3. Optimal timing considerations
-        4. Impact on overall debt portfolio structure
-        5. Market and execution risks to consider
-
-        Be specific and actionable in your recommendations, focusing on maximizing financial benefits while managing execution risks.
-        """
-
-        if context:
-            system_prompt += f"\n\nAdditional market context for your strategy:\n{context}"
-
-        portfolio_strategy = await generate_text(
+        strategy = generate_text(
             prompt="Develop debt portfolio refinancing strategy",
             system_prompt=system_prompt,
             max_new_tokens=1024,
         )
 
-        # Calculate total potential savings
-        total_annual_savings = sum(opp["annual_savings"] for opp in refinancing_opportunities)
-        total_refinancing_cost = sum(opp["refinancing_cost"] for opp in refinancing_opportunities)
-
-        return {
-            "refinancing_opportunities": refinancing_opportunities,
-            "opportunity_count": len(refinancing_opportunities),
-            "total_potential_savings": {
-                "annual": total_annual_savings,
-                "costs": total_refinancing_cost,
-                "average_breakeven": sum(opp["breakeven_years"] for opp in refinancing_opportunities) / len(refinancing_opportunities) if refinancing_opportunities else 0,
-            },
-            "formatted_response": portfolio_strategy,
-        }
+        # Optionally assess each opportunity too, alongside the portfolio strategy
+        if entities.get("per_loan_analysis"):
+            opportunities = analysis["refinancing_opportunities"]
+            analysis["formatted_response"], loan_analyses = await asyncio.gather(
+                strategy,
+                generate_text_batch(
+                    [f"Assess refinancing opportunity for {opp['name']}" for opp in opportunities],
+                    [REFINANCING_OPPORTUNITY_PROMPT.format_map(opp) for opp in opportunities],
+                ),
+            )
+            for opp, loan_analysis in zip(opportunities, loan_analyses):
+                opp["analysis"] = loan_analysis
+        else:
+            analysis["formatted_response"] = await strategy
+        return analysis
 
 
-async def handle_debt_maturity(entities: Dict) -> Dict:
+def _profile_debt_maturity(entities: Dict) -> Tuple[Dict, str]:
     """
-    Analyze debt maturity schedule and provide recommendations.
+    Build the debt maturity profile, optionally for a single currency.
 
     Args:
         entities: Dictionary of entities extracted from user intent
 
     Returns:
-        Dictionary with debt maturity analysis
+        Tuple of (maturity analysis without the LLM text, system prompt without
+        retrieved context)
     """
     # Extract relevant entities
     time_horizon = entities.get("time_horizon", "5y")
     currency = entities.get("currency")
 
-    # Sample debt data (would come from debt management system in real implementation)
-    debts = {
-        "L001": {
-            "name": "Term Loan A",
-            "type": "term_loan",
-            "outstanding_amount": 20000000,
-            "currency": "USD",
-            "maturity_date": "2027-06-15",
-            "interest_rate": 5.5,
-        },
-        "L002": {
-            "name": "Revolving Credit Facility",
-            "type": "revolver",
-            "outstanding_amount": 8000000,
-            "currency": "USD",
-            "maturity_date": "2027-06-15",
-            "interest_rate": 5.25,
-        },
-        "L003": {
-            "name": "Term Loan B",
-            "type": "term_loan",
-            "outstanding_amount": 48750000,
-            "currency": "USD",
-            "maturity_date": "2030-03-10",
-            "interest_rate": 6.0,
-        },
-        "L004": {
-            "name": "Euro Term Loan",
-            "type": "term_loan",
-            "outstanding_amount": 20000000,
-            "currency": "EUR",
-            "maturity_date": "2028-09-15",
-            "interest_rate": 4.5,
-        },
-        "B001": {
-            "name": "Senior Notes Series A",
-            "type": "bond",
-            "outstanding_amount": 75000000,
-            "currency": "USD",
-            "maturity_date": "2029-12-15",
-            "interest_rate": 5.75,
-        },
-        "B002": {
-            "name": "Senior Notes Series B",
-            "type": "bond",
-            "outstanding_amount": 50000000,
-            "currency": "USD",
-            "maturity_date": "2031-06-30",
-            "interest_rate": 6.25,
-        },
-        "CP001": {
-            "name": "Commercial Paper Program",
-            "type": "commercial_paper",
-            "outstanding_amount": 25000000,
-            "currency": "USD",
-            "maturity_date": "2025-12-31",
-            "interest_rate": 4.25,
-        },
-    }
-
     # Filter by currency if specified
+    debts = DEBTS
     if currency:
-        debts = {id: debt for id, debt in debts.items() if debt["currency"] == currency}
+        debts = {id: debt for id, debt in DEBTS.items() if debt.currency == currency}
 
     # Parse time horizon
     years = 5
@@ -1183,69 +1465,56 @@ async def handle_debt_maturity(entities: Dict) -> Dict:
     horizon_date = datetime.datetime.now() + datetime.timedelta(days=365 * years)
     horizon_date_str = horizon_date.strftime("%Y-%m-%d")
 
-    # Group by year
-    maturities_by_year = {}
-    for debt_id, debt in debts.items():
-        year = debt["maturity_date"][:4]  # Extract year from date
-
-        if year not in maturities_by_year:
-            maturities_by_year[year] = {
-                "count": 0,
-                "total_amount": 0,
-                "by_currency": {},
-                "debts": [],
-            }
-
-        maturities_by_year[year]["count"] += 1
-        maturities_by_year[year]["total_amount"] += debt["outstanding_amount"]
-
-        if debt["currency"] not in maturities_by_year[year]["by_currency"]:
-            maturities_by_year[year]["by_currency"][debt["currency"]] = 0
+    total_debt = sum(debt.outstanding_amount for debt in debts.values())
 
-        maturities_by_year[year]["by_currency"][debt["currency"]] += debt["outstanding_amount"]
-        maturities_by_year[year]["debts"].append({
+    # Group by maturity year
+    maturities_by_year = defaultdict(lambda: {
+        "count": 0,
+        "total_amount": 0,
+        "by_currency": defaultdict(int),
+        "debts": [],
+    })
+    for debt_id, debt in debts.items():
+        year_data = maturities_by_year[int(debt.maturity_date[:4])]  # Extract year from date
+        year_data["count"] += 1
+        year_data["total_amount"] += debt.outstanding_amount
+        year_data["by_currency"][debt.currency] += debt.outstanding_amount
+        year_data["debts"].append({
             "debt_id": debt_id,
-            "name": debt["name"],
-            "type": debt["type"],
-            "amount": debt["outstanding_amount"],
-            "currency": debt["currency"],
-            "rate": debt["interest_rate"],
+            "name": debt.name,
+            "type": debt.type,
+            "amount": debt.outstanding_amount,
+            "currency": debt.currency,
+            "rate": debt.current_rate,
         })
 
     # Sort years
     sorted_years = sorted(maturities_by_year.keys())
 
     # Calculate major maturity years (>20% of total debt)
-    total_debt = sum(debt["outstanding_amount"] for debt in debts.values())
     major_maturity_years = [
-        year for year, data in maturities_by_year.items()
+        str(year) for year, data in maturities_by_year.items()
         if data["total_amount"] / total_debt > 0.2
     ]
 
-    # Get RAG context for debt maturity management
-    query = f"debt maturity management {time_horizon}"
-    context = await rag_module.generate_context(
-        query, filter_criteria={"category": "external_financing"}
-    )
-
-    # Generate debt maturity analysis using LLM
-    system_prompt = f"""
+    # Debt maturity analysis prompt
+    prompt_parts = [f"""
     You are a debt portfolio manager specializing in maturity management. Analyze this debt maturity profile:
 
-    Total Debt: {sum(debt['outstanding_amount'] for debt in debts.values()):,.0f} mixed currencies
+    Total Debt: {total_debt:,.0f} mixed currencies
     Time Horizon: {time_horizon} (until {horizon_date_str})
-    """
+    """]
 
     for year in sorted_years:
-        system_prompt += f"""
+        prompt_parts.append(f"""
 
         {year} Maturities:
         - Total: {maturities_by_year[year]['total_amount']:,.0f} ({', '.join([f'{curr} {amt:,.0f}' for curr, amt in maturities_by_year[year]['by_currency'].items()])})
         - Count: {maturities_by_year[year]['count']} debt instruments
         - Instruments: {', '.join([f"{debt['name']} ({debt['currency']} {debt['amount']:,.0f})" for debt in maturities_by_year[year]['debts']])}
-        """
+        """)
 
-    system_prompt += f"""
+    prompt_parts.append(f"""
 
     Major Maturity Years (>20% of total debt): {', '.join(major_maturity_years)}
 
@@ -1257,34 +1526,50 @@ async def handle_debt_maturity(entities: Dict) -> Dict:
     5. Market timing considerations for addressing near-term maturities
 
     Focus on practical strategies to manage refinancing risk while optimizing the cost of debt.
-    """
-
-    if context:
-        system_prompt += f"\n\nAdditional context for your analysis:\n{context}"
-
-    maturity_analysis = await generate_text(
-        prompt=f"Analyze debt maturity profile over {time_horizon}",
-        system_prompt=system_prompt,
-        max_new_tokens=1024,
-    )
+    """)
 
-    return {
+    analysis = {
         "time_horizon": time_horizon,
         "horizon_date": horizon_date_str,
-        "total_debt": sum(debt["outstanding_amount"] for debt in debts.values()),
+        "total_debt": total_debt,
         "currency_filter": currency,
         "maturity_profile": {
-            year: {
+            str(year): {
                 "total": maturities_by_year[year]["total_amount"],
                 "count": maturities_by_year[year]["count"],
-                "by_currency": maturities_by_year[year]["by_currency"],
+                "by_currency": dict(maturities_by_year[year]["by_currency"]),
                 "percent_of_total": maturities_by_year[year]["total_amount"] / total_debt * 100,
                 "debts": maturities_by_year[year]["debts"],
             } for year in sorted_years
         },
         "major_maturity_years": major_maturity_years,
-        "formatted_response": maturity_analysis,
     }
+    return analysis, "".join(prompt_parts)
+
+
+async def handle_debt_maturity(entities: Dict) -> Dict:
+    """
+    Analyze debt maturity schedule and provide recommendations.
+
+    Args:
+        entities: Dictionary of entities extracted from user intent
+
+    Returns:
+        Dictionary with debt maturity analysis
+    """
+    analysis, system_prompt = _profile_debt_maturity(entities)
+    time_horizon = analysis["time_horizon"]
+    system_prompt = await _with_financing_context(
+        system_prompt,
+        f"debt maturity management {time_horizon}",
+        "Additional context for your analysis",
+    )
+    analysis["formatted_response"] = await generate_text(
+        prompt=f"Analyze debt maturity profile over {time_horizon}",
+        system_prompt=system_prompt,
+        max_new_tokens=1024,
+    )
+    return analysis
 
 
 async def handle_interest_payment(entities: Dict) -> Dict:
@@ -1301,106 +1586,15 @@ async def handle_interest_payment(entities: Dict) -> Dict:
     time_period = entities.get("time_period", "1y")
     debt_id = entities.get("debt_id")
 
-    # Sample debt data (would come from debt management system in real implementation)
-    debts = {
-        "L001": {
-            "name": "Term Loan A",
-            "type": "term_loan",
-            "outstanding_amount": 20000000,
-            "currency": "USD",
-            "maturity_date": "2027-06-15",
-            "interest_rate_type": "floating",
-            "current_rate": 5.5,
-            "payment_frequency": "quarterly",
-            "next_payment_date": "2025-06-15",
-            "annual_interest": 1100000,  # 5.5% of 20M
-        },
-        "L002": {
-            "name": "Revolving Credit Facility",
-            "type": "revolver",
-            "outstanding_amount": 8000000,
-            "currency": "USD",
-            "maturity_date": "2027-06-15",
-            "interest_rate_type": "floating",
-            "current_rate": 5.25,
-            "payment_frequency": "quarterly",
-            "next_payment_date": "2025-06-15",
-            "annual_interest": 420000,  # 5.25% of 8M
-        },
-        "L003": {
-            "name": "Term Loan B",
-            "type": "term_loan",
-            "outstanding_amount": 48750000,
-            "currency": "USD",
-            "maturity_date": "2030-03-10",
-            "interest_rate_type": "floating",
-            "current_rate": 6.0,
-            "payment_frequency": "quarterly",
-            "next_payment_date": "2025-06-10",
-            "annual_interest": 2925000,  # 6.0% of 48.75M
-        },
-        "L004": {
-            "name": "Euro Term Loan",
-            "type": "term_loan",
-            "outstanding_amount": 20000000,
-            "currency": "EUR",
-            "maturity_date": "2028-09-15",
-            "interest_rate_type": "floating",
-            "current_rate": 4.5,
-            "payment_frequency": "quarterly",
-            "next_payment_date": "2025-06-15",
-            "annual_interest": 900000,  # 4.5% of 20M
-        },
-        "B001": {
-            "name": "Senior Notes Series A",
-            "type": "bond",
-            "outstanding_amount": 75000000,
-            "currency": "USD",
-            "maturity_date": "2029-12-15",
-            "interest_rate_type": "fixed",
-            "current_rate": 5.75,
-            "payment_frequency": "semi-annual",
-            "next_payment_date": "2025-06-15",
-            "annual_interest": 4312500,  # 5.75% of 75M
-        },
-        "B002": {
-            "name": "Senior Notes Series B",
-            "type": "bond",
-            "outstanding_amount": 50000000,
-            "currency": "USD",
-            "maturity_date": "2031-06-30",
-            "interest_rate_type": "fixed",
-            "current_rate": 6.25,
-            "payment_frequency": "semi-annual",
-            "next_payment_date": "2025-06-30",
-            "annual_interest": 3125000,  # 6.25% of 50M
-        },
-        "CP001": {
-            "name": "Commercial Paper Program",
-            "type": "commercial_paper",
-            "outstanding_amount": 25000000,
-            "currency": "USD",
-            "maturity_date": "2025-12-31",
-            "interest_rate_type": "fixed",
-            "current_rate": 4.25,
-            "payment_frequency": "at maturity",
-            "next_payment_date": "2025-12-31",
-            "annual_interest": 1062500,  # 4.25% of 25M
-        },
-    }
-
     # If specific debt requested
     if debt_id:
-        if debt_id not in debts:
+        if debt_id not in DEBTS:
             return {
                 "error": f"Debt {debt_id} not found",
-                "available_debts": list(debts.keys())
+                "available_debts": list(DEBTS.keys())
             }
 
-        debt = debts[debt_id]
-
-        # Generate payment schedule
-        payment_schedule = []
+        debt = DEBTS[debt_id]
 
         # Parse time period
         years = 1
@@ -1411,93 +1605,71 @@ async def handle_interest_payment(entities: Dict) -> Dict:
                 years = 1
 
         # Determine number of payments based on frequency
-        payments_per_year = {
-            "monthly": 12,
-            "quarterly": 4,
-            "semi-annual": 2,
-            "annual": 1,
-            "at maturity": 1,
-        }
-
-        frequency = debt["payment_frequency"]
-        total_payments = payments_per_year.get(frequency, 4) * years
+        frequency = debt.payment_frequency
+        payments_per_year = _PAYMENTS_PER_YEAR.get(frequency, 4)
+        total_payments = payments_per_year * years
 
         # Calculate payment amount
-        annual_interest = debt["annual_interest"]
-        payment_amount = annual_interest / payments_per_year.get(frequency, 4)
-
-        # Generate schedule
-        current_date = datetime.datetime.strptime(debt["next_payment_date"], "%Y-%m-%d")
-
-        for i in range(total_payments):
-            payment_schedule.append({
-                "date": current_date.strftime("%Y-%m-%d"),
+        annual_interest = debt.annual_interest
+        payment_amount = annual_interest / payments_per_year
+
+        # Generate schedule; only one payment at maturity
+        payment_dates = pd.date_range(
+            debt.next_payment_date,
+            periods=min(total_payments, 1) if frequency == "at maturity" else total_payments,
+            freq=pd.DateOffset(months=_PAYMENT_INTERVAL_MONTHS.get(frequency, 3)),
+        )
+        payment_schedule = [
+            {
+                "date": date,
                 "amount": payment_amount,
-                "currency": debt["currency"],
+                "currency": debt.currency,
                 "payment_type": "Interest",
-            })
-
-            # Advance to next payment date
-            if frequency == "monthly":
-                current_date = current_date.replace(month=current_date.month % 12 + 1)
-                if current_date.month == 1:
-                    current_date = current_date.replace(year=current_date.year + 1)
-            elif frequency == "quarterly":
-                new_month = ((current_date.month - 1 + 3) % 12) + 1
-                new_year = current_date.year + ((current_date.month - 1 + 3) // 12)
-                current_date = current_date.replace(year=new_year, month=new_month)
-            elif frequency == "semi-annual":
-                new_month = ((current_date.month - 1 + 6) % 12) + 1
-                new_year = current_date.year + ((current_date.month - 1 + 6) // 12)
-                current_date = current_date.replace(year=new_year, month=new_month)
-            elif frequency == "annual":
-                current_date = current_date.replace(year=current_date.year + 1)
-            elif frequency == "at maturity":
-                break  # Only one payment at maturity
+            }
+            for date in payment_dates.strftime("%Y-%m-%d")
+        ]
+        total_interest = payment_amount * len(payment_schedule)
 
         # Add maturity payment if within time period
-        maturity_date = datetime.datetime.strptime(debt["maturity_date"], "%Y-%m-%d")
+        maturity_date = datetime.datetime.strptime(debt.maturity_date, "%Y-%m-%d")
         end_date = datetime.datetime.now() + datetime.timedelta(days=365 * years)
 
+        # Interest dates are already in order, so the principal is inserted in place
+        total_principal = 0
         if maturity_date <= end_date:
-            payment_schedule.append({
-                "date": debt["maturity_date"],
-                "amount": debt["outstanding_amount"],
-                "currency": debt["currency"],
+            total_principal = debt.outstanding_amount
+            bisect.insort(payment_schedule, {
+                "date": debt.maturity_date,
+                "amount": debt.outstanding_amount,
+                "currency": debt.currency,
                 "payment_type": "Principal",
-            })
-
-        # Sort by date
-        payment_schedule.sort(key=lambda x: x["date"])
-
-        # Calculate total interest over period
-        total_interest = sum(p["amount"] for p in payment_schedule if p["payment_type"] == "Interest")
+            }, key=lambda x: x["date"])
 
         return {
             "debt_id": debt_id,
-            "name": debt["name"],
-            "type": debt["type"],
-            "currency": debt["currency"],
-            "outstanding_amount": debt["outstanding_amount"],
-            "interest_rate": debt["current_rate"],
-            "payment_frequency": debt["payment_frequency"],
-            "next_payment_date": debt["next_payment_date"],
+            "name": debt.name,
+            "type": debt.type,
+            "currency": debt.currency,
+            "outstanding_amount": debt.outstanding_amount,
+            "interest_rate": debt.current_rate,
+            "payment_frequency": debt.payment_frequency,
+            "next_payment_date": debt.next_payment_date,
             "time_period": time_period,
             "payment_schedule": payment_schedule,
             "total_interest": total_interest,
-            "total_principal": sum(p["amount"] for p in payment_schedule if p["payment_type"] == "Principal"),
+            "total_principal": total_principal,
             "message": (
-                f"Interest Payment Schedule for {debt['name']} ({debt_id}):\n"
-                f"Amount: {debt['currency']} {debt['outstanding_amount']:,.0f}\n"
-                f"Rate: {debt['current_rate']}% ({debt['interest_rate_type']})\n"
-                f"Frequency: {debt['payment_frequency']}\n"
-                f"Annual Interest: {debt['currency']} {debt['annual_interest']:,.0f}\n\n"
+                f"Interest Payment Schedule for {debt.name} ({debt_id}):\n"
+                f"Amount: {debt.currency} {debt.outstanding_amount:,.0f}\n"
+                f"Rate: {debt.current_rate}% ({debt.interest_rate_type})\n"
+                f"Frequency: {debt.payment_frequency}\n"
+                f"Annual Interest: {debt.currency} {debt.annual_interest:,.0f}\n\n"
                 f"Payments over {time_period}:\n" +
                 "\n".join([
-                    f"- {p['date']}: {debt['currency']} {p['amount']:,.2f} ({p['payment_type']})"
+                    f"- {p['date']}: {debt.currency} {p['amount']:,.2f} ({p['payment_type']})"
                     for p in payment_schedule
                 ]) +
-                f"\n\nTotal Interest: {debt['currency']} {total_interest:,.2f}"
+                f"\n\nTotal Interest: {debt.currency} {total_interest:,.2f}"
             ),
         }
 
@@ -1511,24 +1683,27 @@ async def handle_interest_payment(entities: Dict) -> Dict:
             except ValueError:
                 years = 1
 
+        # Get RAG context for interest payment management (runs while the forecast is built)
+        query = f"interest payment management {time_period}"
+        rag_task = asyncio.create_task(
+            cached_generate_context(query, filter_criteria=EXTERNAL_FINANCING_FILTER)
+        )
+
         end_date = datetime.datetime.now() + datetime.timedelta(days=365 * years)
         end_date_str = end_date.strftime("%Y-%m-%d")
 
         # Group debts by currency
-        by_currency = {}
-        for debt_id, debt in debts.items():
-            currency = debt["currency"]
-
-            if currency not in by_currency:
-                by_currency[currency] = {
-                    "count": 0,
-                    "total_outstanding": 0,
-                    "annual_interest": 0,
-                }
-
-            by_currency[currency]["count"] += 1
-            by_currency[currency]["total_outstanding"] += debt["outstanding_amount"]
-            by_currency[currency]["annual_interest"] += debt["annual_interest"]
+        by_currency = defaultdict(lambda: {
+            "count": 0,
+            "total_outstanding": 0,
+            "annual_interest": 0,
+        })
+        for debt in DEBTS.values():
+            currency_data = by_currency[debt.currency]
+            currency_data["count"] += 1
+            currency_data["total_outstanding"] += debt.outstanding_amount
+            currency_data["annual_interest"] += debt.annual_interest
+        by_currency = dict(by_currency)
 
         # Calculate total interest over period
         total_interest_by_currency = {}
@@ -1544,9 +1719,8 @@ async def handle_interest_payment(entities: Dict) -> Dict:
         current_quarter_start = current_quarter_start.replace(month=quarter_month)
 
         for i in range(years * 4):
-            quarter_end_month = ((current_quarter_start.month - 1 + 3) % 12) + 1
-            quarter_end_year = current_quarter_start.year + ((current_quarter_start.month - 1 + 3) // 12)
-            quarter_end = current_quarter_start.replace(year=quarter_end_year, month=quarter_end_month) - datetime.timedelta(days=1)
+            next_quarter_start = _add_months(current_quarter_start, 3)
+            quarter_end = next_quarter_start - datetime.timedelta(days=1)
 
             quarter_name = f"Q{((current_quarter_start.month - 1) // 3) + 1} {current_quarter_start.year}"
             interest_by_currency = {}
@@ -1563,49 +1737,40 @@ async def handle_interest_payment(entities: Dict) -> Dict:
             })
 
             # Move to next quarter
-            current_quarter_start = current_quarter_start.replace(
-                month=((current_quarter_start.month - 1 + 3) % 12) + 1,
-                year=current_quarter_start.year + ((current_quarter_start.month - 1 + 3) // 12)
-            )
-
-        # Get RAG context for interest payment management
-        query = f"interest payment management {time_period}"
-        context = await rag_module.generate_context(
-            query, filter_criteria={"category": "external_financing"}
-        )
+            current_quarter_start = next_quarter_start
 
         # Generate interest payment analysis using LLM
-        system_prompt = f"""
+        prompt_parts = [f"""
         You are a financial analyst specializing in debt management. Analyze this debt interest payment forecast:
 
         Time Period: {time_period} (until {end_date_str})
 
         Debt Portfolio Summary:
-        """
+        """]
 
         for currency, data in by_currency.items():
-            system_prompt += f"""
+            prompt_parts.append(f"""
 
             {currency} Debt:
             - Outstanding Amount: {currency} {data['total_outstanding']:,.0f}
             - Annual Interest: {currency} {data['annual_interest']:,.0f}
             - Projected Interest ({time_period}): {currency} {total_interest_by_currency[currency]:,.0f}
-            """
+            """)
 
-        system_prompt += """
+        prompt_parts.append("""
 
         Quarterly Interest Forecast:
-        """
+        """)
 
         for quarter in quarterly_forecast:
-            system_prompt += f"""
+            prompt_parts.append(f"""
 
             {quarter['quarter']} ({quarter['start_date']} to {quarter['end_date']}):
-            """
+            """)
             for currency, amount in quarter["interest_by_currency"].items():
-                system_prompt += f"- {currency}: {amount:,.0f}\n"
+                prompt_parts.append(f"- {currency}: {amount:,.0f}\n")
 
-        system_prompt += """
+        prompt_parts.append("""
 
         Provide a comprehensive interest payment analysis including:
         1. Assessment of the current interest burden and its impact on cash flow
@@ -1615,8 +1780,11 @@ async def handle_interest_payment(entities: Dict) -> Dict:
         5. Opportunities for optimizing the overall cost of debt
 
         Focus on practical insights and actionable recommendations for managing interest payments efficiently.
-        """
+        """)
+
+        system_prompt = "".join(prompt_parts)
 
+        context = await rag_task
         if context:
             system_prompt += f"\n\nAdditional context for your analysis:\n{context}"
 
@@ -1629,7 +1797,7 @@ async def handle_interest_payment(entities: Dict) -> Dict:
             "time_period": time_period,
             "end_date": end_date_str,
             "debt_summary": {
-                "total_count": len(debts),
+                "total_count": len(DEBTS),
                 "by_currency": by_currency,
             },
             "interest_summary": {
@@ -1639,4 +1807,104 @@ async def handle_interest_payment(entities: Dict) -> Dict:
             },
             "quarterly_forecast": quarterly_forecast,
             "formatted_response": interest_analysis,
-        }
\ No newline at end of file
+        }
+
+
+async def stream_debt_issuance(entities: Dict) -> AsyncIterator[Dict]:
+    """
+    Stream a debt issuance analysis as it is generated.
+
+    The pricing analysis is yielded first, as {"stage": "data", "issuance_data": ...},
+    followed by {"stage": "chunk", "text": ...} events carrying the strategy text.
+    Requests that cannot be priced yield a single data event with the error.
+
+    Args:
+        entities: Dictionary of entities extracted from user intent
+
+    Yields:
+        Stream events
+    """
+    analysis, prompt_fields = _price_debt_issuance(entities)
+    if prompt_fields is None:
+        yield {"stage": "data", "issuance_data": analysis}
+        return
+
+    prompt_task = asyncio.create_task(_debt_issuance_prompts(prompt_fields))
+    try:
+        yield {"stage": "data", "issuance_data": analysis}
+
+        prompt, system_prompt = await prompt_task
+        async for text in stream_text(prompt=prompt, system_prompt=system_prompt, max_new_tokens=1024):
+            yield {"stage": "chunk", "text": text}
+    finally:
+        if not prompt_task.done():
+            prompt_task.cancel()
+
+
+async def stream_debt_maturity(entities: Dict) -> AsyncIterator[Dict]:
+    """
+    Stream a debt maturity analysis as it is generated.
+
+    The maturity profile is yielded first, as {"stage": "data", "maturity_data": ...},
+    followed by {"stage": "chunk", "text": ...} events carrying the analysis text.
+
+    Args:
+        entities: Dictionary of entities extracted from user intent
+
+    Yields:
+        Stream events
+    """
+    analysis, system_prompt = _profile_debt_maturity(entities)
+    time_horizon = analysis["time_horizon"]
+
+    prompt_task = asyncio.create_task(_with_financing_context(
+        system_prompt,
+        f"debt maturity management {time_horizon}",
+        "Additional context for your analysis",
+    ))
+    try:
+        yield {"stage": "data", "maturity_data": analysis}
+
+        system_prompt = await prompt_task
+        async for text in stream_text(
+            prompt=f"Analyze debt maturity profile over {time_horizon}",
+            system_prompt=system_prompt,
+            max_new_tokens=1024,
+        ):
+            yield {"stage": "chunk", "text": text}
+    finally:
+        if not prompt_task.done():
+            prompt_task.cancel()
+
+
+async def stream_portfolio_refinancing() -> AsyncIterator[Dict]:
+    """
+    Stream the portfolio refinancing strategy as it is generated.
+
+    The priced opportunities are yielded first, as {"stage": "data", "refinancing_data": ...},
+    followed by {"stage": "chunk", "text": ...} events carrying the strategy text.
+
+    Yields:
+        Stream events
+    """
+    rating_band = RATING_BANDS.get(COMPANY_CREDIT["rating"], "BBB")
+    analysis, system_prompt = _price_refinancing_portfolio(rating_band)
+
+    prompt_task = asyncio.create_task(_with_financing_context(
+        system_prompt,
+        f"debt portfolio refinancing strategy {COMPANY_CREDIT['rating']}",
+        "Additional market context for your strategy",
+    ))
+    try:
+        yield {"stage": "data", "refinancing_data": analysis}
+
+        system_prompt = await prompt_task
+        async for text in stream_text(
+            prompt="Develop debt portfolio refinancing strategy",
+            system_prompt=system_prompt,
+            max_new_tokens=1024,
+        ):
+            yield {"stage": "chunk", "text": text}
+    finally:
+        if not prompt_task.done():
+            prompt_task.cancel()
@@ -90,7 +90,7 @@ async def handle_forecast_update(entities: Dict[str, Any]) -> Dict[str, Any]:
         # Normalize date
         date_str = entities.get("as_of_date", "today")
         if date_str in ("today", None):
-            date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+            date_str = datetime.date.today().isoformat()
             
         forecast_period = entities.get("forecast_period", "year")
         department = entities.get("department")
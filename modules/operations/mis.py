@@ -43,7 +43,7 @@ async def handle_management_report(entities: Dict[str, Any]) -> Dict[str, Any]:
         # Normalize date
         date_str = entities.get("date", "today")
         if date_str in ("today", None):
-            date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+            date_str = datetime.date.today().isoformat()
             
         # TODO: Implement management report generation logic
         
@@ -84,7 +84,7 @@ async def handle_variance_analysis(entities: Dict[str, Any]) -> Dict[str, Any]:
         # Normalize date
         date_str = entities.get("date", "today")
         if date_str in ("today", None):
-            date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+            date_str = datetime.date.today().isoformat()
             
         # TODO: Implement variance analysis logic
         
@@ -125,7 +125,7 @@ async def handle_kpi_dashboard(entities: Dict[str, Any]) -> Dict[str, Any]:
         # Normalize date
         date_str = entities.get("date", "today")
         if date_str in ("today", None):
-            date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+            date_str = datetime.date.today().isoformat()
             
         # TODO: Implement KPI dashboard generation logic
         
@@ -166,7 +166,7 @@ async def handle_business_metrics(entities: Dict[str, Any]) -> Dict[str, Any]:
         # Normalize date
         date_str = entities.get("date", "today")
         if date_str in ("today", None):
-            date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+            date_str = datetime.date.today().isoformat()
             
         # TODO: Implement business metrics reporting logic
         
@@ -207,7 +207,7 @@ async def handle_executive_summary(entities: Dict[str, Any]) -> Dict[str, Any]:
         # Normalize date
         date_str = entities.get("date", "today")
         if date_str in ("today", None):
-            date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+            date_str = datetime.date.today().isoformat()
             
         # TODO: Implement executive summary generation logic
         
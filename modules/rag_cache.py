@@ -0,0 +1,86 @@
+"""
+RAG Context Cache for Finance Accountant Agent
+
+This module memoizes retrieved RAG context so that repeated queries from the
+operation handlers skip the embedding and vector search round trip.
+
+Features:
+- TTL + LRU cache keyed on the normalized query and canonical filter criteria
+- Single-flight: concurrent identical lookups share one retrieval
+- Invalidation when documents are added to the index
+
+Dependencies:
+- rag_module: For batched context retrieval
+- single_flight: For sharing one retrieval between concurrent identical lookups
+- orjson: For canonical (sorted-key) serialization of filter criteria
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Mapping, Optional, Tuple
+
+import orjson
+
+from modules.rag_module import batched_rag
+from modules.single_flight import single_flight
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_CONTEXT_CACHE: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+_CONTEXT_INFLIGHT: Dict[Tuple[str, str], asyncio.Task] = {}
+# Bumped by clear_context_cache so lookups already in flight do not store stale context
+_cache_generation = 0
+
+
+def clear_context_cache() -> None:
+    """Forget all cached context, e.g. after new documents are added to the index."""
+    global _cache_generation
+    _cache_generation += 1
+    _CONTEXT_CACHE.clear()
+    # Later lookups start a fresh retrieval instead of joining one that predates the clear
+    _CONTEXT_INFLIGHT.clear()
+
+
+def _cache_key(query: str, filter_criteria: Optional[Mapping]) -> Tuple[str, str]:
+    """Normalize a query and its filters into a hashable cache key."""
+    filter_json = orjson.dumps(filter_criteria, default=dict, option=orjson.OPT_SORT_KEYS).decode()
+    return query.strip().lower(), filter_json
+
+
+async def cached_generate_context(query: str, filter_criteria: Optional[Mapping] = None) -> str:
+    """
+    Return RAG context for a query, reusing a recent result for the same query.
+
+    Args:
+        query: User query; matching ignores case and surrounding whitespace
+        filter_criteria: Optional metadata filtering criteria
+
+    Returns:
+        Formatted context string for LLM prompt
+    """
+    key = _cache_key(query, filter_criteria)
+    now = time.monotonic()
+
+    cached = _CONTEXT_CACHE.get(key)
+    if cached is not None and now - cached[0] < settings.RESPONSE_CACHE_TTL_SECONDS:
+        _CONTEXT_CACHE.move_to_end(key)
+        return cached[1]
+
+    generation = _cache_generation
+
+    async def retrieve() -> str:
+        context = await batched_rag.generate_context(query, filter_criteria=filter_criteria)
+        # An empty result may be an empty index or a swallowed search error, so
+        # it is not cached and the next lookup retries the retrieval
+        if context and generation == _cache_generation:
+            _CONTEXT_CACHE[key] = (now, context)
+            _CONTEXT_CACHE.move_to_end(key)
+            while len(_CONTEXT_CACHE) > settings.RESPONSE_CACHE_MAXSIZE:
+                _CONTEXT_CACHE.popitem(last=False)
+        return context
+
+    return await single_flight(_CONTEXT_INFLIGHT, key, retrieve)
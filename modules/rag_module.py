@@ -189,28 +189,86 @@ class RAGModule:
             # Search in FAISS
             distances, indices = self.index.search(query_embedding, top_k * 2)  # Get more than needed for filtering
 
-            # Get corresponding documents
-            results = []
-            for idx in indices[0]:
-                if idx < len(self.documents):
-                    doc = self.documents[idx]
-
-                    # Apply metadata filtering if specified
-                    if filter_criteria:
-                        if self._matches_filter(doc.metadata, filter_criteria):
-                            results.append(doc)
-                    else:
-                        results.append(doc)
-
-                if len(results) >= top_k:
-                    break
-
-            return results
+            return self._collect_results(indices[0], top_k, filter_criteria)
 
         except Exception as e:
             logger.error(f"Error searching RAG index: {str(e)}")
             return []
 
+    async def batch_search(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None,
+        filter_criteria: Optional[List[Optional[Dict]]] = None,
+    ) -> List[List[Document]]:
+        """
+        Search for relevant documents for several queries at once.
+
+        All queries are embedded in a single encoder call and looked up with a
+        single FAISS search, amortizing the fixed cost of both over the batch.
+
+        Args:
+            queries: The search queries
+            top_k: Number of results per query (defaults to RAG_TOP_K setting)
+            filter_criteria: Optional per-query metadata filtering criteria
+
+        Returns:
+            One list of relevant Document objects per query
+        """
+        await self.initialize()
+
+        if filter_criteria is None:
+            filter_criteria = [None] * len(queries)
+
+        if not queries:
+            return []
+
+        if not self.documents:
+            logger.warning("No documents in RAG index")
+            return [[] for _ in queries]
+
+        if top_k is None:
+            top_k = settings.RAG_TOP_K
+
+        try:
+            # Encode all queries together
+            loop = asyncio.get_event_loop()
+            query_embeddings = await loop.run_in_executor(
+                None,
+                lambda: self.embedding_model.encode(queries, convert_to_numpy=True)
+            )
+
+            # Search in FAISS
+            distances, indices = self.index.search(query_embeddings, top_k * 2)  # Get more than needed for filtering
+
+            return [
+                self._collect_results(row, top_k, criteria)
+                for row, criteria in zip(indices, filter_criteria)
+            ]
+
+        except Exception as e:
+            logger.error(f"Error batch searching RAG index: {str(e)}")
+            return [[] for _ in queries]
+
+    def _collect_results(self, indices, top_k: int, filter_criteria: Optional[Dict]) -> List[Document]:
+        """Map FAISS result indices to documents, applying metadata filtering."""
+        results = []
+        for idx in indices:
+            if idx < len(self.documents):
+                doc = self.documents[idx]
+
+                # Apply metadata filtering if specified
+                if filter_criteria:
+                    if self._matches_filter(doc.metadata, filter_criteria):
+                        results.append(doc)
+                else:
+                    results.append(doc)
+
+            if len(results) >= top_k:
+                break
+
+        return results
+
     def _matches_filter(self, metadata: Dict, filter_criteria: Dict) -> bool:
         """Check if document metadata matches filter criteria."""
         for key, value in filter_criteria.items():
@@ -237,7 +295,26 @@ class RAGModule:
             Formatted context string for LLM prompt
         """
         relevant_docs = await self.search(query, filter_criteria=filter_criteria)
+        return self._format_context(relevant_docs)
+
+    async def batch_generate_context(
+        self, queries: List[str], filter_criteria: Optional[List[Optional[Dict]]] = None
+    ) -> List[str]:
+        """
+        Generate LLM context for several queries with one batched retrieval.
+
+        Args:
+            queries: User queries
+            filter_criteria: Optional per-query metadata filtering criteria
+
+        Returns:
+            Formatted context string for each query, in input order
+        """
+        results = await self.batch_search(queries, filter_criteria=filter_criteria)
+        return [self._format_context(docs) for docs in results]
 
+    def _format_context(self, relevant_docs: List[Document]) -> str:
+        """Format retrieved documents as a context block for an LLM prompt."""
         if not relevant_docs:
             return ""
 
@@ -287,5 +364,76 @@ Focus on providing accurate information based on these documents when relevant t
         return augmented_prompt
 
 
-# Create singleton instance
+class RAGBatcher:
+    """
+    Micro-batcher for RAG context generation.
+
+    Concurrent generate_context calls are queued and drained by a background
+    task in batches of up to batch_size queries (or whatever arrived within
+    max_wait seconds), each resolved with a single batched retrieval.
+    """
+
+    def __init__(self, rag: RAGModule, batch_size: int = 32, max_wait: float = 0.05):
+        self.rag = rag
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def _ensure_worker(self):
+        """Start the background worker on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def generate_context(self, query: str, filter_criteria: Optional[Dict] = None) -> str:
+        """
+        Queue a query for batched context generation.
+
+        Args:
+            query: User query
+            filter_criteria: Optional metadata filtering criteria
+
+        Returns:
+            Formatted context string for LLM prompt
+        """
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query, filter_criteria, future))
+        return await future
+
+    async def _run(self):
+        """Drain the queue in batches until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            queries = [query for query, _, _ in batch]
+            filters = [criteria for _, criteria, _ in batch]
+            try:
+                contexts = await self.rag.batch_generate_context(queries, filters)
+            except Exception as e:
+                logger.error(f"Error generating batched RAG context: {str(e)}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, _, future), context in zip(batch, contexts):
+                if not future.done():
+                    future.set_result(context)
+
+
+# Create singleton instances
 rag_module = RAGModule()
+batched_rag = RAGBatcher(rag_module)
@@ -20,17 +20,36 @@ Dependencies:
 
 import asyncio
 import io
-import json
 import logging
 import os
 import tempfile
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
+
+import orjson
 
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+def to_json(data: Any) -> str:
+    """
+    Serialize an operation result to indented JSON text.
+
+    Uses orjson, which also handles NumPy scalars/arrays and non-string keys
+    that can appear in handler results.
+
+    Args:
+        data: JSON-compatible data to serialize
+
+    Returns:
+        JSON string
+    """
+    return orjson.dumps(
+        data,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+    ).decode()
+
 async def generate_text_response(operation_result: Dict) -> Union[str, Dict]:
     """
     Generate a text response based on the operation result.
@@ -80,7 +99,7 @@ async def generate_text_response(operation_result: Dict) -> Union[str, Dict]:
    
     # As a last resort, return the entire result as JSON
     try:
-        return json.dumps(operation_result, indent=2)
+        return to_json(operation_result)
     except Exception as e:
         logger.error(f"Error serializing response to JSON: {e}")
         return "I'm sorry, I encountered an error formatting the response."
@@ -0,0 +1,49 @@
+"""
+Single-Flight Helper for Finance Accountant Agent
+
+This module coalesces concurrent identical async calls so that they share
+one underlying run, e.g. a RAG retrieval or an FX rate lookup.
+
+Features:
+- The shared run is a detached task: callers only shield-await it, so a
+  cancelled caller stops waiting without cancelling the run for the others
+- The in-flight entry is dropped as soon as the run finishes
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+def _forget(inflight: Dict[Hashable, asyncio.Task], key: Hashable, task: asyncio.Task) -> None:
+    """Drop a finished run from the in-flight table and retrieve its outcome."""
+    if inflight.get(key) is task:
+        del inflight[key]
+    # Mark any exception retrieved in case every caller stopped waiting
+    if not task.cancelled():
+        task.exception()
+
+
+async def single_flight(
+    inflight: Dict[Hashable, asyncio.Task],
+    key: Hashable,
+    run: Callable[[], Awaitable[T]],
+) -> T:
+    """
+    Await run(), sharing one run between concurrent calls with the same key.
+
+    Args:
+        inflight: Table of runs in flight, owned by the caller's module
+        key: Identifies calls that can share a run
+        run: Starts the run; only called when no run for key is in flight
+
+    Returns:
+        Result of the shared run (exceptions propagate to every caller)
+    """
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(run())
+        inflight[key] = task
+        task.add_done_callback(lambda done: _forget(inflight, key, done))
+    return await asyncio.shield(task)